@@ -0,0 +1,15 @@
+# benchmarks/__init__.py
+
+"""
+Reproducible timings for the codec hot paths. Run from the project root:
+
+    python -m benchmarks.run                       # time everything into baselines/local.json
+    python -m benchmarks.run --compare local       # ... again, against the previous local run
+    python -m benchmarks.run --compare reference   # outputs only, against baselines/reference.json
+    python -m benchmarks.run --quick --only decode
+    python -m benchmarks.startup                   # import / first-paint budget
+    python -m benchmarks.segmenter_check           # trie segmenter == old recursive decoder
+    python -m benchmarks.compound_check            # corpus samples rank their one-step decode first
+
+See the module of each command for its options.
+"""
@@ -0,0 +1,66 @@
+# benchmarks/compound_check.py
+
+"""
+Check that layered Auto-Detect (helpers.codec.compound_detect) still ranks
+the plain one-step decode of every test-corpus sample first:
+
+    python -m benchmarks.compound_check [--depth N]
+
+Each sample is tried whole and, if it is one line, cut to its first few
+words (short inputs are where a near-identity tool step most easily
+reads better than the text itself). Lines of multi-line samples are not
+tried alone: many are fragments ("LLL") no scorer should prefer. A
+sample fails if the best candidate is not its own module alone; failures
+are printed and the exit status is 1.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from module_loader import load_modules
+from helpers.codec import compound_detect
+
+from .corpus import parse_testing_codes
+
+# Words kept for the shortened form of each sample
+_PREFIX_WORDS = 4
+
+
+def _variants(code: str) -> List[str]:
+    """
+    `code` and, for a one-line code, its first _PREFIX_WORDS words, without
+    repeats.
+    """
+    forms = [code]
+    if "\n" not in code:
+        forms.append(" ".join(code.split()[:_PREFIX_WORDS]))
+    return list(dict.fromkeys(forms))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compound_check",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=2, help="max transforms per sequence (default: 2)")
+    args = parser.parse_args(argv)
+
+    modules = load_modules()
+    checked = 0
+    failures: List[str] = []
+    for sample in parse_testing_codes(module_names=list(modules)):
+        if not sample.module or modules[sample.module].composite:
+            continue
+        for code in _variants(sample.code):
+            found = compound_detect(modules, code, max_depth=args.depth, top_n=1)
+            checked += 1
+            if not found or found[0].steps != (sample.module,):
+                best = f"{' → '.join(found[0].steps)}: {found[0].text[:40]!r}" if found else "nothing"
+                failures.append(code)
+                print(f"FAIL {sample.module} {code[:30]!r}: best was {best}")
+
+    print(f"{checked} inputs, {len(failures)} not ranked as their one-step decode")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
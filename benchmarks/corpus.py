@@ -0,0 +1,93 @@
+# benchmarks/corpus.py
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from utils import project_root
+
+_TESTING_CODES = os.path.join(project_root(), "Codes for Testing.txt")
+
+# "-----Morse Code:-----" style section headers
+_HEADER_RE = re.compile(r"^-{3,}\s*([^-\s].*?)\s*:?\s*-{3,}$")
+
+# Section titles in "Codes for Testing.txt" that differ from the module name
+_MODULE_ALIASES: Dict[str, str] = {
+    "Keyboard Symbol": "Keyboard Symbol Cipher",
+    "Numdot Cipher": "Number-Dot Cipher",
+    "Binary-ASCII": "Binary to ASCII",
+    "Letter-Number": "Letter-Number Cipher",
+    "T9": "T9 Cipher",
+}
+
+
+class Sample:
+    """
+    One worked example from the test corpus: the section it sits in
+    ("Keyboard Symbol", "Caesar Cipher", …), the module that should decode it
+    (None for algorithmic/compound sections), the code and the expected
+    translation. Multi-line codes keep their newlines.
+    """
+
+    def __init__(self, section: str, module: Optional[str], code: str, translation: str):
+        self.section = section
+        self.module = module
+        self.code = code
+        self.translation = translation
+
+    def __repr__(self) -> str:
+        return f"Sample({self.section!r}, {self.code[:30]!r})"
+
+
+def parse_testing_codes(path: str = _TESTING_CODES, module_names: Optional[List[str]] = None) -> List[Sample]:
+    """
+    Turn the free-text "Codes for Testing.txt" into Samples. A section starts
+    at a "-----Name:-----" line; inside it, "Code:" and "Translation:" open a
+    field whose text is the rest of that line plus following lines, up to the
+    next field or header. Examples with an empty code are skipped.
+    `module_names` (e.g. the keys of load_modules()) is used to attach the
+    module a section belongs to.
+    """
+    known = set(module_names or [])
+    samples: List[Sample] = []
+    section: Optional[str] = None
+    field: Optional[str] = None
+    code: List[str] = []
+    translation: List[str] = []
+
+    def flush():
+        text = "\n".join(code).strip("\n")
+        if section and text.strip():
+            name = _MODULE_ALIASES.get(section, section)
+            samples.append(Sample(section, name if name in known else None, text, "\n".join(translation).strip()))
+        code.clear()
+        translation.clear()
+
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.rstrip("\r\n")
+            header = _HEADER_RE.match(line.strip())
+            if header:
+                flush()
+                section, field = header.group(1).strip(), None
+                continue
+            if line.strip().startswith("---"):
+                # Group banners ("ARG-Specific Module-Based Codes", …)
+                flush()
+                section, field = None, None
+                continue
+            if line.startswith("Code:"):
+                flush()
+                field = "code"
+                line = line[len("Code:"):]
+            elif line.startswith("Translation:"):
+                field = "translation"
+                line = line[len("Translation:"):]
+            if field == "code":
+                if line.strip():
+                    code.append(line.strip())
+            elif field == "translation":
+                if line.strip():
+                    translation.append(line.strip())
+        flush()
+    return samples
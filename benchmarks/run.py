@@ -0,0 +1,300 @@
+# benchmarks/run.py
+
+"""
+Time the codec hot paths on the test corpus and on synthetic inputs, and
+store the timings as a JSON baseline:
+
+    python -m benchmarks.run [--quick] [--only GROUP ...] [--repeat N]
+                             [--label NAME | --out FILE] [--compare BASELINE]
+                             [--threshold 1.25] [--outputs-only]
+
+Groups: tokenize, decode, encode, caesar, autodetect. Every case runs
+`--repeat` times on freshly compiled modules (so per-module word memos
+start cold) and the best and median wall times are recorded, along with
+the size and a hash of the case's output.
+
+Timings only mean something on the machine that took them, so none are
+kept in the repo: --label NAME writes benchmarks/baselines/NAME.json
+(default "local", git-ignored) to compare later runs against. The repo
+keeps benchmarks/baselines/reference.json instead, written with
+--outputs-only: output sizes and hashes, no timings.
+
+--compare takes a file or a label. Every case whose output differs from
+the baseline's is listed; if the baseline has timings, so is every case
+slower by more than --threshold (and by more than the noise floor).
+Either makes the exit status 1. Timings of a baseline taken on another
+platform or Python are not compared.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from utils import project_root
+from module_loader import load_modules
+from helpers.codec import CompiledModule, auto_detect, encode_message_with_module, tokenize_message_with_module
+from helpers.codec.decoder import _attempt_decode
+from tools import analyze_caesar_candidates
+
+from .corpus import parse_testing_codes
+from .synthetic import LENGTHS, caesar_inputs, module_inputs
+
+BASELINE_DIR = os.path.join(project_root(), "benchmarks", "baselines")
+DEFAULT_LABEL = "local"
+GROUPS = ("tokenize", "decode", "encode", "caesar", "autodetect")
+
+# Differences below this many seconds are treated as noise by --compare
+_NOISE_FLOOR = 0.002
+
+# Timed runs per case: best-of-N needs a few runs before it stops being noise
+_DEFAULT_REPEAT = 10
+
+# Digits floats are rounded to before hashing (libm may differ in the last bit)
+_FLOAT_DIGITS = 6
+
+# Encodings enumerated per encode case (the GUI's MAX_ENCODINGS)
+_ENCODE_LIMIT = 1000
+
+
+class Case:
+    """
+    One timed call. `setup()` builds fresh arguments outside the timed
+    region; `run(*args)` is what gets timed and should return something
+    sized (its len() is recorded as output_size).
+    """
+
+    def __init__(self, group: str, case_id: str, setup: Callable[[], tuple], run: Callable[..., Any]):
+        self.group = group
+        self.case_id = case_id
+        self.setup = setup
+        self.run = run
+
+
+def _fresh(cm: CompiledModule) -> Callable[[], CompiledModule]:
+    # New CompiledModule per repetition: no warm word cache or trie
+    return lambda: CompiledModule(cm.data, cm.name)
+
+
+def _cases(groups: List[str], lengths) -> Iterator[Case]:
+    modules = load_modules()
+    synthetic = list(module_inputs(modules, lengths))
+    corpus = [s for s in parse_testing_codes(module_names=list(modules)) if s.module]
+
+    for name, n_words, style, plain, cipher in synthetic:
+        fresh = _fresh(modules[name])
+        key = f"{name}|{style}|{n_words}w"
+        if "tokenize" in groups:
+            yield Case("tokenize", f"tokenize|{key}",
+                       lambda f=fresh, c=cipher: (f(), c), tokenize_message_with_module)
+        if "decode" in groups:
+            yield Case("decode", f"decode|{key}",
+                       lambda f=fresh, c=cipher: (f(), c),
+                       lambda cm, c: _attempt_decode(cm, c, None, False, None, None))
+        if "encode" in groups:
+            yield Case("encode", f"encode|{key}",
+                       lambda f=fresh, p=plain: (f(), p),
+                       lambda cm, p: encode_message_with_module(cm, p, ignore_case=True, limit=_ENCODE_LIMIT))
+
+    if "decode" in groups:
+        for i, sample in enumerate(corpus):
+            fresh = _fresh(modules[sample.module])
+            yield Case("decode", f"decode|corpus|{sample.module}|{i}",
+                       lambda f=fresh, c=sample.code: (f(), c),
+                       lambda cm, c: _attempt_decode(cm, c, None, False, None, None))
+
+    if "caesar" in groups:
+        for size, text in caesar_inputs([1_000, 100_000, 1_000_000]):
+            yield Case("caesar", f"caesar|{size}c", lambda t=text: (t,),
+                       lambda t: analyze_caesar_candidates(t, 5))
+
+    if "autodetect" in groups:
+        def all_fresh():
+            return {n: CompiledModule(cm.data, n) for n, cm in modules.items()}
+
+        inputs = [(f"corpus|{s.module}|{i}", s.code) for i, s in enumerate(corpus)]
+        inputs += [(f"{name}|{style}|{n}w", c) for name, n, style, _, c in synthetic
+                   if style == "spaced" and n == 4]
+        for label, cipher in inputs:
+            yield Case("autodetect", f"autodetect|{label}",
+                       lambda c=cipher: (all_fresh(), c),
+                       lambda mods, c: auto_detect(mods, c, flawed=False, jobs=1))
+
+
+def _canonical(obj: Any) -> Any:
+    """
+    `obj` as plain JSON data that is the same on every machine and run:
+    sets sorted, floats rounded.
+    """
+    if isinstance(obj, float):
+        return round(obj, _FLOAT_DIGITS)
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_canonical(v) for v in obj), key=repr)
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    return obj
+
+
+def _output_hash(out: Any) -> str:
+    data = json.dumps(_canonical(out), ensure_ascii=False, sort_keys=True, default=repr)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _time_case(case: Case, repeat: int, timed: bool = True) -> Dict[str, Any]:
+    times: List[float] = []
+    out: Any = None
+    for _ in range(repeat):
+        args = case.setup()
+        start = time.perf_counter()
+        out = case.run(*args)
+        times.append(time.perf_counter() - start)
+    result: Dict[str, Any] = {
+        "group": case.group,
+        "output_size": len(out) if hasattr(out, "__len__") else 0,
+        "output_hash": _output_hash(out),
+    }
+    if timed:
+        result.update(best=min(times), median=statistics.median(times), repeat=repeat)
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root(), capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _baseline_path(name: str) -> str:
+    """
+    `name` itself if it is an existing file or ends in .json, otherwise the
+    labelled baseline benchmarks/baselines/<name>.json.
+    """
+    if name.endswith(".json") or os.path.exists(name):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def _same_machine(meta: Dict[str, Any], baseline_meta: Dict[str, Any]) -> bool:
+    return all(meta.get(k) == baseline_meta.get(k) for k in ("platform", "python"))
+
+
+def _compare(
+    results: Dict[str, Dict],
+    meta: Dict[str, Any],
+    baseline_path: str,
+    threshold: float,
+    retime: Callable[[str], Dict[str, Any]]
+) -> List[str]:
+    """
+    List cases whose output changed, then (for a timed baseline from this
+    machine) print per-group speed ratios; return the ids of changed and
+    regressed cases. A case that looks slower is timed again with
+    `retime(case_id)` and only counts as regressed if it still is, so a
+    burst of load on the machine doesn't fail the run.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = baseline["results"]
+
+    regressions: List[str] = []
+    for case_id, res in results.items():
+        prev = old.get(case_id)
+        if prev is not None and prev.get("output_hash") not in (None, res["output_hash"]):
+            regressions.append(case_id)
+            print(f"CHANGED {case_id}: output size {prev['output_size']} → {res['output_size']}")
+
+    if not all("best" in r for r in results.values()) or not any("best" in r for r in old.values()):
+        return regressions
+    if not _same_machine(meta, baseline.get("meta", {})):
+        print("baseline timed on another platform or Python: timings not compared", file=sys.stderr)
+        return regressions
+
+    ratios: Dict[str, List[float]] = {}
+    for case_id, res in results.items():
+        prev = old.get(case_id)
+        if prev is None or prev.get("best", 0) <= 0:
+            continue
+        if res["best"] / prev["best"] > threshold:
+            again = retime(case_id)
+            res["best"] = min(res["best"], again["best"])
+        ratio = res["best"] / prev["best"]
+        ratios.setdefault(res["group"], []).append(ratio)
+        if ratio > threshold and res["best"] - prev["best"] > _NOISE_FLOOR:
+            regressions.append(case_id)
+            print(f"REGRESSION {case_id}: {prev['best'] * 1e3:.2f} ms → {res['best'] * 1e3:.2f} ms ({ratio:.2f}x)")
+
+    for group, rs in ratios.items():
+        print(f"{group:<11} {len(rs):4d} cases, median ratio {statistics.median(rs):.2f}x (new/baseline)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS), help="groups to run")
+    parser.add_argument("--quick", action="store_true", help="skip the longest synthetic messages")
+    parser.add_argument("--repeat", type=int, default=_DEFAULT_REPEAT,
+                        help=f"timed runs per case, best and median kept (default: {_DEFAULT_REPEAT})")
+    parser.add_argument("--label", default=DEFAULT_LABEL,
+                        help=f"write benchmarks/baselines/LABEL.json (default: {DEFAULT_LABEL})")
+    parser.add_argument("--out", help="baseline file to write instead of the labelled one")
+    parser.add_argument("--compare", help="baseline file, or label in benchmarks/baselines, to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--outputs-only", action="store_true",
+                        help="run each case once and keep only output sizes and hashes (as reference.json)")
+    args = parser.parse_args(argv)
+    repeat = 1 if args.outputs_only else args.repeat
+
+    lengths = LENGTHS[:-1] if args.quick else LENGTHS
+    results: Dict[str, Dict] = {}
+    cases: Dict[str, Case] = {}
+    start = time.perf_counter()
+    for case in _cases(args.only, lengths):
+        cases[case.case_id] = case
+        results[case.case_id] = _time_case(case, repeat, timed=not args.outputs_only)
+    elapsed = time.perf_counter() - start
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "label": args.label,
+            "commit": commit,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "groups": args.only,
+            "quick": args.quick,
+            "repeat": None if args.outputs_only else repeat,
+        },
+        "results": results,
+    }
+
+    # Compare before writing: the baseline may be the file about to be replaced
+    regressions: List[str] = []
+    if args.compare:
+        regressions = _compare(results, report["meta"], _baseline_path(args.compare), args.threshold,
+                               lambda case_id: _time_case(cases[case_id], repeat))
+
+    out = args.out or os.path.join(BASELINE_DIR, f"{args.label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False, sort_keys=True)
+    print(f"{len(results)} cases in {elapsed:.1f}s → {out}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# benchmarks/segmenter_check.py
+
+"""
+Check that the trie segmenter (helpers/codec/segmenter.py) returns exactly
+what the recursive startswith() decoder it replaced returned:
+
+    python -m benchmarks.segmenter_check [--quick]
+
+Every word of every tokenization of the test corpus and of the synthetic
+messages is decoded both ways, with flawed off and on, for each module
+without a chain. Outputs must be equal as lists, i.e. same plaintexts in
+the same order, including where _MAX_PATHS cuts them off. Mismatches are
+printed and the exit status is 1.
+"""
+
+import argparse
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from module_loader import load_modules
+from helpers.codec import tokenize_message_with_module
+from helpers.codec.segmenter import TokenTrie, segment_decode, _MAX_PATHS
+
+from .corpus import parse_testing_codes
+from .synthetic import LENGTHS, module_inputs
+
+# The reference recurses once per character; long run-on words need room
+_RECURSION_LIMIT = 20000
+
+
+def _reference_decode(
+    word: str,
+    mapping: Dict[str, List[str]],
+    flawed: bool,
+    memo: Dict[str, List[str]]
+) -> List[str]:
+    """
+    The pre-trie tokenizer._recursive_decode, kept verbatim as the oracle.
+    """
+    if word == "":
+        return [""]
+
+    if word in memo:
+        return memo[word]
+
+    results: List[str] = []
+    matched = False
+
+    for tok in mapping.keys():
+        if word.startswith(tok):
+            matched = True
+            suffix = word[len(tok):]
+            for plaintext_fragment in mapping[tok]:
+                for tail in _reference_decode(suffix, mapping, flawed, memo):
+                    results.append(plaintext_fragment + tail)
+                    if len(results) > _MAX_PATHS:
+                        memo[word] = results
+                        return results
+
+    if not matched and flawed:
+        first_char = word[0]
+        suffix = word[1:]
+        for tail in _reference_decode(suffix, mapping, flawed, memo):
+            results.append(first_char + tail)
+            if len(results) > _MAX_PATHS:
+                memo[word] = results
+                return results
+
+    memo[word] = results
+    return results
+
+
+def _words(cm, ciphers: List[str]) -> Set[str]:
+    """
+    Every token the tokenizer hands to the segmenter for `ciphers`.
+    """
+    words: Set[str] = set()
+    for cipher in ciphers:
+        for config in tokenize_message_with_module(cm, cipher):
+            for toks in config["cfg"]:
+                words.update(toks)
+    return words
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.segmenter_check",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="skip the longest synthetic messages")
+    args = parser.parse_args(argv)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), _RECURSION_LIMIT))
+
+    modules = load_modules()
+    lengths = LENGTHS[:-1] if args.quick else LENGTHS
+    ciphers: Dict[str, List[str]] = {name: [] for name in modules}
+    for sample in parse_testing_codes(module_names=list(modules)):
+        if sample.module:
+            ciphers[sample.module].append(sample.code)
+    for name, _, _, _, cipher in module_inputs(modules, lengths):
+        ciphers[name].append(cipher)
+
+    checked = truncated = skipped = 0
+    mismatches: List[Tuple[str, str, bool]] = []
+    for name in sorted(modules):
+        cm = modules[name]
+        if cm.chain is not None:
+            continue
+        trie = TokenTrie(cm.forward)
+        for word in sorted(_words(cm, ciphers[name])):
+            for flawed in (False, True):
+                try:
+                    expected = _reference_decode(word, cm.forward, flawed, {})
+                except RecursionError:
+                    skipped += 1
+                    continue
+                got = segment_decode(word, trie, cm.forward, flawed)
+                checked += 1
+                truncated += len(expected) > _MAX_PATHS
+                if got != expected:
+                    mismatches.append((name, word, flawed))
+                    print(f"MISMATCH {name} flawed={flawed} {word[:40]!r}: "
+                          f"{len(got)} vs {len(expected)} readings")
+
+    print(f"{checked} cases ({truncated} truncated at _MAX_PATHS, {skipped} too deep for the reference), "
+          f"{len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# benchmarks/startup.py
+
+"""
+Measure startup time in fresh interpreters and check it against a budget:
+
+    python -m benchmarks.startup [--repeat N] [--codec-budget MS]
+                                 [--gui-budget MS] [--out FILE]
+
+Cases:
+  - codec:    `import helpers.codec` (what pool workers and scripts pay)
+  - cli:      `import cli`
+  - registry: `load_modules()` with a warm compiled-module cache
+  - gui:      DecoderGUI() until the window is mapped and drawn (first
+              paint), and until modules and dictionary are loaded (ready);
+              skipped when no display is available
+
+Each case runs --repeat times in a new process; the best time is kept.
+Phase times are measured inside the child and exclude interpreter startup;
+`process` is the parent's wall time for the whole child, and the `python`
+case (an empty script) gives the interpreter's own share. The exit status
+is 1 if a case exceeds its budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils import project_root
+
+# Child scripts print a JSON dict {phase: milliseconds since the child's first line}
+_PRELUDE = "import time, json; _t0 = time.perf_counter()\n"
+_SCRIPTS = {
+    "python": "",  # interpreter startup alone (see its `process` time)
+    "codec": "import helpers.codec\n",
+    "cli": "import cli\n",
+    "registry": "from module_loader import load_modules\nload_modules()\n",
+    "gui": (
+        "import gui\n"
+        "app = gui.DecoderGUI()\n"
+        "app.wait_visibility()\n"
+        "app.update()\n"
+        "_out['first_paint'] = (time.perf_counter() - _t0) * 1e3\n"
+        "while not app.data_ready and (time.perf_counter() - _t0) < 30:\n"
+        "    app.update()\n"
+        "    time.sleep(0.005)\n"
+        "_out['ready'] = (time.perf_counter() - _t0) * 1e3\n"
+        "app.destroy()\n"
+    ),
+}
+
+
+def _run_child(case: str) -> Optional[Dict[str, float]]:
+    code = (
+        _PRELUDE + "_out = {}\n" + _SCRIPTS[case]
+        + "_out.setdefault('total', (time.perf_counter() - _t0) * 1e3)\n"
+        + "print(json.dumps(_out))\n"
+    )
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root(),
+        capture_output=True, text=True, timeout=120,
+    )
+    wall = (time.perf_counter() - start) * 1e3
+    if out.returncode != 0:
+        return None
+    phases = json.loads(out.stdout.strip().splitlines()[-1])
+    phases["process"] = wall
+    return phases
+
+
+def _have_display() -> bool:
+    try:
+        import tkinter
+        tkinter.Tk().destroy()
+    except Exception:
+        return False
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh processes per case (best kept)")
+    parser.add_argument("--codec-budget", type=float, default=100.0, help="ms allowed for codec and cli imports")
+    parser.add_argument("--gui-budget", type=float, default=500.0, help="ms allowed until the GUI's first paint")
+    parser.add_argument("--out", help="write the timings as JSON to FILE")
+    args = parser.parse_args(argv)
+
+    # Make sure the registry case measures a warm cache
+    _run_child("registry")
+
+    cases = ["python", "codec", "cli", "registry"]
+    if _have_display():
+        cases.append("gui")
+    else:
+        print("no display: skipping the gui case", file=sys.stderr)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for case in cases:
+        runs = [r for r in (_run_child(case) for _ in range(args.repeat)) if r is not None]
+        if not runs:
+            print(f"{case}: failed", file=sys.stderr)
+            continue
+        results[case] = {phase: min(r[phase] for r in runs) for phase in runs[0]}
+
+    budgets = {
+        ("codec", "total"): args.codec_budget,
+        ("cli", "total"): args.codec_budget,
+        ("gui", "first_paint"): args.gui_budget,
+    }
+    over = []
+    for case, phases in results.items():
+        for phase, ms in phases.items():
+            budget = budgets.get((case, phase))
+            mark = ""
+            if budget is not None:
+                mark = f"  (budget {budget:.0f} ms)"
+                if ms > budget:
+                    mark += "  OVER"
+                    over.append(f"{case}.{phase}")
+            print(f"{case:<9} {phase:<12} {ms:8.1f} ms{mark}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "budgets": {f"{c}.{p}": b for (c, p), b in budgets.items()}},
+                      f, indent=1)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/synthetic.py
+
+import random
+from typing import Dict, Iterator, List, Tuple
+
+from helpers.codec import CompiledModule, encode_message_with_module
+
+# Fixed vocabulary for synthetic plaintexts (upper-cased before encoding)
+_WORDS = [
+    "THE", "OF", "AND", "TO", "IN", "IS", "YOU", "THAT", "IT", "HE",
+    "WAS", "FOR", "ON", "ARE", "AS", "WITH", "HIS", "THEY", "AT", "BE",
+    "THIS", "HAVE", "FROM", "OR", "ONE", "HAD", "BY", "WORD", "BUT", "NOT",
+    "WHAT", "ALL", "WERE", "WHEN", "WE", "THERE", "CAN", "AN", "YOUR", "WHICH",
+    "SIGNAL", "CABIN", "GROW", "LISTEN", "BREACH", "SECURITY", "FEED", "WILL",
+]
+
+# Message lengths in plaintext words
+LENGTHS = (1, 4, 16, 64)
+
+# "spaced": words separated as the encoder would separate them.
+# "run-on": the same letters as one long word, so the decoder has to find
+# the token boundaries across the whole message (worst case for segmentation).
+AMBIGUITY = ("spaced", "run-on")
+
+
+def _alphabet(cm: CompiledModule) -> set:
+    """
+    Plaintext characters `cm` can encode (upper-cased), following chains
+    through their first mapping step (tool steps keep the alphabet).
+    """
+    while cm.chain is not None:
+        cm = next((step for step in cm.chain if step.tool is None), cm.chain[0])
+    return {ch.upper() for ch in cm.inverse if len(ch) == 1}
+
+
+def plaintext(n_words: int, style: str, alphabet: set, seed: int) -> str:
+    """
+    Deterministic plaintext of `n_words` vocabulary words that only uses
+    characters in `alphabet`.
+    """
+    rng = random.Random(seed)
+    usable = [w for w in _WORDS if set(w) <= alphabet]
+    if not usable:
+        # Modules with an unusual alphabet: words of its own characters
+        chars = sorted(alphabet - {" "}) or ["A"]
+        usable = ["".join(rng.choice(chars) for _ in range(4)) for _ in range(16)]
+    words = [rng.choice(usable) for _ in range(n_words)]
+    return ("" if style == "run-on" else " ").join(words)
+
+
+def module_inputs(
+    modules: Dict[str, CompiledModule],
+    lengths=LENGTHS,
+    seed: int = 1234
+) -> Iterator[Tuple[str, int, str, str, str]]:
+    """
+    Yield (module_name, n_words, style, plaintext, ciphertext) for every
+    module × length × ambiguity style. Ciphertexts are one reproducible
+    random encoding of the plaintext; combinations the module cannot
+    encode are left out.
+    """
+    for name in sorted(modules):
+        cm = modules[name]
+        alphabet = _alphabet(cm)
+        for n_words in lengths:
+            for style in AMBIGUITY:
+                plain = plaintext(n_words, style, alphabet, seed + n_words)
+                encoded = encode_message_with_module(cm, plain, ignore_case=True, sample=1, seed=seed)
+                if encoded:
+                    yield name, n_words, style, plain, encoded[0]
+
+
+def caesar_inputs(sizes: List[int], seed: int = 1234) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (size, text) of roughly `size` characters of shifted synthetic
+    English for the Caesar analysis benchmark.
+    """
+    from tools import caesar_translate
+
+    for size in sizes:
+        rng = random.Random(seed + size)
+        words: List[str] = []
+        length = 0
+        while length < size:
+            w = rng.choice(_WORDS)
+            words.append(w)
+            length += len(w) + 1
+        yield size, caesar_translate(" ".join(words), 7)
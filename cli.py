@@ -0,0 +1,172 @@
+# cli.py
+
+"""
+Headless entry point for batch decoding, e.g.
+
+    python cli.py decode --module "Morse Code" --jobs 4 messages.txt
+    cat captured.txt | python cli.py decode --flawed > results.jsonl
+    python cli.py decode --stats --trace run.json < slow.txt
+    python cli.py compound --depth 3 --top 5 layered.txt
+    python cli.py modules
+
+Every input line is one message. Results are written to stdout as JSON
+Lines, in input order; a throughput summary goes to stderr.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Iterator, List, Optional
+
+from module_loader import load_modules
+from helpers.codec.batch import decode_many, detect_many
+from helpers.codec.compound import DEFAULT_TOOLS, compound_detect
+from helpers.codec.scoring import CandidateScorer, top_k
+from helpers.codec.stats import DecodeStats
+
+
+def _read_messages(paths: List[str]) -> Iterator[str]:
+    """
+    Stream non-blank lines from the given files ("-" or none → stdin).
+    """
+    for path in paths or ["-"]:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if line.strip():
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def _remembering(messages: Iterator[str], seen: deque) -> Iterator[str]:
+    """
+    Pass messages through while queueing them, so each result (which comes
+    back in input order) can be paired with its message.
+    """
+    for msg in messages:
+        seen.append(msg)
+        yield msg
+
+
+def _cmd_decode(args: argparse.Namespace) -> int:
+    modules = load_modules()
+    jobs = args.jobs or os.cpu_count() or 1
+    limit = args.limit
+
+    seen: deque = deque()
+    messages = _remembering(_read_messages(args.files), seen)
+    want_stats = args.stats or args.trace or args.profile
+    stats = DecodeStats(profile=bool(args.profile)) if want_stats else None
+
+    if args.module:
+        if args.module not in modules:
+            print(f"error: unknown module {args.module!r} (see `cli.py modules`)", file=sys.stderr)
+            return 2
+        results = decode_many(modules[args.module], messages, args.flawed, jobs, stats)
+
+        def record(msg, res):
+            return {"message": msg, "module": args.module, "results": res[:limit]}
+    else:
+        results = detect_many(modules, messages, args.flawed, jobs, stats)
+
+        def record(msg, res):
+            return {"message": msg, "results": {name: cands[:limit] for name, cands in res}}
+
+    if args.top:
+        scorer = CandidateScorer()
+        per_message = record
+
+        def record(msg, res):
+            rec = per_message(msg, res)
+            detected = [(args.module, res)] if args.module else res
+            rec["top"] = [c._asdict() for c in top_k(scorer.score_batch(detected, msg), args.top)]
+            return rec
+
+    count = 0
+    start = time.perf_counter()
+    for res in results:
+        sys.stdout.write(json.dumps(record(seen.popleft(), res), ensure_ascii=False) + "\n")
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"decoded {count} messages in {elapsed:.2f}s ({rate:.1f} msg/s, {jobs} jobs)", file=sys.stderr)
+    if stats is not None:
+        if args.stats:
+            print(stats.summary(), file=sys.stderr)
+        if args.trace:
+            stats.write_chrome_trace(args.trace)
+        if args.profile:
+            stats.write_profile(args.profile)
+    return 0
+
+
+def _cmd_compound(args: argparse.Namespace) -> int:
+    modules = load_modules()
+    count = 0
+    start = time.perf_counter()
+    for msg in _read_messages(args.files):
+        found = compound_detect(
+            modules, msg, max_depth=args.depth, top_n=args.top, tools=args.tools,
+            time_limit=args.time_limit,
+        )
+        rec = {"message": msg, "results": [dict(c._asdict(), steps=list(c.steps)) for c in found]}
+        sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        print(f"searched {count} messages in {elapsed:.2f}s (depth {args.depth})", file=sys.stderr)
+    return 0
+
+
+def _cmd_modules(args: argparse.Namespace) -> int:
+    for name in sorted(load_modules()):
+        print(name)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Batch decoding without the GUI.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dec = sub.add_parser("decode", help="decode messages (one per line) to JSON Lines")
+    dec.add_argument("files", nargs="*", help="input files (default: stdin)")
+    dec.add_argument("--module", "-m", help="module name; omit to Auto-Detect across all modules")
+    dec.add_argument("--flawed", action="store_true", help="allow flawed decode when nothing decodes perfectly")
+    dec.add_argument("--jobs", "-j", type=int, default=1, help="worker processes (0 = one per CPU)")
+    dec.add_argument("--limit", type=int, default=None, help="max candidates written per module")
+    dec.add_argument("--top", type=int, default=0, metavar="K",
+                     help="also rank all candidates (accuracy, dictionary hits, fluency) and write the best K")
+    dec.add_argument("--quiet", "-q", action="store_true", help="no throughput summary on stderr")
+    dec.add_argument("--stats", action="store_true", help="print per-module/per-config decode stats on stderr")
+    dec.add_argument("--trace", metavar="FILE", help="write decode stats as a Chrome trace (chrome://tracing)")
+    dec.add_argument("--profile", metavar="FILE", help="write cProfile data of this process (pstats format)")
+    dec.set_defaults(func=_cmd_decode)
+
+    comp = sub.add_parser("compound", help="search layered codes (module/tool sequences) per message")
+    comp.add_argument("files", nargs="*", help="input files (default: stdin)")
+    comp.add_argument("--depth", "-d", type=int, default=2, help="max transforms per sequence")
+    comp.add_argument("--top", type=int, default=5, metavar="K", help="results written per message")
+    comp.add_argument("--tools", nargs="*", default=list(DEFAULT_TOOLS), help="tools tried between modules")
+    comp.add_argument("--time-limit", type=float, default=None, metavar="SECONDS",
+                      help="stop each search after this long")
+    comp.add_argument("--quiet", "-q", action="store_true", help="no summary on stderr")
+    comp.set_defaults(func=_cmd_compound)
+
+    mods = sub.add_parser("modules", help="list available module names")
+    mods.set_defaults(func=_cmd_modules)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# dictionary.py
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+# ─────────────────────────────────────────────────────────────────────────────
+# On-disk layout (all integers little-endian uint32):
+#
+#   magic "CDICT\0\0\1" | count | offsets[count + 1] | blob
+#
+# `blob` is every distinct upper-cased word as UTF-8, sorted bytewise and
+# concatenated; word i is blob[offsets[i]:offsets[i + 1]]. Bytewise order of
+# UTF-8 equals code-point order, so a plain binary search over the blob gives
+# membership and prefix queries without decoding anything.
+_MAGIC = b"CDICT\x00\x00\x01"
+_HEADER = struct.Struct("<8sI")
+
+
+def _pack(words: Iterable[str]) -> bytes:
+    """
+    Serialize words into the compact layout above.
+    """
+    encoded = sorted({w.strip().upper().encode("utf-8") for w in words if w.strip()})
+    offsets = [0]
+    for w in encoded:
+        offsets.append(offsets[-1] + len(w))
+    return (
+        _HEADER.pack(_MAGIC, len(encoded))
+        + struct.pack(f"<{len(offsets)}I", *offsets)
+        + b"".join(encoded)
+    )
+
+
+class CompactDictionary:
+    """
+    Read-only, sorted, packed word list. Backed by a memory-mapped file when
+    loaded with open(), so the pages are shared by every process that maps
+    the same file (the GUI, pool workers, the CLI) instead of each building
+    its own set. Lookups are O(log n) binary searches over the packed bytes;
+    words are compared upper-cased, like the old set of upper-cased lines.
+    """
+
+    def __init__(self, buf: Union[bytes, mmap.mmap], path: Optional[str] = None):
+        magic, count = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a compact dictionary file")
+        self.path = path
+        self._buf = buf
+        self._count = count
+        start = _HEADER.size
+        raw = memoryview(buf)[start:start + 4 * (count + 1)]
+        if sys.byteorder == "little" and array("I").itemsize == 4:
+            self._offsets = raw.cast("I")
+        else:
+            self._offsets = struct.unpack_from(f"<{count + 1}I", buf, start)
+        self._blob = start + 4 * (count + 1)
+
+    # ─── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "CompactDictionary":
+        """
+        In-memory dictionary (no file); used when the file cannot be written.
+        """
+        return cls(_pack(words))
+
+    @classmethod
+    def open(cls, path: str) -> "CompactDictionary":
+        """
+        Memory-map an existing compact dictionary file.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("empty compact dictionary file")
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, path)
+
+    @staticmethod
+    def build(source: str, target: str) -> None:
+        """
+        Pack the newline-separated word list `source` into `target`. The file
+        is written next to the target and renamed, so readers never see a
+        half-written dictionary.
+        """
+        with open(source, encoding="utf-8") as f:
+            data = _pack(f)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+    def __reduce__(self):
+        # mmaps do not pickle; a worker process re-maps the same file
+        if self.path is not None:
+            return (CompactDictionary.open, (self.path,))
+        return (CompactDictionary, (bytes(self._buf),))
+
+    # ─── queries ─────────────────────────────────────────────────────────────
+    def _word(self, i: int) -> bytes:
+        base = self._blob
+        return self._buf[base + self._offsets[i]:base + self._offsets[i + 1]]
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        key = word.upper().encode("utf-8")
+        i = self._lower_bound(key)
+        return i < self._count and self._word(i) == key
+
+    def has_prefix(self, prefix: str) -> bool:
+        """
+        True if some word starts with `prefix` (the empty prefix matches any
+        non-empty dictionary).
+        """
+        key = prefix.upper().encode("utf-8")
+        i = self._lower_bound(key)
+        return i < self._count and self._word(i).startswith(key)
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """
+        Words starting with `prefix`, in sorted order.
+        """
+        key = prefix.upper().encode("utf-8")
+        i = self._lower_bound(key)
+        while i < self._count:
+            w = self._word(i)
+            if not w.startswith(key):
+                return
+            yield w.decode("utf-8")
+            i += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._word(i).decode("utf-8")
+
+    def __repr__(self) -> str:
+        where = self.path or "memory"
+        return f"CompactDictionary({self._count} words, {where})"
+
+
+def load_compact(source: str, target: str) -> CompactDictionary:
+    """
+    Map `target`, (re)building it from `source` first when it is missing or
+    older than the word list. If the data directory is read-only the packed
+    dictionary is kept in memory instead. A missing `source` gives an empty
+    dictionary, matching the old behaviour.
+    """
+    have_source = os.path.exists(source)
+    if os.path.exists(target):
+        stale = have_source and os.path.getmtime(source) > os.path.getmtime(target)
+        if not stale:
+            try:
+                return CompactDictionary.open(target)
+            except (OSError, ValueError):
+                pass  # unreadable or corrupt: rebuild below
+    if not have_source:
+        return CompactDictionary.from_words(())
+    try:
+        CompactDictionary.build(source, target)
+        return CompactDictionary.open(target)
+    except OSError:
+        with open(source, encoding="utf-8") as f:
+            return CompactDictionary.from_words(f)
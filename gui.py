@@ -10,26 +10,82 @@ from module_loader import load_modules
 # Import helper UI classes
 from helpers.gui.progress_dialog import ProgressDialog
 from helpers.gui.result_frame import ResultFrame
-
-from helpers.codec import decode_message_with_module, multi_step_encode
-from tools import caesar_translate, analyze_caesar_candidates, keyshift_translate
+from helpers.gui.background import BackgroundTask
+from helpers.gui.stats_window import StatsWindow
+
+from helpers.codec import multi_step_encode, count_encodings, auto_detect, compound_detect, DetectPool, DecodeStats
+from helpers.codec.scoring import CandidateScorer
+from tools import (
+    caesar_translate, analyze_caesar_candidates,
+    keyshift_translate, analyze_keyshift_candidates, keyshift_layouts,
+    affine_keys, affine_decrypt, analyze_affine_candidates,
+    railfence_decrypt, analyze_railfence_candidates,
+)
 
 AUTO_DETECT = "<Auto-Detect>"
+# Cap on encodings listed per module
+MAX_ENCODINGS = 1000
+# Layered Auto-Detect: transforms stacked at most, seconds allowed, results listed
+COMPOUND_DEPTH = 3
+COMPOUND_TIME_LIMIT = 20.0
+COMPOUND_RESULTS = 10
 
 class DecoderGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Decoder")
 
-        # Load modules and dictionary
-        self.modules = load_modules()
-        self.dictionary_set = load_dictionary()
+        # Modules and dictionary are loaded by _load_data() once the window is
+        # up; until then module processing is unavailable (tools still work)
+        self.modules = {}
+        self.dictionary_set = frozenset()
+        self.scorer = None
+        self.data_ready = False
+        # Auto-Detect worker processes, kept for the whole session
+        self.detect_pool = None
 
         self.current_panel = "module"
         self.create_widgets()
 
         self.resizable(width=True, height=True)
         self.minsize(width=640, height=400)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after_idle(self._load_data)
+
+    def _load_data(self):
+        """
+        Load the module registry and the dictionary on a worker thread, then
+        fill the module dropdown. Modules are unpickled from the compiled
+        cache here too, so the first Process doesn't pay for it.
+        """
+        def work(task):
+            modules = load_modules()
+            for name in modules:
+                modules[name]
+            return modules, load_dictionary()
+
+        def on_done(result):
+            self.modules, self.dictionary_set = result
+            # Shared across runs so its dictionary-lookup cache stays warm
+            self.scorer = CandidateScorer(self.dictionary_set)
+            # Workers start on the first Auto-Detect that needs them
+            self.detect_pool = DetectPool(self.modules)
+            self.result_frame.dictionary_set = self.dictionary_set
+            self.module_sel.config(values=[AUTO_DETECT] + sorted(self.modules.keys()))
+            self.data_ready = True
+
+        def on_error(exc):
+            self.result_frame.display_plain_text(f"Loading modules failed: {exc}")
+
+        BackgroundTask(self, work, on_done=on_done, on_error=on_error).start()
+
+    def on_close(self):
+        """
+        Window closed: stop the Auto-Detect workers, then the app.
+        """
+        if self.detect_pool is not None:
+            self.detect_pool.close()
+        self.destroy()
 
     def create_widgets(self):
         paned = ttk.PanedWindow(self, orient="horizontal")
@@ -86,6 +142,22 @@ class DecoderGUI(tk.Tk):
         )
         flawed_cb.pack(side="left", padx=4, anchor="w", pady=(4, 0))
 
+        # Show per-module/per-config timings after each decode run
+        self.show_stats = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.module_frame,
+            text="Show decode stats",
+            variable=self.show_stats
+        ).pack(side="left", padx=4, anchor="w", pady=(4, 0))
+
+        # Auto-Detect also tries stacks of modules and Caesar/Keyshift
+        self.compound = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.module_frame,
+            text="Search layered codes",
+            variable=self.compound
+        ).pack(side="left", padx=4, anchor="w", pady=(4, 0))
+
         # Min Accuracy slider (shown only if flawed=True)
         self.minacc_frame = ttk.Frame(self.module_frame)
         self.minacc_frame.pack(fill="x", padx=4, pady=(8, 0))
@@ -114,7 +186,7 @@ class DecoderGUI(tk.Tk):
         ttk.Label(tool_sel_frame, text="Tool:").grid(row=0, column=0, padx=(0, 4))
         self.tool_sel = ttk.Combobox(
             tool_sel_frame,
-            values=["Caesar Cipher", "Keyshift Cipher"],
+            values=["Caesar Cipher", "Keyshift Cipher", "Affine Cipher", "Rail Fence Cipher"],
             state="readonly",
             width=16
         )
@@ -200,6 +272,159 @@ class DecoderGUI(tk.Tk):
         self.keyshift_entry.pack(side="left")
         self.keyshift_entry.bind("<Return>", lambda e: self._on_keyshift_entry())
 
+        # Layout picker (manual mode); auto analysis tries every layout
+        self.keyshift_layout_names = [name for name, _ in keyshift_layouts()]
+        self.keyshift_layout_sel = ttk.Combobox(
+            keyshift_entry_frame,
+            values=[label for _, label in keyshift_layouts()],
+            state="readonly",
+            width=10
+        )
+        if self.keyshift_layout_names:
+            self.keyshift_layout_sel.current(0)
+        self.keyshift_layout_sel.pack(side="left", padx=(10, 0))
+
+        self.keyshift_auto_btn = ttk.Button(
+            keyshift_entry_frame,
+            text="Auto Decrypt",
+            command=self._auto_decrypt_keyshift
+        )
+        self.keyshift_auto_btn.pack(side="right")
+
+        keyshift_mode_frame = ttk.Frame(self.keyshift_frame)
+        keyshift_mode_frame.pack(fill="x", pady=5)
+
+        self.keyshift_mode = tk.StringVar(value="manual")
+        ttk.Radiobutton(
+            keyshift_mode_frame,
+            text="Manual Shift",
+            variable=self.keyshift_mode,
+            value="manual",
+            command=self._update_keyshift_mode
+        ).pack(side="left", padx=5)
+        ttk.Radiobutton(
+            keyshift_mode_frame,
+            text="Auto Analysis",
+            variable=self.keyshift_mode,
+            value="auto",
+            command=self._update_keyshift_mode
+        ).pack(side="left", padx=5)
+        self._update_keyshift_mode()
+
+        # ───────── Affine sub-frame ─────────
+        self.affine_frame = ttk.Frame(self.other_frame)
+        self.affine_frame.grid(row=3, column=0, columnspan=2, sticky="we", padx=4)
+        self.affine_frame.grid_remove()
+
+        affine_key_frame = ttk.Frame(self.affine_frame)
+        affine_key_frame.pack(fill="x", expand=True, pady=(4, 0))
+
+        # Key (a, b) and modulus; a is picked from the values valid for the modulus
+        self.affine_a = tk.IntVar(value=1)
+        self.affine_b = tk.IntVar(value=0)
+        self.affine_modulus = tk.IntVar(value=26)
+        ttk.Label(affine_key_frame, text="a:").pack(side="left")
+        self.affine_a_sel = ttk.Combobox(affine_key_frame, textvariable=self.affine_a, state="readonly", width=4)
+        self.affine_a_sel.pack(side="left", padx=(2, 8))
+        ttk.Label(affine_key_frame, text="b:").pack(side="left")
+        self.affine_b_spin = tk.Spinbox(affine_key_frame, from_=0, to=25, textvariable=self.affine_b, width=4)
+        self.affine_b_spin.pack(side="left", padx=(2, 8))
+        ttk.Label(affine_key_frame, text="mod:").pack(side="left")
+        self.affine_mod_spin = tk.Spinbox(
+            affine_key_frame,
+            from_=2, to=26,
+            textvariable=self.affine_modulus,
+            width=4,
+            command=self._on_affine_modulus
+        )
+        self.affine_mod_spin.pack(side="left", padx=(2, 8))
+        self.affine_mod_spin.bind("<Return>", lambda e: self._on_affine_modulus())
+        self._on_affine_modulus()
+
+        self.affine_auto_btn = ttk.Button(
+            affine_key_frame,
+            text="Auto Decrypt",
+            command=self._auto_decrypt_affine
+        )
+        self.affine_auto_btn.pack(side="right")
+
+        affine_mode_frame = ttk.Frame(self.affine_frame)
+        affine_mode_frame.pack(fill="x", pady=5)
+
+        self.affine_mode = tk.StringVar(value="manual")
+        ttk.Radiobutton(
+            affine_mode_frame,
+            text="Manual Key",
+            variable=self.affine_mode,
+            value="manual",
+            command=self._update_affine_mode
+        ).pack(side="left", padx=5)
+        ttk.Radiobutton(
+            affine_mode_frame,
+            text="Auto Analysis",
+            variable=self.affine_mode,
+            value="auto",
+            command=self._update_affine_mode
+        ).pack(side="left", padx=5)
+        self._update_affine_mode()
+
+        # ───────── Rail fence sub-frame ─────────
+        self.railfence_frame = ttk.Frame(self.other_frame)
+        self.railfence_frame.grid(row=4, column=0, columnspan=2, sticky="we", padx=4)
+        self.railfence_frame.grid_remove()
+
+        railfence_key_frame = ttk.Frame(self.railfence_frame)
+        railfence_key_frame.pack(fill="x", expand=True, pady=(4, 0))
+
+        # Rails and the zigzag offset (0 … 2·(rails − 1) − 1)
+        self.railfence_rails = tk.IntVar(value=3)
+        self.railfence_offset = tk.IntVar(value=0)
+        ttk.Label(railfence_key_frame, text="Rails:").pack(side="left")
+        self.railfence_rails_spin = tk.Spinbox(
+            railfence_key_frame,
+            from_=2, to=100,
+            textvariable=self.railfence_rails,
+            width=4,
+            command=self._on_railfence_rails
+        )
+        self.railfence_rails_spin.pack(side="left", padx=(2, 8))
+        self.railfence_rails_spin.bind("<Return>", lambda e: self._on_railfence_rails())
+        ttk.Label(railfence_key_frame, text="Offset:").pack(side="left")
+        self.railfence_offset_spin = tk.Spinbox(
+            railfence_key_frame,
+            from_=0, to=3,
+            textvariable=self.railfence_offset,
+            width=4
+        )
+        self.railfence_offset_spin.pack(side="left", padx=(2, 8))
+
+        self.railfence_auto_btn = ttk.Button(
+            railfence_key_frame,
+            text="Auto Decrypt",
+            command=self._auto_decrypt_railfence
+        )
+        self.railfence_auto_btn.pack(side="right")
+
+        railfence_mode_frame = ttk.Frame(self.railfence_frame)
+        railfence_mode_frame.pack(fill="x", pady=5)
+
+        self.railfence_mode = tk.StringVar(value="manual")
+        ttk.Radiobutton(
+            railfence_mode_frame,
+            text="Manual Key",
+            variable=self.railfence_mode,
+            value="manual",
+            command=self._update_railfence_mode
+        ).pack(side="left", padx=5)
+        ttk.Radiobutton(
+            railfence_mode_frame,
+            text="Auto Analysis",
+            variable=self.railfence_mode,
+            value="auto",
+            command=self._update_railfence_mode
+        ).pack(side="left", padx=5)
+        self._update_railfence_mode()
+
 
         # ───────── Panel Switch (Modules, Algorithms) ─────────
         switch_frame = ttk.Frame(left_frame)
@@ -301,25 +526,90 @@ class DecoderGUI(tk.Tk):
             val = 10
         self.keyshift_shift.set(val)
 
+    def _update_keyshift_mode(self):
+        """
+        Enable/disable Keyshift slider and layout vs auto-analysis.
+        """
+        manual = self.keyshift_mode.get() == "manual"
+        self.keyshift_slider.config(state="normal" if manual else "disabled")
+        self.keyshift_entry.config(state="normal" if manual else "disabled")
+        self.keyshift_layout_sel.config(state="readonly" if manual else "disabled")
+        self.keyshift_auto_btn.config(state="disabled" if manual else "normal")
+
+    def _on_affine_modulus(self):
+        """
+        Clamp the Affine modulus and offer only the a values coprime with it.
+        """
+        try:
+            modulus = int(self.affine_mod_spin.get())
+        except ValueError:
+            modulus = 26
+        modulus = max(2, min(26, modulus))
+        self.affine_modulus.set(modulus)
+        a_values = sorted({a for a, _ in affine_keys(modulus)})
+        self.affine_a_sel.config(values=a_values)
+        if self.affine_a.get() not in a_values:
+            self.affine_a.set(a_values[0])
+        self.affine_b_spin.config(to=modulus - 1)
+        if self.affine_b.get() >= modulus:
+            self.affine_b.set(modulus - 1)
+
+    def _update_affine_mode(self):
+        """
+        Enable/disable the Affine key controls vs auto-analysis.
+        """
+        manual = self.affine_mode.get() == "manual"
+        self.affine_a_sel.config(state="readonly" if manual else "disabled")
+        self.affine_b_spin.config(state="normal" if manual else "disabled")
+        self.affine_auto_btn.config(state="disabled" if manual else "normal")
+
+    def _on_railfence_rails(self):
+        """
+        Clamp the rail count and limit the offset to one zigzag cycle.
+        """
+        try:
+            rails = int(self.railfence_rails_spin.get())
+        except ValueError:
+            rails = 3
+        rails = max(2, min(100, rails))
+        self.railfence_rails.set(rails)
+        cycle = 2 * (rails - 1)
+        self.railfence_offset_spin.config(to=cycle - 1)
+        if self.railfence_offset.get() >= cycle:
+            self.railfence_offset.set(cycle - 1)
+
+    def _update_railfence_mode(self):
+        """
+        Enable/disable the rail fence key controls vs auto-analysis.
+        """
+        manual = self.railfence_mode.get() == "manual"
+        self.railfence_rails_spin.config(state="normal" if manual else "disabled")
+        self.railfence_offset_spin.config(state="normal" if manual else "disabled")
+        self.railfence_auto_btn.config(state="disabled" if manual else "normal")
+
+    def _selected_keyshift_layout(self) -> str:
+        idx = self.keyshift_layout_sel.current()
+        if 0 <= idx < len(self.keyshift_layout_names):
+            return self.keyshift_layout_names[idx]
+        return self.keyshift_layout_names[0] if self.keyshift_layout_names else ""
+
     def _update_tool_options(self):
         """
-        Show/hide the Caesar vs Keyshift sub-frames
-        depending on which tool was selected in the Combobox.
+        Show only the sub-frame of the tool selected in the Combobox
+        (none if something unexpected appears).
         """
         selected = self.tool_sel.get()
-        if selected == "Caesar Cipher":
-            # Show Caesar UI, hide Keyshift UI
-            self.caesar_frame.grid()
-            self.keyshift_frame.grid_remove()
-        elif selected == "Keyshift Cipher":
-            # Show Keyshift UI, hide Caesar UI
-            self.caesar_frame.grid_remove()
-            self.keyshift_frame.grid()
-        else:
-            # Fallback: hide both if something unexpected appears
-            self.caesar_frame.grid_remove()
-            self.keyshift_frame.grid_remove()
-
+        frames = {
+            "Caesar Cipher": self.caesar_frame,
+            "Keyshift Cipher": self.keyshift_frame,
+            "Affine Cipher": self.affine_frame,
+            "Rail Fence Cipher": self.railfence_frame,
+        }
+        for name, frame in frames.items():
+            if name == selected:
+                frame.grid()
+            else:
+                frame.grid_remove()
 
     def _auto_decrypt_caesar(self):
         """
@@ -343,6 +633,83 @@ class DecoderGUI(tk.Tk):
             best_shift = candidates[0][0]
             self.caesar_shift.set(best_shift)
 
+    def _auto_decrypt_keyshift(self):
+        """
+        Run Keyshift auto-analysis over every layout & display in result_frame.
+        """
+        msg = self.msg_text.get("1.0", "end").strip()
+        if not msg:
+            self.result_frame.display_plain_text("No message to decrypt.")
+            return
+
+        labels = dict(keyshift_layouts())
+        lines = ["Running Keyshift auto-analysis…"]
+        candidates = analyze_keyshift_candidates(msg, 5)
+        for i, (layout, shift, plaintext, score) in enumerate(candidates, start=1):
+            lines.append(
+                f"--- Candidate #{i} (Layout: {labels.get(layout, layout)}, "
+                f"Shift: {shift}, Score: {score:.2f}) ---"
+            )
+            lines.append(plaintext)
+            lines.append("")  # blank
+
+        self.result_frame.display_plain_text("\n".join(lines))
+
+        if candidates:
+            best_layout, best_shift = candidates[0][0], candidates[0][1]
+            self.keyshift_shift.set(best_shift)
+            if best_layout in self.keyshift_layout_names:
+                self.keyshift_layout_sel.current(self.keyshift_layout_names.index(best_layout))
+
+    def _auto_decrypt_affine(self):
+        """
+        Run Affine auto-analysis over every key for the chosen modulus &
+        display in result_frame.
+        """
+        msg = self.msg_text.get("1.0", "end").strip()
+        if not msg:
+            self.result_frame.display_plain_text("No message to decrypt.")
+            return
+
+        modulus = self.affine_modulus.get()
+        lines = [f"Running Affine cipher auto-analysis (mod {modulus})…"]
+        candidates = analyze_affine_candidates(msg, 5, modulus)
+        for i, (a, b, plaintext, score) in enumerate(candidates, start=1):
+            lines.append(f"--- Candidate #{i} (a: {a}, b: {b}, Score: {score:.2f}) ---")
+            lines.append(plaintext)
+            lines.append("")  # blank
+
+        self.result_frame.display_plain_text("\n".join(lines))
+
+        if candidates:
+            self.affine_a.set(candidates[0][0])
+            self.affine_b.set(candidates[0][1])
+
+    def _auto_decrypt_railfence(self):
+        """
+        Run rail fence auto-analysis over every rail count and offset &
+        display in result_frame.
+        """
+        # Not stripped: every character, spaces included, holds a position
+        msg = self.msg_text.get("1.0", "end-1c")
+        if not msg.strip():
+            self.result_frame.display_plain_text("No message to decrypt.")
+            return
+
+        lines = ["Running Rail fence cipher auto-analysis…"]
+        candidates = analyze_railfence_candidates(msg, 5)
+        for i, (rails, offset, plaintext, score) in enumerate(candidates, start=1):
+            lines.append(f"--- Candidate #{i} (Rails: {rails}, Offset: {offset}, Score: {score:.2f}) ---")
+            lines.append(plaintext)
+            lines.append("")  # blank
+
+        self.result_frame.display_plain_text("\n".join(lines))
+
+        if candidates:
+            self.railfence_rails.set(candidates[0][0])
+            self._on_railfence_rails()
+            self.railfence_offset.set(candidates[0][1])
+
     def _toggle_min_acc_visibility(self):
         """
         Hide/show the Min Accuracy slider when “Allow flawed decode” toggles.
@@ -355,8 +722,9 @@ class DecoderGUI(tk.Tk):
     def _process_message(self):
         """
         Called when “Process” is clicked. Handles Module decode/encode
-        or Caesar. For Auto-Detect, pops up ProgressDialog with Cancel/Skip.
-        Finally groups results into result_frame.
+        or Caesar. Module decoding (single or Auto-Detect) runs on a worker
+        thread behind a ProgressDialog with Cancel/Skip; results are then
+        grouped into result_frame.
         """
         raw_msg = self.msg_text.get("1.0", "end").strip()
         if not raw_msg:
@@ -379,9 +747,29 @@ class DecoderGUI(tk.Tk):
                     return
 
             elif tool_choice == "Keyshift Cipher":
-                # Always a manual Keyshift
+                if self.keyshift_mode.get() == "auto":
+                    self._auto_decrypt_keyshift()
+                    return
                 shift = self.keyshift_shift.get()
-                outputs = [keyshift_translate(raw_msg, shift)]
+                outputs = [keyshift_translate(raw_msg, shift, self._selected_keyshift_layout())]
+                self.result_frame.display_plain_text("\n\n".join(outputs))
+                return
+
+            elif tool_choice == "Affine Cipher":
+                if self.affine_mode.get() == "auto":
+                    self._auto_decrypt_affine()
+                    return
+                a, b, modulus = self.affine_a.get(), self.affine_b.get(), self.affine_modulus.get()
+                outputs = [affine_decrypt(raw_msg, a, b, modulus)]
+                self.result_frame.display_plain_text("\n\n".join(outputs))
+                return
+
+            elif tool_choice == "Rail Fence Cipher":
+                if self.railfence_mode.get() == "auto":
+                    self._auto_decrypt_railfence()
+                    return
+                exact_msg = self.msg_text.get("1.0", "end-1c")
+                outputs = [railfence_decrypt(exact_msg, self.railfence_rails.get(), self.railfence_offset.get())]
                 self.result_frame.display_plain_text("\n\n".join(outputs))
                 return
 
@@ -390,127 +778,147 @@ class DecoderGUI(tk.Tk):
                 self.result_frame.display_plain_text("No tool selected.")
                 return
         # ==== MODULE PATH ====
+        if not self.data_ready:
+            self.result_frame.display_plain_text("Modules are still loading…")
+            return
+
         mod_name     = self.module_sel.get()
         flawed_allowed = self.flawed.get()
         min_acc_pct    = self.min_accuracy.get() / 100.0
 
         if self.direction.get() == "encode":
-            # ENCODING
+            # ENCODING (bounded: ambiguous modules can have billions of outputs)
             if mod_name == AUTO_DETECT:
-                for name, data in self.modules.items():
-                    encs = multi_step_encode(data, raw_msg)
-                    outputs += [f"[{name}] {enc}" for enc in encs]
+                targets = list(self.modules.items())
             else:
                 data = self.modules.get(mod_name)
-                if data:
-                    encs = multi_step_encode(data, raw_msg)
-                    outputs = [f"[{mod_name}] {enc}" for enc in encs]
+                targets = [(mod_name, data)] if data else []
+
+            for name, data in targets:
+                encs = multi_step_encode(data, raw_msg, limit=MAX_ENCODINGS)
+                outputs += [f"[{name}] {enc}" for enc in encs]
+                if len(encs) == MAX_ENCODINGS:
+                    # Chains can only be counted by walking them: cap the walk
+                    cap = MAX_ENCODINGS + 1 if data.composite else None
+                    total = count_encodings(data, raw_msg, limit=cap)
+                    if total == cap:
+                        outputs.append(f"[{name}] … more encodings not shown")
+                    elif total > MAX_ENCODINGS:
+                        outputs.append(f"[{name}] … {total - MAX_ENCODINGS:,} more encodings not shown")
 
             self.result_frame.display_plain_text("\n\n".join(outputs) if outputs else "No results.")
             return
 
         # ===== DECODING =====
+        if mod_name == AUTO_DETECT and self.compound.get():
+            self._start_compound(raw_msg)
+            return
         if mod_name == AUTO_DETECT:
-            total_mods = len(self.modules)
-            prog_dialog = ProgressDialog(self, total_mods)
-
-            perfect_outputs = []
-            # 1) Perfect-decode pass (collect all)
-            for idx, (name, data) in enumerate(self.modules.items(), start=1):
-                if prog_dialog.cancel_flag.cancel:
-                    break
-                if prog_dialog.skip_flag.skip:
-                    prog_dialog.skip_flag.skip = False
-                    continue
-
-                prog_dialog.update_module_phase(idx, name)
-
-                candidate_list = decode_message_with_module(
-                    data,
-                    raw_msg,
-                    flawed=False,
-                    min_accuracy=min_acc_pct,
-                    progress_callback=lambda stage, m_i, t_m, pct, m_name, _idx=idx, _tm=total_mods, _name=name:
-                        prog_dialog.update_permutation_phase(
-                            pct if stage == "PermutationsPhase"
-                            else ((_idx / _tm) * 100.0),
-                            _name
-                        ),
-                    skip_flag=prog_dialog.skip_flag
-                )
-
-                if prog_dialog.skip_flag.skip:
-                    prog_dialog.skip_flag.skip = False
-                    continue
-
-                if candidate_list:
-                    perfect_outputs += [f"[{name}] {txt}" for txt in candidate_list]
-
-            # If any perfect found, use them
-            if perfect_outputs:
-                outputs = perfect_outputs
-            elif flawed_allowed and not prog_dialog.cancel_flag.cancel:
-                # 2) Flawed-decode pass (collect all)
-                for idx, (name, data) in enumerate(self.modules.items(), start=1):
-                    if prog_dialog.cancel_flag.cancel:
-                        break
-                    if prog_dialog.skip_flag.skip:
-                        prog_dialog.skip_flag.skip = False
-                        continue
-
-                    prog_dialog.update_module_phase(idx, name)
-
-                    candidate_list = decode_message_with_module(
-                        data,
-                        raw_msg,
-                        flawed=True,
-                        min_accuracy=min_acc_pct,
-                        progress_callback=lambda stage, m_i, t_m, pct, m_name, _idx=idx, _tm=total_mods, _name=name:
-                            prog_dialog.update_permutation_phase(
-                                pct if stage == "PermutationsPhase"
-                                else ((_idx / _tm) * 100.0),
-                                _name
-                            ),
-                        skip_flag=prog_dialog.skip_flag
-                    )
-
-                    if prog_dialog.skip_flag.skip:
-                        prog_dialog.skip_flag.skip = False
-                        continue
-
-                    if candidate_list:
-                        outputs += [f"[{name}] {txt}" for txt in candidate_list]
+            targets = self.modules
+        else:
+            data = self.modules.get(mod_name)
+            if not data:
+                self.result_frame.display_plain_text("No results.")
+                return
+            targets = {mod_name: data}
 
+        self._start_decode(targets, raw_msg, flawed_allowed, min_acc_pct)
+
+    def _start_decode(self, targets, raw_msg: str, flawed_allowed: bool, min_acc_pct: float):
+        """
+        Decode `raw_msg` with every module in `targets` on a worker thread.
+        The Tk thread only drains progress/results, so the window keeps
+        redrawing and the dialog's Cancel/Skip stay responsive.
+        """
+        stats = DecodeStats() if self.show_stats.get() else None
+        # Module → lattice readings left out (only the beam top-k is shown)
+        pruned = {}
+
+        def work(task):
+            # Perfect pass over every module, then a flawed pass if nothing matched
+            detected = auto_detect(
+                targets,
+                raw_msg,
+                flawed=flawed_allowed,
+                progress_callback=task.report,
+                cancel_flag=task.cancel_event,
+                skip_flag=task.skip_event,
+                stats=stats,
+                pool=self.detect_pool,
+                pruned=pruned
+            )
+            # Score on the worker too; pass raw_msg so pass-through is demoted
+            return self.scorer.score_batch(detected, raw_msg, min_acc_pct)
+
+        def on_progress(stage, m_idx, t_m, pct, m_name):
+            # The prefilter may leave fewer modules to try than were selected
+            prog_dialog.total_modules = t_m
+            if stage == "ModulePhase":
+                prog_dialog.update_module_phase(m_idx, m_name)
+            else:
+                prog_dialog.update_permutation_phase(pct, m_name)
+
+        def finish():
             prog_dialog.close()
+            self.go_button.config(state="normal")
+            if stats is not None:
+                StatsWindow(self, stats)
 
-        else:
-            # Single module chosen
-            data = self.modules.get(mod_name)
-            if data:
-                perfect_list = decode_message_with_module(
-                    data,
-                    raw_msg,
-                    flawed=False,
-                    min_accuracy=min_acc_pct,
-                    progress_callback=None,
-                    skip_flag=None
-                )
-                if perfect_list:
-                    outputs += [f"[{mod_name}] {txt}" for txt in perfect_list]
-                elif flawed_allowed:
-                    flawed_list = decode_message_with_module(
-                        data,
-                        raw_msg,
-                        flawed=True,
-                        min_accuracy=min_acc_pct,
-                        progress_callback=None,
-                        skip_flag=None
-                    )
-                    outputs += [f"[{mod_name}] {txt}" for txt in flawed_list]
-
-        if not outputs:
-            self.result_frame.display_plain_text("No results.")
-            return
+        def on_done(scored):
+            finish()
+            self.result_frame.display_scored(scored, pruned)
+
+        def on_error(exc):
+            finish()
+            self.result_frame.display_plain_text(f"Decoding failed: {exc}")
 
-        # Pass raw_msg so pass-through is demoted
-        self.result_frame.display_grouped_results(outputs, min_acc_pct, raw_msg)
\ No newline at end of file
+        task = BackgroundTask(self, work, on_progress=on_progress, on_done=on_done, on_error=on_error)
+        prog_dialog = ProgressDialog(self, len(targets), task.cancel_event, task.skip_event)
+        self.go_button.config(state="disabled")
+        task.start()
+
+    def _start_compound(self, raw_msg: str):
+        """
+        Layered Auto-Detect (compound_detect) on a worker thread: chains of
+        up to COMPOUND_DEPTH modules and Caesar/Keyshift steps, stopped by
+        Cancel or after COMPOUND_TIME_LIMIT seconds.
+        """
+        def work(task):
+            return compound_detect(
+                self.modules,
+                raw_msg,
+                max_depth=COMPOUND_DEPTH,
+                top_n=COMPOUND_RESULTS,
+                time_limit=COMPOUND_TIME_LIMIT,
+                cancel_flag=task.cancel_event,
+                progress_callback=task.report,
+            )
+
+        def on_progress(stage, n, total, pct, steps):
+            prog_dialog.update_status(f"[{n}/{total}] Expanding: {steps}", pct)
+
+        def finish():
+            prog_dialog.close()
+            self.go_button.config(state="normal")
+
+        def on_done(found):
+            finish()
+            if not found:
+                self.result_frame.display_plain_text("No results.")
+                return
+            lines = ["Layered Auto-Detect (best first):"]
+            for i, c in enumerate(found, start=1):
+                lines.append(f"--- Candidate #{i} ({' → '.join(c.steps)}, Score: {c.score:.2f}) ---")
+                lines.append(c.text)
+                lines.append("")  # blank
+            self.result_frame.display_plain_text("\n".join(lines))
+
+        def on_error(exc):
+            finish()
+            self.result_frame.display_plain_text(f"Decoding failed: {exc}")
+
+        task = BackgroundTask(self, work, on_progress=on_progress, on_done=on_done, on_error=on_error)
+        # compound_detect has no per-module step to skip; Cancel keeps what was found
+        prog_dialog = ProgressDialog(self, COMPOUND_DEPTH, task.cancel_event, skippable=False)
+        self.go_button.config(state="disabled")
+        task.start()
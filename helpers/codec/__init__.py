@@ -1,16 +1,46 @@
 # helpers/codec/__init__.py
 
-from .decoder import decode_message_with_module, _attempt_decode
-from .encoder import encode_message_with_module
+from .compiled import CompiledModule, compile_module
+from .stats import DecodeStats
+from .decoder import decode_message_with_module, decode_lattices_with_module, _attempt_decode
+from .lattice import DecodeLattice
+from .beam import beam_decode, DictionaryScorer
+from .prefilter import ModulePrefilter
+from .autodetect import DetectPool, auto_detect
+from .batch import decode_many, detect_many
+from .scoring import CandidateScorer, ScoredCandidate, score_results, top_k
+from .encoder import encode_message_with_module, iter_encodings, count_encodings
 from .tokenizer import tokenize_message_with_module
+from .chain import multi_step_decode, iter_chain_decodings
+from .compound import compound_detect, CompoundCandidate
 
-multi_step_decode = decode_message_with_module
 multi_step_encode = encode_message_with_module
 
 __all__ = [
+    "CompiledModule",
+    "compile_module",
+    "DecodeStats",
+    "DecodeLattice",
+    "DictionaryScorer",
+    "beam_decode",
     "decode_message_with_module",
+    "decode_lattices_with_module",
+    "ModulePrefilter",
+    "auto_detect",
+    "DetectPool",
+    "compound_detect",
+    "CompoundCandidate",
+    "decode_many",
+    "detect_many",
+    "CandidateScorer",
+    "ScoredCandidate",
+    "score_results",
+    "top_k",
     "encode_message_with_module",
+    "iter_encodings",
+    "count_encodings",
     "tokenize_message_with_module",
     "multi_step_decode",
+    "iter_chain_decodings",
     "multi_step_encode",
 ]
@@ -0,0 +1,391 @@
+# helpers/codec/autodetect.py
+
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+from .compiled import CompiledModule, compile_module
+from .prefilter import ModulePrefilter
+from .stats import ConfigStats, DecodeStats, active_stats
+from .decoder import ProgressCallback, _config_lattice, expand_lattice, _flag_is_set, _reset_flag
+from .tokenizer import tokenize_message_with_module, _MAX_PATHS
+
+# concurrent.futures (and multiprocessing behind it) is imported only when a
+# pool is actually started; it dominates the package's import time otherwise
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+# Auto-detect results: (module_name, candidates), in module order
+DetectResults = List[Tuple[str, List[str]]]
+
+# Readings of one decoded config: (candidates, lattice readings they were
+# cut from, or 0 when the lattice was expanded whole)
+ConfigResult = Tuple[List[str], int]
+
+# How often (seconds) the pool driver wakes up to check cancel/skip
+_POLL_INTERVAL = 0.05
+
+# Compiled modules of the current pool worker (filled in by _init_worker)
+_WORKER_MODULES: Dict[str, CompiledModule] = {}
+
+
+def _init_worker(modules: Dict[str, CompiledModule]) -> None:
+    global _WORKER_MODULES
+    _WORKER_MODULES = modules
+
+
+def _pool_context():
+    """
+    multiprocessing context for decode pools: "forkserver" where available,
+    else "spawn". Pools may be started from a worker thread of a
+    multithreaded process (the GUI), where plain fork can deadlock the
+    child on a lock some other thread was holding.
+    """
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _start_executor(jobs: int, compiled: Dict[str, CompiledModule]) -> Optional["ProcessPoolExecutor"]:
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        return ProcessPoolExecutor(
+            max_workers=jobs, mp_context=_pool_context(),
+            initializer=_init_worker, initargs=(compiled,),
+        )
+    except (OSError, NotImplementedError, ImportError, ValueError):
+        # No usable multiprocessing here (e.g. missing sem_open); stay serial
+        return None
+
+
+class DetectPool:
+    """
+    A process pool kept alive across auto_detect() runs, so the workers
+    start (and receive `modules`) once instead of on every run. Workers are
+    only started by the first run that has more than one module left to
+    decode. Pass it as auto_detect(pool=...) for subsets of `modules`, and
+    close() it when done (the GUI does on exit).
+    """
+
+    def __init__(self, modules: Mapping[str, "dict[str, Any] | CompiledModule"], jobs: Optional[int] = None):
+        self.modules = {name: compile_module(m, name) for name, m in modules.items()}
+        self.jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+        self._executor: Optional["ProcessPoolExecutor"] = None
+        self._failed = False
+
+    def covers(self, compiled: Mapping[str, CompiledModule]) -> bool:
+        """
+        True if every module of `compiled` is one the workers were given.
+        """
+        return all(self.modules.get(name) is cm for name, cm in compiled.items())
+
+    def executor(self) -> Optional["ProcessPoolExecutor"]:
+        """
+        The running executor, started on first use; None if jobs <= 1 or no
+        pool can be started here.
+        """
+        if self._executor is None and not self._failed and self.jobs > 1:
+            self._executor = _start_executor(self.jobs, self.modules)
+            self._failed = self._executor is None
+        return self._executor
+
+    def close(self) -> None:
+        """
+        Stop the workers; queued tasks are dropped. The pool may be reused
+        afterwards (it starts again on demand).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _decode_config(
+    cm: CompiledModule,
+    message: str,
+    cfg_index: int,
+    flawed: bool,
+    skip_flag: Optional[Any] = None
+) -> ConfigResult:
+    """
+    Decode one tokenization config of `cm` and expand it to candidates; a
+    lattice over the expansion limit gives its beam top-k and its count.
+    Chain and tool modules have a single "config": the whole chain decode.
+    """
+    if cm.composite:
+        from .chain import multi_step_decode
+        return multi_step_decode(cm, message, flawed, skip_flag=skip_flag), 0
+    conf = tokenize_message_with_module(cm, message)[cfg_index]
+    stats = active_stats()
+    rec = stats.begin(cm.name, cfg_index, flawed) if stats is not None else None
+    lattice = _config_lattice(cm, conf, flawed, skip_flag=skip_flag)
+    if rec is not None:
+        stats.end(rec, lattice)
+    if lattice is None:
+        return [], 0
+    total = lattice.count()
+    return expand_lattice(lattice), (total if total > _MAX_PATHS else 0)
+
+
+def _worker_decode_config(
+    name: str,
+    message: str,
+    cfg_index: int,
+    flawed: bool,
+    collect: bool = False
+) -> Tuple[ConfigResult, List[ConfigStats]]:
+    """
+    Pool task: decode one config; with collect=True, also return the
+    ConfigStats recorded for it so the caller can merge them.
+    """
+    if not collect:
+        return _decode_config(_WORKER_MODULES[name], message, cfg_index, flawed), []
+    stats = DecodeStats()
+    with stats.activate():
+        result = _decode_config(_WORKER_MODULES[name], message, cfg_index, flawed)
+    return result, stats.configs
+
+
+def _config_count(cm: CompiledModule, message: str) -> int:
+    """
+    Tasks `cm` is split into for `message`: one per tokenization config.
+    """
+    return 1 if cm.composite else len(tokenize_message_with_module(cm, message))
+
+
+def _merge(per_config: Dict[int, ConfigResult]) -> ConfigResult:
+    """
+    Join config results in config order, dropping duplicates, and add up
+    the readings of the lattices that were cut.
+    """
+    merged: Dict[str, None] = {}
+    readings = 0
+    for cfg_index in sorted(per_config):
+        cands, cut = per_config[cfg_index]
+        readings += cut
+        for cand in cands:
+            merged.setdefault(cand, None)
+    return list(merged), readings
+
+
+def auto_detect(
+    modules: Mapping[str, "dict[str, Any] | CompiledModule"],
+    message: str,
+    flawed: bool = False,
+    jobs: Optional[int] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    cancel_flag: Optional[Any] = None,
+    skip_flag: Optional[Any] = None,
+    prefilter: bool = True,
+    stats: Optional[DecodeStats] = None,
+    pool: Optional[DetectPool] = None,
+    pruned: Optional[Dict[str, int]] = None
+) -> DetectResults:
+    """
+    Decode `message` with every module. Runs a perfect pass over all modules
+    first; only if that finds nothing and flawed=True, a flawed pass follows.
+
+    With jobs > 1 (default: one per CPU) a pass over more than one module
+    is spread over a process pool, one task per (module, tokenization
+    config); a pass the prefilter leaves with a single module runs here.
+    The pool is `pool` (a DetectPool over a superset of `modules`, jobs
+    taken from it) or else one started for this call. Results are merged
+    in module order and config order, so the output never depends on which
+    worker finished first.
+
+    progress_callback gets ("ModulePhase", idx, total, percent, name) when a
+    module becomes the one being reported on, and ("PermutationsPhase", idx,
+    total, percent, name) as its configs finish.
+    Raising cancel_flag stops the whole run (finished modules are returned);
+    raising skip_flag drops the module currently reported on and lowers it
+    again. Flags may be threading.Event objects or SimpleNamespace-style
+    objects with a boolean .cancel / .skip.
+
+    With prefilter=True, one ModulePrefilter scan first rejects modules that
+    cannot tokenize the message (perfect pass) or whose tokens cover none of
+    it (flawed pass), before any decoding work is scheduled.
+
+    If `stats` is given, every decoded (module, config) is recorded into it,
+    including configs decoded in pool workers, plus the modules the
+    prefilter rejected.
+
+    A lattice with more than _MAX_PATHS readings only contributes its beam
+    top-k (see expand_lattice). If `pruned` is given, it is filled with
+    module name → readings of that module's cut lattices, so callers can
+    say how much was left out.
+    """
+    if stats is not None:
+        with stats.activate():
+            return auto_detect(
+                modules, message, flawed, jobs, progress_callback,
+                cancel_flag, skip_flag, prefilter, pool=pool, pruned=pruned,
+            )
+
+    compiled = {name: compile_module(m, name) for name, m in modules.items()}
+    perfect_mods, flawed_mods = compiled, compiled
+    if prefilter:
+        verdict = ModulePrefilter(compiled).scan(message)
+        perfect_mods = {n: cm for n, cm in compiled.items() if n in verdict.perfect}
+        flawed_mods = {n: cm for n, cm in compiled.items() if verdict.coverage[n] > 0.0}
+        collector = active_stats()
+        if collector is not None:
+            collector.rejected([n for n in compiled if n not in verdict.perfect])
+    if pool is not None and not pool.covers(compiled):
+        pool = None
+    if pool is not None:
+        jobs = pool.jobs
+    elif jobs is None:
+        jobs = os.cpu_count() or 1
+
+    # Started by the first pass that has more than one module to decode
+    owned: Optional["ProcessPoolExecutor"] = None
+    results: DetectResults = []
+    try:
+        for pass_flawed, mods in ((False, perfect_mods), (True, flawed_mods)):
+            if pass_flawed and (results or not flawed or _flag_is_set(cancel_flag, "cancel")):
+                break
+            executor = None
+            if jobs > 1 and len(mods) > 1:
+                if pool is not None:
+                    executor = pool.executor()
+                else:
+                    owned = owned or _start_executor(jobs, compiled)
+                    executor = owned
+            run_pass = _run_pool_pass if executor is not None else _run_serial_pass
+            results, readings = run_pass(
+                executor, mods, message, pass_flawed, progress_callback, cancel_flag, skip_flag
+            )
+            if pruned is not None:
+                pruned.clear()
+                pruned.update(readings)
+    finally:
+        if owned is not None:
+            # Queued tasks are dropped; at most one config per worker still runs
+            owned.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def _run_serial_pass(
+    executor: None,
+    compiled: Dict[str, CompiledModule],
+    message: str,
+    flawed: bool,
+    progress_callback: Optional[ProgressCallback],
+    cancel_flag: Optional[Any],
+    skip_flag: Optional[Any]
+) -> Tuple[DetectResults, Dict[str, int]]:
+    """
+    One pass over all modules in this process. Returns the results and the
+    readings of cut lattices per module (see auto_detect's `pruned`).
+    """
+    results: DetectResults = []
+    pruned: Dict[str, int] = {}
+    total = len(compiled)
+    for idx, (name, cm) in enumerate(compiled.items(), start=1):
+        if _flag_is_set(cancel_flag, "cancel"):
+            break
+        if progress_callback:
+            progress_callback("ModulePhase", idx, total, (idx / total) * 100.0, name)
+
+        n_cfgs = _config_count(cm, message)
+        per_config: Dict[int, ConfigResult] = {}
+        for cfg_index in range(n_cfgs):
+            if _flag_is_set(skip_flag, "skip") or _flag_is_set(cancel_flag, "cancel"):
+                break
+            if progress_callback:
+                progress_callback("PermutationsPhase", idx, total, (cfg_index / n_cfgs) * 100.0, name)
+            per_config[cfg_index] = _decode_config(cm, message, cfg_index, flawed, skip_flag)
+
+        if _flag_is_set(skip_flag, "skip"):
+            _reset_flag(skip_flag, "skip")
+            continue
+        if _flag_is_set(cancel_flag, "cancel"):
+            break
+        merged, readings = _merge(per_config)
+        if merged:
+            results.append((name, merged))
+            if readings:
+                pruned[name] = readings
+    return results, pruned
+
+
+def _run_pool_pass(
+    executor: "ProcessPoolExecutor",
+    compiled: Dict[str, CompiledModule],
+    message: str,
+    flawed: bool,
+    progress_callback: Optional[ProgressCallback],
+    cancel_flag: Optional[Any],
+    skip_flag: Optional[Any]
+) -> Tuple[DetectResults, Dict[str, int]]:
+    """
+    One pass over all modules on the process pool. The calling thread only
+    submits tasks, collects results and watches the cancel/skip flags.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    names = list(compiled)
+    total = len(names)
+    stats = active_stats()
+
+    owner: Dict["Future", Tuple[int, int]] = {}
+    remaining: Dict[int, int] = {}
+    n_cfgs: Dict[int, int] = {}
+    for idx, name in enumerate(names, start=1):
+        n = _config_count(compiled[name], message)
+        n_cfgs[idx] = remaining[idx] = n
+        for cfg_index in range(n):
+            fut = executor.submit(_worker_decode_config, name, message, cfg_index, flawed, stats is not None)
+            owner[fut] = (idx, cfg_index)
+
+    per_module: Dict[int, Dict[int, ConfigResult]] = {idx: {} for idx in n_cfgs}
+    skipped: set = set()
+    pending = set(owner)
+    current = 0
+
+    while True:
+        # The module reported on is the first one that still has work left
+        unfinished = [i for i in n_cfgs if remaining[i] > 0 and i not in skipped]
+        if not unfinished:
+            break
+        if unfinished[0] != current:
+            current = unfinished[0]
+            if progress_callback:
+                progress_callback("ModulePhase", current, total, (current / total) * 100.0, names[current - 1])
+        if progress_callback:
+            percent = ((n_cfgs[current] - remaining[current]) / n_cfgs[current]) * 100.0
+            progress_callback("PermutationsPhase", current, total, percent, names[current - 1])
+
+        if _flag_is_set(cancel_flag, "cancel"):
+            for fut in pending:
+                fut.cancel()
+            skipped.update(unfinished)
+            break
+        if _flag_is_set(skip_flag, "skip"):
+            _reset_flag(skip_flag, "skip")
+            skipped.add(current)
+            for fut in [f for f in pending if owner[f][0] == current]:
+                fut.cancel()
+                pending.discard(fut)
+            continue
+
+        done, pending = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+        for fut in done:
+            idx, cfg_index = owner[fut]
+            remaining[idx] -= 1
+            if idx in skipped or fut.cancelled():
+                continue
+            per_module[idx][cfg_index], records = fut.result()
+            if stats is not None:
+                stats.add(records)
+
+    results: DetectResults = []
+    pruned: Dict[str, int] = {}
+    for idx, name in enumerate(names, start=1):
+        if idx in skipped:
+            continue
+        merged, readings = _merge(per_module[idx])
+        if merged:
+            results.append((name, merged))
+            if readings:
+                pruned[name] = readings
+    return results, pruned
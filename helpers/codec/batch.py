@@ -0,0 +1,205 @@
+# helpers/codec/batch.py
+
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from .autodetect import auto_detect
+from .chain import multi_step_decode
+from .compiled import CompiledModule, compile_module
+from .decoder import decode_lattices_with_module, expand_lattice
+from .stats import DecodeStats
+
+# Messages handed to a pool worker per task, and tasks kept in flight per
+# worker; bounds memory when the input is an endless stream
+_CHUNK_SIZE = 32
+_TASKS_IN_FLIGHT = 4
+
+# Distinct messages remembered for de-duplication before the memo is reset
+_MESSAGE_MEMO_LIMIT = 1024
+
+# Per-worker state set by _init_worker
+_WORKER_MODULES: Dict[str, CompiledModule] = {}
+_WORKER_FLAWED = False
+
+
+def decode_ordered(cm: CompiledModule, message: str, flawed: bool = False) -> List[str]:
+    """
+    decode_message_with_module semantics (perfect first, flawed fallback),
+    but candidates come back in a stable order: config by config, in
+    expand_lattice() order, duplicates dropped. Safe to compare across processes.
+    Chain and tool modules use multi_step_decode (deterministic as well).
+    """
+    if cm.composite:
+        return multi_step_decode(cm, message, flawed)
+    merged: Dict[str, None] = {}
+    for lattice in decode_lattices_with_module(cm, message, flawed):
+        for cand in expand_lattice(lattice):
+            merged.setdefault(cand, None)
+    return list(merged)
+
+
+def _init_worker(modules: Dict[str, CompiledModule], flawed: bool) -> None:
+    global _WORKER_MODULES, _WORKER_FLAWED
+    _WORKER_MODULES = modules
+    _WORKER_FLAWED = flawed
+
+
+def _collecting(collect: bool, solve: Callable[[], list]) -> tuple:
+    """
+    Run a worker chunk, returning (results, (ConfigStats records, prefilter
+    counts)) — empty unless `collect`.
+    """
+    if not collect:
+        return solve(), ([], {})
+    stats = DecodeStats()
+    with stats.activate():
+        results = solve()
+    return results, (stats.configs, stats.prefiltered)
+
+
+def _worker_decode_chunk(name: str, collect: bool, messages: List[str]) -> tuple:
+    cm = _WORKER_MODULES[name]
+    return _collecting(collect, lambda: [decode_ordered(cm, msg, _WORKER_FLAWED) for msg in messages])
+
+
+def _worker_detect_chunk(collect: bool, messages: List[str]) -> tuple:
+    return _collecting(
+        collect, lambda: [auto_detect(_WORKER_MODULES, msg, _WORKER_FLAWED, jobs=1) for msg in messages]
+    )
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_batched(
+    messages: Iterable[str],
+    solve_one: Callable[[str], Any],
+    modules: Dict[str, CompiledModule],
+    flawed: bool,
+    jobs: int,
+    worker_fn: Callable,
+    worker_args: tuple,
+    stats: Optional[DecodeStats] = None
+) -> Iterator[Any]:
+    """
+    Yield solve_one(msg) for every message, in input order. Repeated
+    messages are answered from a memo. With jobs > 1, chunks of messages go
+    to a process pool, only a bounded number of chunks ahead of the consumer.
+    worker_fn(*worker_args, collect, chunk) returns (results, records).
+    """
+    memo: Dict[str, Any] = {}
+
+    def remember(msg: str, res: Any) -> None:
+        if len(memo) >= _MESSAGE_MEMO_LIMIT:
+            memo.clear()
+        memo[msg] = res
+
+    if jobs <= 1:
+        for msg in messages:
+            res = memo.get(msg)
+            if res is None:
+                if stats is not None:
+                    with stats.activate():
+                        res = solve_one(msg)
+                else:
+                    res = solve_one(msg)
+                remember(msg, res)
+            yield res
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(modules, flawed)
+    ) as executor:
+        window: List[tuple] = []
+        chunks = _chunks(messages, _CHUNK_SIZE)
+        max_window = jobs * _TASKS_IN_FLIGHT
+
+        def fill():
+            while len(window) < max_window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                # Answers already known are captured now; the memo may be
+                # reset before this chunk is yielded
+                known = {m: memo[m] for m in chunk if m in memo}
+                todo = list(dict.fromkeys(m for m in chunk if m not in known))
+                fut = executor.submit(worker_fn, *worker_args, stats is not None, todo) if todo else None
+                window.append((chunk, known, todo, fut))
+
+        fill()
+        while window:
+            chunk, known, todo, fut = window.pop(0)
+            if fut is not None:
+                results, records = fut.result()
+                if stats is not None:
+                    stats.add(*records)
+                for msg, res in zip(todo, results):
+                    known[msg] = res
+                    remember(msg, res)
+            for msg in chunk:
+                yield known[msg]
+            fill()
+
+
+def decode_many(
+    module: "dict[str, Any] | CompiledModule",
+    messages: Iterable[str],
+    flawed: bool = False,
+    jobs: int = 1,
+    stats: Optional[DecodeStats] = None
+) -> Iterator[List[str]]:
+    """
+    Decode a stream of messages with one module, yielding each message's
+    candidates (see decode_ordered) in input order. The module is compiled
+    once and its word memo is shared by every message; identical messages
+    are only decoded once. jobs > 1 spreads chunks over a process pool
+    (jobs=0 → one worker per CPU). `stats` collects per-config
+    instrumentation for every message decoded (see helpers.codec.stats).
+    """
+    cm = compile_module(module)
+    jobs = jobs or os.cpu_count() or 1
+    return _run_batched(
+        messages,
+        lambda msg: decode_ordered(cm, msg, flawed),
+        {cm.name: cm},
+        flawed,
+        jobs,
+        _worker_decode_chunk,
+        (cm.name,),
+        stats,
+    )
+
+
+def detect_many(
+    modules: Mapping[str, "dict[str, Any] | CompiledModule"],
+    messages: Iterable[str],
+    flawed: bool = False,
+    jobs: int = 1,
+    stats: Optional[DecodeStats] = None
+) -> Iterator[List[tuple]]:
+    """
+    Auto-Detect a stream of messages, yielding auto_detect()'s
+    [(module_name, candidates), …] per message in input order. Parallelism
+    is across messages: each worker runs auto_detect serially.
+    """
+    compiled = {name: compile_module(m, name) for name, m in modules.items()}
+    jobs = jobs or os.cpu_count() or 1
+    return _run_batched(
+        messages,
+        lambda msg: auto_detect(compiled, msg, flawed, jobs=1),
+        compiled,
+        flawed,
+        jobs,
+        _worker_detect_chunk,
+        (),
+        stats,
+    )
@@ -0,0 +1,104 @@
+# helpers/codec/beam.py
+
+import heapq
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from utils import load_dictionary, has_vowel
+from .lattice import DecodeLattice
+from .segmenter import _MAX_PATHS
+
+# A scorer rates one decoded word; a hypothesis scores the sum of its words.
+# Scorers may also provide `prefix(partial) -> bool` to prune partial words.
+WordScorer = Callable[[str], float]
+
+
+class DictionaryScorer:
+    """
+    Default word scorer: 1.0 for a dictionary hit, otherwise a small bonus
+    for words that at least contain a vowel (so something sensible still
+    wins when no dictionary is installed).
+    """
+
+    def __init__(self, dictionary: Iterable[str]):
+        self.dictionary = dictionary
+        # A CompactDictionary answers prefix queries, which lets beam search
+        # drop partial words early; skipped for an empty dictionary
+        has_prefix = getattr(dictionary, "has_prefix", None)
+        if has_prefix is not None and len(dictionary):
+            self.prefix = has_prefix
+
+    def __call__(self, word: str) -> float:
+        if word.upper() in self.dictionary:
+            return 1.0
+        return 0.1 if has_vowel(word) else 0.0
+
+
+@lru_cache(maxsize=1)
+def default_scorer() -> DictionaryScorer:
+    """
+    DictionaryScorer over utils.load_dictionary(), loaded once per process.
+    """
+    return DictionaryScorer(load_dictionary())
+
+
+def _top_word_variants(
+    lattice: DecodeLattice,
+    index: int,
+    beam_width: int,
+    scorer: WordScorer
+) -> List[Tuple[float, str]]:
+    """
+    Best `beam_width` variants of one lattice word as (score, text).
+    Slots are expanded left to right; if the scorer offers prefix(), partial
+    words it rejects are dropped early. At most _MAX_PATHS partials are kept
+    alive per slot, so one very ambiguous word cannot blow up the search.
+    """
+    prefix = getattr(scorer, "prefix", None)
+    partials = [""]
+    slots = lattice.words[index]
+    for pos, slot in enumerate(slots):
+        last = pos == len(slots) - 1
+        grown: List[str] = []
+        for head in partials:
+            for choice in slot:
+                cand = head + choice
+                if prefix is not None and not last and not prefix(cand):
+                    continue
+                grown.append(cand)
+                if len(grown) >= _MAX_PATHS:
+                    break
+            if len(grown) >= _MAX_PATHS:
+                break
+        if not grown:
+            # Prefix pruning rejected everything; fall back to unpruned choices
+            grown = [head + choice for head in partials for choice in slot][:_MAX_PATHS]
+        partials = grown
+    return heapq.nlargest(beam_width, ((scorer(w), w) for w in partials), key=lambda x: x[0])
+
+
+def beam_decode(
+    lattice: DecodeLattice,
+    beam_width: int,
+    scorer: Optional[WordScorer] = None
+) -> List[Tuple[float, str]]:
+    """
+    Walk the lattice word by word, extending each of the best `beam_width`
+    hypotheses with the best variants of the next word and keeping only the
+    top `beam_width`. Work is O(words × beam_width × variants) instead of the
+    size of the full Cartesian product. Returns (score, text), best first.
+    """
+    if scorer is None:
+        scorer = default_scorer()
+    beam: List[Tuple[float, str]] = [(0.0, "")]
+    for index in range(len(lattice.words)):
+        word_top = _top_word_variants(lattice, index, beam_width, scorer)
+        extended = (
+            (score + w_score, f"{text} {word}" if text else word)
+            for score, text in beam
+            for w_score, word in word_top
+        )
+        beam = heapq.nlargest(beam_width, extended, key=lambda x: x[0])
+        if not beam:
+            return []
+    return beam
@@ -0,0 +1,170 @@
+# helpers/codec/chain.py
+
+import heapq
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .beam import WordScorer, beam_decode, default_scorer
+from .compiled import CompiledModule, compile_module
+from .decoder import decode_lattices_with_module, decode_message_with_module, _flag_is_set
+from .segmenter import _MAX_PATHS
+from .stats import DecodeStats
+
+# Outputs a stage hands on per input text: its best `width` by score
+_STAGE_WIDTH = 20
+
+# (stage, text) pairs whose outputs are remembered before the memo resets
+_STAGE_MEMO_LIMIT = 4096
+
+
+def _stages(cm: CompiledModule) -> List[CompiledModule]:
+    """
+    Leaf steps of `cm` in decoding order: the chain reversed, nested chains
+    flattened.
+    """
+    if cm.chain is None:
+        return [cm]
+    return [leaf for step in reversed(cm.chain) for leaf in _stages(step)]
+
+
+class _ChainRun:
+    """
+    State of one chain decode: the stages and the per-(stage, text) memo.
+    Stage stats are recorded as "<chain name> › <stage name>", so they
+    don't mix with the stage module's own Auto-Detect stats.
+
+    Every stage is pruned by beam search (see beam_decode) under a word
+    scorer that looks ahead: a word a middle stage outputs is worth the
+    score of its best reading through the remaining stages, so ambiguous
+    early stages keep the candidates that decode into words at the end.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stages: List[CompiledModule],
+        flawed: bool,
+        width: int,
+        scorer: WordScorer,
+        skip_flag: Optional[Any]
+    ):
+        self.name = name
+        self.stages = stages
+        self.flawed = flawed
+        self.width = width
+        self.scorer = scorer
+        self.skip_flag = skip_flag
+        # (stage, input text) → [(score, output text)], best first
+        self.memo: Dict[Tuple[int, str], List[Tuple[float, str]]] = {}
+        self._scorers: Dict[int, WordScorer] = {}
+
+    def walk(self, index: int, text: str) -> Iterator[str]:
+        """
+        Depth-first: each output of stage `index` is taken through the rest
+        of the chain before the next one is produced, so only one path of
+        `width`-long lists is alive at a time.
+        """
+        if index == len(self.stages):
+            yield text
+            return
+        if _flag_is_set(self.skip_flag, "skip"):
+            return
+        for _, out in self.outputs(index, text):
+            yield from self.walk(index + 1, out)
+
+    def outputs(self, index: int, text: str) -> List[Tuple[float, str]]:
+        """
+        Best `width` (score, output) of stage `index` for `text`, memoized.
+        """
+        key = (index, text)
+        hit = self.memo.get(key)
+        if hit is None:
+            if len(self.memo) >= _STAGE_MEMO_LIMIT:
+                self.memo.clear()
+            hit = self.memo[key] = self._decode_stage(index, text)
+        return hit
+
+    def _decode_stage(self, index: int, text: str) -> List[Tuple[float, str]]:
+        step = self.stages[index]
+        scorer = self.word_scorer(index)
+        if step.tool is not None:
+            out = step.tool.decode(text)
+            return [(sum(map(scorer, out.split())), out)]
+
+        best: Dict[str, float] = {}
+        label = f"{self.name} › {step.name}"
+        for lattice in decode_lattices_with_module(step, text, self.flawed, skip_flag=self.skip_flag,
+                                                   stats_label=label):
+            for score, out in beam_decode(lattice, self.width, scorer):
+                out = out.strip()
+                if score > best.get(out, float("-inf")):
+                    best[out] = score
+        ranked = heapq.nlargest(self.width, best.items(), key=itemgetter(1))
+        return [(score, out) for out, score in ranked]
+
+    def word_scorer(self, index: int) -> WordScorer:
+        """
+        Scorer for words output by stage `index`: the plaintext scorer for
+        the last stage, otherwise the best score the word reaches through
+        the next stages (-1.0 if they can't decode it at all).
+        """
+        if index == len(self.stages) - 1:
+            return self.scorer
+        scorer = self._scorers.get(index)
+        if scorer is None:
+            def scorer(word: str) -> float:
+                outs = self.outputs(index + 1, word)
+                return outs[0][0] if outs else -1.0
+            self._scorers[index] = scorer
+        return scorer
+
+
+def iter_chain_decodings(
+    module: "dict[str, Any] | CompiledModule",
+    message: str,
+    flawed: bool = False,
+    width: int = _STAGE_WIDTH,
+    scorer: Optional[WordScorer] = None,
+    skip_flag: Optional[Any] = None
+) -> Iterator[str]:
+    """
+    Lazily yield plaintexts of a chain (or tool) module, undoing its steps
+    last to first. Candidates stream from stage to stage through generators;
+    each stage keeps only its best `width` outputs per input text, ranked
+    by `scorer` on the plaintext they lead to, and outputs are memoized per
+    (stage, text). Duplicates are dropped; the skip flag stops the walk.
+    """
+    cm = compile_module(module)
+    run = _ChainRun(cm.name, _stages(cm), flawed, width, scorer or default_scorer(), skip_flag)
+    seen = set()
+    for out in run.walk(0, message):
+        if out not in seen:
+            seen.add(out)
+            yield out
+
+
+def multi_step_decode(
+    module: "dict[str, Any] | CompiledModule",
+    message: str,
+    flawed: bool = False,
+    limit: Optional[int] = _MAX_PATHS,
+    width: int = _STAGE_WIDTH,
+    scorer: Optional[WordScorer] = None,
+    skip_flag: Optional[Any] = None,
+    stats: Optional[DecodeStats] = None
+) -> List[str]:
+    """
+    Decode `message` with any module. Chain and tool modules go through
+    iter_chain_decodings() (first `limit` plaintexts); plain modules are
+    handed to decode_message_with_module() unchanged.
+    """
+    cm = compile_module(module)
+    if not cm.composite:
+        return decode_message_with_module(cm, message, flawed, skip_flag=skip_flag, scorer=scorer, stats=stats)
+    if stats is not None:
+        with stats.activate():
+            return multi_step_decode(cm, message, flawed, limit, width, scorer, skip_flag)
+
+    out = iter_chain_decodings(cm, message, flawed, width, scorer, skip_flag)
+    return list(islice(out, limit))
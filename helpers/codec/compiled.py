@@ -0,0 +1,183 @@
+# helpers/codec/compiled.py
+
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
+
+from module_loader import get_module_settings, get_module_mapping, is_case_sensitive, load_modules
+from utils import as_list
+from .segmenter import TokenTrie
+from .steps import ToolStep
+
+# Max words remembered per module by CompiledModule.word_cache
+_WORD_CACHE_LIMIT = 4096
+
+
+def _invert_map(orig: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Invert a forward mapping (cipher→plaintext or plaintext→cipher) so that each
+    value (or each element of a list value) maps back to its key.
+    """
+    inv: Dict[str, List[str]] = {}
+    for k, v in orig.items():
+        targets = v if isinstance(v, list) else [v]
+        for tgt in targets:
+            inv.setdefault(tgt, []).append(k)
+    return inv
+
+
+def _normalize_map(orig: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Ensure each mapping value is a list of plaintext strings.
+    """
+    m: Dict[str, List[str]] = {}
+    for k, v in orig.items():
+        if isinstance(v, list):
+            m[k] = v.copy()
+        else:
+            m[k] = [v]
+    return m
+
+
+class CompiledModule:
+    """
+    Everything the tokenizer, decoder and encoder derive from a module's JSON,
+    built once instead of on every call:
+      - forward:  cipher token → [plaintext]   (decode direction)
+      - inverse:  plaintext → [cipher tokens]  (encode direction)
+      - case_sensitive, char_seps, word_seps, chunk_size
+    The raw JSON dict stays available as `data`.
+
+    Composite modules have no mapping of their own:
+      - chain:  steps applied in order when encoding, e.g.
+                {"chain": [{"tool": "keyshift", "shift": -1},
+                           {"module": "Keyboard Symbol Cipher"}]};
+                a step is an inline module, a tool step, or a reference
+                to a module in modules/ by name
+      - tool:   a ToolStep (see helpers.codec.steps)
+    """
+
+    def __init__(self, data: dict[str, Any], name: Optional[str] = None):
+        self.data = data
+        self.settings: dict[str, Any] = get_module_settings(data)
+        self.name = name or self.settings.get("name") or data.get("metadata") or data.get("tool") or "Unknown Module"
+        self.case_sensitive = is_case_sensitive(data)
+
+        # Chained modules are compiled step by step on first use (a step may
+        # name another module, which must not be loaded while the registry
+        # is still compiling this one)
+        self._chain_data: Optional[List[dict]] = data.get("chain")
+        self._chain: Optional[List["CompiledModule"]] = None
+        self.tool: Optional[ToolStep] = ToolStep(data) if "tool" in data else None
+
+        # ─── Separators (None/non-str → "") ───
+        raw_char_seps = as_list(self.settings.get("character_separator", None))
+        self.char_seps: List[str] = [rc if isinstance(rc, str) else "" for rc in raw_char_seps]
+
+        raw_word_seps = as_list(self.settings.get("word_separator", " "))
+        self.word_seps: List[str] = [rw if isinstance(rw, str) else "" for rw in raw_word_seps]
+
+        # Encoding always uses the first separator of each kind
+        self.encode_char_sep: str = self.char_seps[0] if self.char_seps else ""
+        self.encode_word_sep: str = (self.word_seps[0] if self.word_seps else "") or " "
+
+        # chunk_size only applies when the character separator is blank
+        self.chunk_size: Optional[int] = None
+        csizes = self.settings.get("chunk_size", [None, None])
+        if isinstance(csizes, list) and csizes[0]:
+            self.chunk_size = csizes[0]
+
+        reverse = self.settings.get("reverse_direction", False)
+        raw_map = get_module_mapping(data)
+
+        # ─── Forward mapping (cipher→plaintext) ───
+        fwd = _invert_map(raw_map) if reverse else raw_map
+        if not self.case_sensitive:
+            up_map: Dict[str, List[str]] = {}
+            for k, v in fwd.items():
+                if isinstance(v, list):
+                    up_map[k.upper()] = [vv.upper() for vv in v]
+                else:
+                    up_map[k.upper()] = [v.upper()]
+            fwd = up_map
+        self.forward: Dict[str, List[str]] = _normalize_map(fwd)
+
+        # ─── Inverse mapping (plaintext→cipher), str tokens only ───
+        inv = _normalize_map(raw_map) if reverse else _invert_map(raw_map)
+        clean_inv: Dict[str, List[str]] = {}
+        for key, val_list in inv.items():
+            filtered = [tok for tok in val_list if isinstance(tok, str)]
+            if filtered:
+                clean_inv[key.upper() if not self.case_sensitive else key] = filtered
+        self.inverse: Dict[str, List[str]] = clean_inv
+
+        # Token trie for separator-less segmentation, built on first use
+        self._trie: Optional[TokenTrie] = None
+
+        # (word, flawed) → decodings, shared by every message decoded with
+        # this module; cleared wholesale once it reaches _WORD_CACHE_LIMIT
+        self.word_cache: Dict[Tuple[str, bool], List[str]] = {}
+
+    @property
+    def chain(self) -> Optional[List["CompiledModule"]]:
+        """
+        Compiled chain steps in encoding order, or None for other modules.
+        """
+        if self._chain is None and self._chain_data is not None:
+            self._chain = [_compile_step(step) for step in self._chain_data]
+        return self._chain
+
+    @property
+    def composite(self) -> bool:
+        """
+        True for chain and tool modules, which decode stage by stage (see
+        helpers.codec.chain) instead of through a token mapping.
+        """
+        return self._chain_data is not None or self.tool is not None
+
+    @property
+    def trie(self) -> TokenTrie:
+        """
+        Prefix trie over the forward mapping's cipher tokens.
+        """
+        if self._trie is None:
+            self._trie = TokenTrie(self.forward)
+        return self._trie
+
+    def normalize_text(self, text: str) -> str:
+        """
+        Collapse newlines to spaces and upper-case `text` if the module is
+        case-insensitive (mirrors what the forward mapping expects).
+        """
+        text = text.replace("\r\n", " ").replace("\n", " ")
+        return text if self.case_sensitive else text.upper()
+
+    def __repr__(self) -> str:
+        return f"CompiledModule({self.name!r})"
+
+
+def compile_module(module: "dict[str, Any] | CompiledModule", name: Optional[str] = None) -> CompiledModule:
+    """
+    Return `module` as a CompiledModule. Already-compiled modules are passed
+    through untouched, so every codec entry point can accept either form.
+    """
+    if isinstance(module, CompiledModule):
+        return module
+    return CompiledModule(module, name)
+
+
+@lru_cache(maxsize=1)
+def _registry():
+    return load_modules()
+
+
+def _compile_step(step: dict) -> CompiledModule:
+    """
+    One chain step: {"module": name} is looked up in modules/, anything else
+    (an inline module or a tool step) is compiled as it is.
+    """
+    if "module" in step and len(step) == 1:
+        try:
+            return _registry()[step["module"]]
+        except KeyError:
+            raise KeyError(f"chain step refers to unknown module {step['module']!r}") from None
+    return compile_module(step)
@@ -0,0 +1,212 @@
+# helpers/codec/compound.py
+
+import heapq
+import time
+from itertools import count
+from typing import Any, Callable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from .beam import WordScorer, default_scorer
+from .compiled import CompiledModule, compile_module
+from .decoder import ProgressCallback, decode_message_with_module, _flag_is_set
+from .prefilter import ModulePrefilter
+
+# Tools tried between module stages (see _tool_transforms)
+DEFAULT_TOOLS = ("caesar", "keyshift")
+
+# Outputs kept per module decode, and per tool, when a node is expanded
+_MODULE_WIDTH = 5
+_TOOL_WIDTH = 3
+
+# Nodes expanded before the search gives up (bounds depth-3 searches)
+_MAX_EXPANSIONS = 400
+
+# Tools only run on texts at least this fraction letters (non-whitespace)
+_MIN_LETTER_FRACTION = 0.5
+
+# Tool readings that change fewer than this fraction of the letters are
+# dropped: near-identity keys (e.g. a Keyshift that mostly moves the number
+# row) only swap a few letters and would otherwise outscore the text itself
+_MIN_TOOL_CHANGE = 0.5
+
+# Subtracted from a candidate's score for every step after the first, so a
+# deeper chain only wins when it reads clearly better than a shorter one
+_STEP_PENALTY = 0.15
+
+# Letter-model scores mapped onto 0–1 for _plaintext_scorer: English reads
+# about -10, text at _GIBBERISH_NGRAMS or below counts as noise
+_FLUENT_NGRAMS = -10.0
+_GIBBERISH_NGRAMS = -20.0
+
+
+class CompoundCandidate(NamedTuple):
+    """
+    One result of compound_detect():
+      - steps: transforms undone, in the order they were applied to the
+               cipher text ("Morse Code", "Caesar +3", …)
+      - text:  the decoded text
+      - score: plaintext score (mean word score plus English fluency),
+               less _STEP_PENALTY per step after the first
+    """
+    steps: Tuple[str, ...]
+    text: str
+    score: float
+
+
+def _letter_fraction(text: str) -> float:
+    solid = [c for c in text if not c.isspace()]
+    return sum(c.isascii() and c.isalpha() for c in solid) / len(solid) if solid else 0.0
+
+
+def _changed_fraction(before: str, after: str) -> float:
+    """
+    Fraction of the letters of `before` that differ in `after` at the same
+    position (tools keep the text's length).
+    """
+    pairs = [(a, b) for a, b in zip(before, after) if a.isalpha()]
+    return sum(a != b for a, b in pairs) / len(pairs) if pairs else 0.0
+
+
+def _tool_transforms(names: Sequence[str], width: int) -> List[Tuple[str, Callable[[str], List[Tuple[str, str]]]]]:
+    """
+    (tool name, expand) pairs; expand(text) returns the tool's best `width`
+    readings of `text` as (step label, text), leaving out readings that
+    change fewer than _MIN_TOOL_CHANGE of its letters (the identity shift
+    among them).
+    """
+    import tools
+
+    def caesar(text: str) -> List[Tuple[str, str]]:
+        return [
+            (f"Caesar {shift:+d}", plain)
+            for shift, plain, _ in tools.analyze_caesar_candidates(text, width + 1)
+        ]
+
+    def keyshift(text: str) -> List[Tuple[str, str]]:
+        # Several near-identity keys may rank high; ask for enough to fill `width`
+        return [
+            (f"Keyshift {layout} {shift:+d}", plain)
+            for layout, shift, plain, _ in tools.analyze_keyshift_candidates(text, 4 * width)
+        ]
+
+    def keep(expand: Callable[[str], List[Tuple[str, str]]]) -> Callable[[str], List[Tuple[str, str]]]:
+        return lambda text: [
+            (label, plain) for label, plain in expand(text)
+            if _changed_fraction(text, plain) >= _MIN_TOOL_CHANGE
+        ][:width]
+
+    table = {"caesar": keep(caesar), "keyshift": keep(keyshift)}
+    unknown = [n for n in names if n not in table]
+    if unknown:
+        raise ValueError(f"unknown compound tools: {', '.join(unknown)} (expected {', '.join(table)})")
+    return [(n, table[n]) for n in names]
+
+
+def _plaintext_scorer(scorer: WordScorer) -> Callable[[str], float]:
+    """
+    Score a whole text: mean word score under `scorer`, plus how English
+    it reads, scaled by the fraction of letters, so texts read better the
+    more they look like English even without a dictionary. "How English"
+    averages fluency (utils.load_ngram_model, mapped onto 0–1), which
+    judges letter order, with the letter frequency fit (tools.english_fit),
+    which catches repetitive texts such as "EDEED…" that the bigram model
+    rates like English.
+    """
+    import tools
+    from utils import load_ngram_model
+
+    ngrams = load_ngram_model()
+    span = _FLUENT_NGRAMS - _GIBBERISH_NGRAMS
+
+    def score(text: str) -> float:
+        words = text.split()
+        if not words:
+            return 0.0
+        fluency = min(max((ngrams.score(text) - _GIBBERISH_NGRAMS) / span, 0.0), 1.0)
+        fit = tools.english_fit(tools.letter_histogram(text))
+        return sum(map(scorer, words)) / len(words) + (fluency + fit) / 2 * _letter_fraction(text)
+    return score
+
+
+def compound_detect(
+    modules: Mapping[str, "dict[str, Any] | CompiledModule"],
+    message: str,
+    max_depth: int = 2,
+    top_n: int = 10,
+    tools: Sequence[str] = DEFAULT_TOOLS,
+    scorer: Optional[WordScorer] = None,
+    max_expansions: int = _MAX_EXPANSIONS,
+    time_limit: Optional[float] = None,
+    cancel_flag: Optional[Any] = None,
+    progress_callback: Optional[ProgressCallback] = None
+) -> List[CompoundCandidate]:
+    """
+    Best-first search for layered codes: sequences of up to `max_depth`
+    transforms, each a module (perfect decode, beam-pruned to its best
+    readings) or a tools.py transform (Caesar, Keyshift). The most
+    plaintext-like text found so far is always expanded next.
+
+    Pruning keeps depth 2–3 tractable:
+      - one ModulePrefilter scan per intermediate text rejects every module
+        that cannot tokenize it, before any decoding
+      - each intermediate text is expanded once (memo over all paths)
+      - tools only run on mostly-letter texts, never twice in a row
+      - at most `max_expansions` nodes (and `time_limit` seconds) in total
+    Chain and tool modules are left out; the search builds its own chains.
+    Raising cancel_flag (Event or .cancel) stops the search early.
+    progress_callback gets ("ModulePhase", n, max_expansions, percent,
+    steps so far) before the n-th node is expanded.
+    Returns the best `top_n` results, best first.
+    """
+    compiled = {name: compile_module(m, name) for name, m in modules.items()}
+    compiled = {name: cm for name, cm in compiled.items() if not cm.composite}
+    prefilter = ModulePrefilter(compiled)
+    scorer = scorer or default_scorer()
+    score = _plaintext_scorer(scorer)
+    transforms = _tool_transforms(tools, _TOOL_WIDTH)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+    # Frontier entries: (-score + step penalty, tie, depth, text, steps, last tool)
+    tie = count()
+    frontier: List[tuple] = [(-score(message), next(tie), 0, message, (), None)]
+    seen = {message}
+    results: List[CompoundCandidate] = []
+    expansions = 0
+
+    while frontier and expansions < max_expansions:
+        if _flag_is_set(cancel_flag, "cancel"):
+            break
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        neg, _, depth, text, steps, last_tool = heapq.heappop(frontier)
+        if steps:
+            results.append(CompoundCandidate(steps, text, -neg))
+        if depth >= max_depth:
+            continue
+        expansions += 1
+        if progress_callback:
+            progress_callback(
+                "ModulePhase", expansions, max_expansions,
+                expansions / max_expansions * 100.0, " → ".join(steps) or "(message)",
+            )
+
+        children: List[Tuple[str, str, Optional[str]]] = []
+        for name in sorted(prefilter.scan(text).perfect):
+            outs = decode_message_with_module(
+                compiled[name], text, strategy="beam", beam_width=_MODULE_WIDTH, scorer=scorer
+            )
+            children += [(name, out, None) for out in outs]
+        if _letter_fraction(text) >= _MIN_LETTER_FRACTION:
+            for tool, expand in transforms:
+                if tool != last_tool:
+                    children += [(label, out, tool) for label, out in expand(text)]
+
+        for label, out, tool in children:
+            if out in seen:
+                continue
+            seen.add(out)
+            penalty = _STEP_PENALTY * depth
+            heapq.heappush(frontier, (penalty - score(out), next(tie), depth + 1, out, steps + (label,), tool))
+
+    # Leaves still queued are complete candidates too
+    results += [CompoundCandidate(steps, text, -neg) for neg, _, _, text, steps, _ in frontier if steps]
+    return heapq.nlargest(top_n, results, key=lambda c: c.score)
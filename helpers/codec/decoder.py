@@ -1,16 +1,18 @@
 # helpers/codec/decoder.py
 
+import random
+import time
 from typing import Any, List, Set, Dict, Optional, Callable
-from itertools import product
 
-from module_loader import get_module_settings, get_module_mapping
+from .compiled import CompiledModule, compile_module
 from .tokenizer import (
     tokenize_message_with_module,
     get_recursive_decode,
-    _normalize_map,
-    _invert_map,
     _MAX_PATHS,
 )
+from .lattice import DecodeLattice
+from .beam import beam_decode, WordScorer
+from .stats import DecodeStats, active_stats
 
 # Type alias for our progress callback:
 #   stage: "PermutationsPhase"
@@ -20,43 +22,100 @@ from .tokenizer import (
 #   module_name: str
 ProgressCallback = Callable[[str, int, int, float, str], None]
 
+# expand_lattice() on a lattice over its limit: best readings kept by beam
+# search; with sample=True the rest of the limit is filled with paths drawn
+# across the whole lattice (fixed seed, so results match in every process)
+_EXPAND_BEAM_WIDTH = 20
+_EXPAND_SAMPLE_SEED = 0x5EED
+
+
+def _flag_is_set(flag: Optional[Any], attr: str) -> bool:
+    """
+    True if a cancel/skip flag is raised. Accepts a threading.Event or any
+    object carrying a boolean `attr` (e.g. SimpleNamespace(skip=False)).
+    """
+    if flag is None:
+        return False
+    is_set = getattr(flag, "is_set", None)
+    if is_set is not None:
+        return is_set()
+    return bool(getattr(flag, attr, False))
+
+
+def _reset_flag(flag: Optional[Any], attr: str) -> None:
+    """
+    Lower a flag raised for one step (e.g. "skip this module").
+    """
+    if flag is None:
+        return
+    if hasattr(flag, "clear"):
+        flag.clear()
+    else:
+        setattr(flag, attr, False)
+
 
 def decode_message_with_module(
-    module: dict[str, Any],
+    module: "dict[str, Any] | CompiledModule",
     message: str,
     flawed: bool = False,
     # min_accuracy is ignored here; GUI does its own filtering
     min_accuracy: float = 0.0,
     progress_callback: Optional[ProgressCallback] = None,
-    skip_flag: Optional[Any] = None
+    skip_flag: Optional[Any] = None,
+    strategy: str = "exhaustive",
+    beam_width: int = 20,
+    scorer: Optional[WordScorer] = None,
+    stats: Optional[DecodeStats] = None
 ) -> List[str]:
     """
     Decode `message` using `module`. First try a perfect decode (flawed=False).
     If any perfect outputs exist, return them all immediately (no filtering).
     Otherwise, if flawed=True, do a flawed pass and return all flawed outputs.
     progress_callback(stage, module_idx, total_modules, percent, module_name) is
-    invoked for each permutation. If skip_flag.skip == True at any time, we abort
+    invoked for each permutation. If skip_flag is raised (Event set or .skip True), we abort
     this module and return []. (No auto‐abort for pruning.)
+
+    strategy="beam" ranks instead of enumerating: each tokenization config is
+    searched word by word keeping the `beam_width` best hypotheses under
+    `scorer` (default: dictionary hits from utils.load_dictionary), and the
+    overall best `beam_width` outputs are returned, best first.
+
+    If `stats` is given, per-config timings and memo counters are recorded
+    into it (see helpers.codec.stats).
+
+    Chain and tool modules are decoded stage by stage by
+    helpers.codec.chain.multi_step_decode (always pruned, best first).
     """
-    sets = get_module_settings(module)
+    if stats is not None:
+        with stats.activate():
+            return decode_message_with_module(
+                module, message, flawed, min_accuracy, progress_callback,
+                skip_flag, strategy, beam_width, scorer,
+            )
+
+    # Forward mapping (cipher→plaintext) is built once per module
+    cm = compile_module(module)
+    if cm.composite:
+        from .chain import multi_step_decode
+        return multi_step_decode(cm, message, flawed, skip_flag=skip_flag, scorer=scorer)
+    mapping: Dict[str, List[str]] = cm.forward
 
-    # Build forward mapping (cipher→plaintext). Invert if needed.
-    raw_map = get_module_mapping(module)
-    if sets.get("reverse_direction", False):
-        raw_map = _invert_map(raw_map)
-    mapping: Dict[str, List[str]] = _normalize_map(raw_map)
+    if strategy == "beam":
+        return _beam_decode_message(cm, message, flawed, progress_callback, skip_flag, beam_width, scorer)
+    if strategy != "exhaustive":
+        raise ValueError(f"unknown decode strategy: {strategy!r}")
 
     # ---------- Perfect‐decode pass ----------
     perfect_set = _attempt_decode(
-        module,
+        cm,
         message,
         mapping,
         flawed=False,
         progress_callback=progress_callback,
         skip_flag=skip_flag,
     )
-    # If skip was triggered, _attempt_decode returns empty, but skip_flag.skip is True.
-    if skip_flag and getattr(skip_flag, "skip", False):
+    # If skip was triggered, _attempt_decode returns empty, but the skip flag is still raised.
+    if _flag_is_set(skip_flag, "skip"):
         return []
 
     if perfect_set:
@@ -65,7 +124,7 @@ def decode_message_with_module(
     # ---------- Flawed‐decode pass (if allowed) ----------
     if flawed:
         flawed_set = _attempt_decode(
-            module,
+            cm,
             message,
             mapping,
             flawed=True,
@@ -77,118 +136,202 @@ def decode_message_with_module(
     return []
 
 
-def _attempt_decode(
-    module: dict[str, Any],
+def _beam_decode_message(
+    cm: CompiledModule,
     message: str,
-    mapping: Dict[str, List[str]],
     flawed: bool,
     progress_callback: Optional[ProgressCallback],
-    skip_flag: Optional[Any]
-) -> Set[str]:
+    skip_flag: Optional[Any],
+    beam_width: int,
+    scorer: Optional[WordScorer]
+) -> List[str]:
     """
-    Internal helper: iterate through each token‐config for `module` → decode.
-    If skip_flag.skip becomes True, abort immediately and return empty set.
-    We still prune branches > _MAX_PATHS, but do NOT auto‐abort beyond skip.
-    We call progress_callback("PermutationsPhase", module_index, total_modules, percent, module_name)
-    for each config. (module_index/total_modules are passed in by the GUI's wrapper.)
+    strategy="beam" body of decode_message_with_module: beam-search every
+    lattice and merge the survivors into one ranked, de-duplicated list.
     """
-    sets = get_module_settings(module)
-    configs = tokenize_message_with_module(module, message)
+    lattices = decode_lattices_with_module(cm, message, flawed, progress_callback, skip_flag)
+    best: Dict[str, float] = {}
+    for lattice in lattices:
+        if _flag_is_set(skip_flag, "skip"):
+            return []
+        for score, text in beam_decode(lattice, beam_width, scorer):
+            text = text.strip()
+            if score > best.get(text, float("-inf")):
+                best[text] = score
+    ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+    return [text for text, _ in ranked[:beam_width]]
+
 
+def decode_lattices_with_module(
+    module: "dict[str, Any] | CompiledModule",
+    message: str,
+    flawed: bool = False,
+    progress_callback: Optional[ProgressCallback] = None,
+    skip_flag: Optional[Any] = None,
+    stats_label: Optional[str] = None
+) -> List[DecodeLattice]:
+    """
+    Like decode_message_with_module, but returns one DecodeLattice per
+    tokenization config that decodes, instead of expanded strings. Nothing
+    is pruned: use lattice.count(), .page() or iteration to consume them.
+    Perfect lattices win; the flawed pass only runs if there are none.
+    Stats are recorded under `stats_label` (default: the module's name).
+    """
+    cm = compile_module(module)
+    lattices = _attempt_lattices(cm, message, False, progress_callback, skip_flag, label=stats_label)
+    if _flag_is_set(skip_flag, "skip"):
+        return []
+    if lattices or not flawed:
+        return lattices
+    return _attempt_lattices(cm, message, True, progress_callback, skip_flag, label=stats_label)
+
+
+def _attempt_lattices(
+    cm: CompiledModule,
+    message: str,
+    flawed: bool,
+    progress_callback: Optional[ProgressCallback],
+    skip_flag: Optional[Any],
+    mapping: Optional[Dict[str, List[str]]] = None,
+    label: Optional[str] = None
+) -> List[DecodeLattice]:
+    """
+    Internal helper: build a DecodeLattice for each token‐config of `cm`.
+    Configs where some word cannot be decoded are dropped. Returns [] as soon
+    as skip_flag is raised. progress_callback gets one
+    ("PermutationsPhase", 0, 0, percent, module_name) call per config.
+    Stats records are named `label` (default: cm.name).
+    """
+    if mapping is None:
+        mapping = cm.forward
+    configs = tokenize_message_with_module(cm, message)
     total_cfgs = len(configs)
-    module_name = sets.get("name", "Unknown Module")
 
-    outputs_set: Set[str] = set()
+    lattices: List[DecodeLattice] = []
 
     for cfg_index, conf in enumerate(configs):
         # If user hit “Skip Step,” abort this module’s decoding.
-        if skip_flag and getattr(skip_flag, "skip", False):
-            return set()
+        if _flag_is_set(skip_flag, "skip"):
+            return []
 
         # Report permutation‐phase progress to GUI (percent done within this module)
         if progress_callback:
             percent = (cfg_index / total_cfgs) * 100.0
             # We pass module_index and total_modules as 0 here; GUI lambda remaps them.
-            progress_callback("PermutationsPhase", 0, 0, percent, module_name)
-
-        cfg = conf["cfg"]
-        char_sep_blank = conf["char_sep_blank"]
-
-        paths: List[str] = [""]
-        pruned = False
-
-        for toks in cfg:
-            if skip_flag and getattr(skip_flag, "skip", False):
-                return set()
-
-            new_paths: List[str] = []
-
-            if char_sep_blank and len(toks) == 1:
-                # Entire word token → recursive decode
-                variants = get_recursive_decode(toks[0], module, flawed)
-            else:
-                lists_of_choices: List[List[str]] = []
-                for t in toks:
-                    if t in mapping:
-                        lists_of_choices.append(mapping[t])
-                    else:
-                        if flawed:
-                            lists_of_choices.append([t])
-                        else:
-                            lists_of_choices = []
-                            break
-
-                if not lists_of_choices:
-                    variants = []
+            progress_callback("PermutationsPhase", 0, 0, percent, cm.name)
+
+        stats = active_stats()
+        rec = stats.begin(label or cm.name, cfg_index, flawed) if stats is not None else None
+        lattice = _config_lattice(cm, conf, flawed, mapping, skip_flag)
+        if rec is not None:
+            stats.end(rec, lattice)
+        if _flag_is_set(skip_flag, "skip"):
+            return []
+        if lattice is not None:
+            lattices.append(lattice)
+
+    return lattices
+
+
+def _config_lattice(
+    cm: CompiledModule,
+    conf: dict,
+    flawed: bool,
+    mapping: Optional[Dict[str, List[str]]] = None,
+    skip_flag: Optional[Any] = None
+) -> Optional[DecodeLattice]:
+    """
+    Decode a single token‐config (one entry of tokenize_message_with_module)
+    into a DecodeLattice, or None if some word cannot be decoded (or the
+    skip flag was raised part-way).
+    """
+    if mapping is None:
+        mapping = cm.forward
+    char_sep_blank = conf["char_sep_blank"]
+    words: List[List[List[str]]] = []
+
+    for toks in conf["cfg"]:
+        if _flag_is_set(skip_flag, "skip"):
+            return None
+
+        if char_sep_blank and len(toks) == 1:
+            # Entire word token → trie segmentation, one slot for the word
+            variants = get_recursive_decode(toks[0], cm, flawed)
+            slots = [variants] if variants else []
+        else:
+            slots = []
+            for t in toks:
+                if t in mapping:
+                    slots.append(mapping[t])
+                elif flawed:
+                    slots.append([t])
                 else:
-                    variants = lists_of_choices[0].copy()
-                    for choices in lists_of_choices[1:]:
-                        next_variants: List[str] = []
-                        for prefix in variants:
-                            for c in choices:
-                                next_variants.append(prefix + c)
-                                if len(next_variants) > _MAX_PATHS:
-                                    break
-                            if len(next_variants) > _MAX_PATHS:
-                                break
-                        variants = next_variants
-                        if len(variants) > _MAX_PATHS:
-                            break
-
-            if not variants:
-                paths = []
-                break
-
-            # Prune if combining paths × variants > _MAX_PATHS
-            if len(paths) * len(variants) > _MAX_PATHS:
-                pruned = True
-                break
-
-            for prefix in paths:
-                for v in variants:
-                    if prefix:
-                        new_paths.append(prefix + " " + v)
-                    else:
-                        new_paths.append(v)
-
-                    if len(new_paths) > _MAX_PATHS:
-                        pruned = True
-                        break
-                if pruned:
+                    slots = []
                     break
 
-            if pruned:
-                paths = []
-                break
+        if not slots:
+            return None
+        words.append(slots)
 
-            paths = new_paths
-            if not paths:
-                break
+    return DecodeLattice(words)
 
-        if pruned:
-            continue
 
-        for p in paths:
-            outputs_set.add(p.strip())
+def expand_lattice(lattice: DecodeLattice, limit: int = _MAX_PATHS, sample: bool = False) -> List[str]:
+    """
+    Up to `limit` distinct candidates of `lattice`, stripped. A lattice
+    within the limit is expanded whole, in iteration order. A larger one
+    yields only its best _EXPAND_BEAM_WIDTH readings (beam_decode, best
+    first); lattice.count() tells how many there were. With sample=True
+    the rest of the limit is filled with paths sampled uniformly over the
+    lattice, in index order - coverage rather than ranking.
+    """
+    rec = lattice.stats
+    start = time.perf_counter() if rec is not None else 0.0
+    out: Dict[str, None] = {}
+    total = lattice.count()
+    if total <= limit:
+        for p in lattice:
+            out.setdefault(p.strip(), None)
+    else:
+        for _, p in beam_decode(lattice, min(_EXPAND_BEAM_WIDTH, limit)):
+            out.setdefault(p.strip(), None)
+        if sample:
+            # randrange, not sample(range(total)): counts overflow ssize_t
+            rng = random.Random(_EXPAND_SAMPLE_SEED)
+            picks: Set[int] = set()
+            while len(picks) < limit - len(out):
+                picks.add(rng.randrange(total))
+            for index in sorted(picks):
+                out.setdefault(lattice.candidate(index).strip(), None)
+    if rec is not None:
+        rec.seconds += time.perf_counter() - start
+        rec.candidates = len(out)
+        rec.pruned = rec.paths > limit
+    return list(out)
+
+
+def _attempt_decode(
+    module: "dict[str, Any] | CompiledModule",
+    message: str,
+    mapping: Optional[Dict[str, List[str]]],
+    flawed: bool,
+    progress_callback: Optional[ProgressCallback],
+    skip_flag: Optional[Any]
+) -> Set[str]:
+    """
+    Internal helper: decode every token‐config of `module` into a lattice and
+    expand it. A lattice with more than _MAX_PATHS candidates contributes
+    its best readings (see expand_lattice) instead of being discarded.
+    If skip_flag is raised, abort immediately and return empty set.
+    `mapping` defaults to the module's compiled forward mapping when None.
+    """
+    cm = compile_module(module)
+    lattices = _attempt_lattices(cm, message, flawed, progress_callback, skip_flag, mapping)
+
+    outputs_set: Set[str] = set()
+    for lattice in lattices:
+        if _flag_is_set(skip_flag, "skip"):
+            return set()
+        outputs_set.update(expand_lattice(lattice))
 
     return outputs_set
@@ -1,79 +1,28 @@
 # helpers/codec/encoder.py
 
-from typing import Any, List, Dict
-from itertools import product
+import random
+from typing import Any, List, Dict, Iterator, Optional, Sequence
+from itertools import islice, product
 
-from module_loader import get_module_settings, get_module_mapping, is_case_sensitive
-from utils import as_list
-from .tokenizer import _invert_map, _normalize_map
+from .compiled import CompiledModule, compile_module
 
 
-def encode_message_with_module(
-    module: dict[str, Any],
+def _choices_per_char(
+    cm: CompiledModule,
     plaintext: str,
-    ignore_case: bool = False
-) -> List[str]:
+    ignore_case: bool
+) -> Optional[List[List[str]]]:
     """
-    Encode `plaintext` using `module` settings. Returns all possible
-    cipher outputs (accounting for multiple cipher‐tokens per plaintext char).
-    Supports chained modules recursively.
+    Cipher-token choices for every character of `plaintext`, or None if some
+    character cannot be encoded by `cm`.
     """
-    sets = get_module_settings(module)
-
-    # 1) If it’s a “chain” module, encode step by step
-    if "chain" in module:
-        results: List[str] = [plaintext]
-        for step in module["chain"]:
-            next_results: List[str] = []
-            for txt in results:
-                next_results.extend(
-                    encode_message_with_module(step, txt, ignore_case)
-                )
-            results = next_results
-        return results
-
-    # 2) Build inverted mapping (plaintext→[cipher tokens])
-    raw_map = get_module_mapping(module)
-    if sets.get("reverse_direction", False):
-        inv_map: Dict[str, List[str]] = _normalize_map(raw_map)  # values are already lists
-    else:
-        inv_map = _invert_map(raw_map)  # may produce List[Any], so clean next
-
-    # 2a) ➤ Clean up inv_map: ensure each value list contains only str
-    clean_inv: Dict[str, List[str]] = {}
-    for key, val_list in inv_map.items():
-        # keep only actual str entries
-        filtered = [tok for tok in val_list if isinstance(tok, str)]
-        if filtered:
-            clean_inv[key] = filtered
-    inv_map = clean_inv  # now inv_map[str] → List[str]
-
-    # 3) Handle case sensitivity
-    case_sensitive = is_case_sensitive(module)
+    # Inverted mapping (plaintext→[cipher tokens]) and separators are precompiled
+    inv_map: Dict[str, List[str]] = cm.inverse
+    case_sensitive = cm.case_sensitive
     if not case_sensitive:
-        upper_inv: Dict[str, List[str]] = {}
-        for k, vlist in inv_map.items():
-            upper_inv[k.upper()] = vlist.copy()
-        inv_map = upper_inv
         plaintext = plaintext.upper()
+    word_sep = cm.encode_word_sep
 
-    # 4) Determine separators
-    raw_char_seps = as_list(sets.get("character_separator", None))
-    char_sep = raw_char_seps[0] if isinstance(raw_char_seps, list) else None
-    if char_sep is None:
-        char_sep = ""
-
-    # Fetch word_separator; ensure it's always a str
-    raw_word_seps = as_list(sets.get("word_separator", " "))
-    if isinstance(raw_word_seps, list) and raw_word_seps:
-        sep0 = raw_word_seps[0]
-    else:
-        sep0 = raw_word_seps if isinstance(raw_word_seps, str) else None
-
-    # If sep0 is not a non-empty string, default to a single space
-    word_sep: str = sep0 if isinstance(sep0, str) and sep0 != "" else " "
-
-    # 5) Build choices for each character
     choices_per_char: List[List[str]] = []
     for ch in plaintext:
         if ch.isspace():
@@ -90,21 +39,200 @@ def encode_message_with_module(
                         choices_per_char.append(inv_map[alt])
                         continue
                 # Cannot encode this character
-                return []
-
-    # 6) Cartesian product → produce full cipher strings
-    encoded_results: List[str] = []
-    for tup in product(*choices_per_char):
-        s = ""
-        for i, token in enumerate(tup):
-            if i > 0:
-                # If either this token or the previous is a word separator, skip char_sep
-                if token == word_sep or tup[i - 1] == word_sep:
-                    s += token
-                else:
-                    s += char_sep + token
-            else:
-                s += token
-        encoded_results.append(s)
+                return None
+    return choices_per_char
+
+
+def _join_tokens(tup: Sequence[str], char_sep: str, word_sep: str) -> str:
+    """
+    Join one combination of cipher tokens in linear time. char_sep goes
+    between tokens unless either neighbour is a word separator.
+    """
+    if not char_sep or len(tup) < 2:
+        return "".join(tup)
+    parts: List[str] = [tup[0]]
+    prev = tup[0]
+    for token in tup[1:]:
+        if token != word_sep and prev != word_sep:
+            parts.append(char_sep)
+        parts.append(token)
+        prev = token
+    return "".join(parts)
+
+
+def iter_encodings(
+    module: "dict[str, Any] | CompiledModule",
+    plaintext: str,
+    ignore_case: bool = False
+) -> Iterator[str]:
+    """
+    Lazily yield every cipher output for `plaintext`, one at a time, in the
+    same order encode_message_with_module lists them. Chained modules feed
+    each output of a step straight into the next step; tool steps give one
+    output.
+    """
+    cm = compile_module(module)
+    if cm.chain is not None:
+        yield from _iter_chain(cm.chain, plaintext, ignore_case)
+        return
+    if cm.tool is not None:
+        yield cm.tool.encode(plaintext)
+        return
+
+    choices = _choices_per_char(cm, plaintext, ignore_case)
+    if choices is None:
+        return
+    char_sep, word_sep = cm.encode_char_sep, cm.encode_word_sep
+    for tup in product(*choices):
+        yield _join_tokens(tup, char_sep, word_sep)
+
+
+def _iter_chain(steps: List[CompiledModule], text: str, ignore_case: bool) -> Iterator[str]:
+    if not steps:
+        yield text
+        return
+    for mid in iter_encodings(steps[0], text, ignore_case):
+        yield from _iter_chain(steps[1:], mid, ignore_case)
+
+
+def count_encodings(
+    module: "dict[str, Any] | CompiledModule",
+    plaintext: str,
+    ignore_case: bool = False,
+    limit: Optional[int] = None
+) -> int:
+    """
+    Number of outputs encode_message_with_module would produce, capped at
+    `limit` when given (a result equal to `limit` reads "at least"), without
+    building any of them. A plain module's count is a product over the
+    characters, and so is a run of plain chain steps (see _count_steps),
+    so those are counted in O(len(plaintext)). Only chain steps before a
+    tool step are walked, and the walk stops once `limit` is reached.
+    """
+    cm = compile_module(module)
+    leaves = _leaves(cm)
+    split = len(leaves)
+    while split and leaves[split - 1].tool is None:
+        split -= 1
+    head, tail = leaves[:split], leaves[split:]
+    if not head:
+        return _capped(_count_steps(tail, plaintext, ignore_case), limit)
+
+    total = 0
+    for mid in _iter_chain(head, plaintext, ignore_case):
+        total += _count_steps(tail, mid, ignore_case)
+        if limit is not None and total >= limit:
+            return limit
+    return total
+
+
+def _capped(total: int, limit: Optional[int]) -> int:
+    return total if limit is None else min(total, limit)
+
+
+def _leaves(cm: CompiledModule) -> List[CompiledModule]:
+    """
+    Steps of `cm` in encoding order, nested chains flattened.
+    """
+    if cm.chain is None:
+        return [cm]
+    return [leaf for step in cm.chain for leaf in _leaves(step)]
+
+
+def _count_steps(steps: List[CompiledModule], text: str, ignore_case: bool) -> int:
+    """
+    Outputs of plain modules `steps` applied in turn to `text`. A plain
+    module encodes character by character, so its count for a string is the
+    product of its counts for the pieces; the outputs of one step are its
+    tokens and separators, hence
+
+        count(i, text) = Π per char (Σ over its tokens of count(i+1, token))
+                         × count(i+1, char_sep) ** (separators placed)
+
+    with count(len(steps), ·) = 1, memoized per (step, token).
+    """
+    memo: Dict[tuple, int] = {}
+
+    def count(i: int, s: str) -> int:
+        if i == len(steps) or not s:
+            return 1
+        hit = memo.get((i, s))
+        if hit is not None:
+            return hit
+        cm = steps[i]
+        choices = _choices_per_char(cm, s, ignore_case)
+        total = 0
+        if choices is not None:
+            total = 1
+            for c in choices:
+                total *= sum(count(i + 1, token) for token in c)
+                if not total:
+                    break
+            if total and cm.encode_char_sep:
+                word_sep = cm.encode_word_sep
+                seps = sum(a[0] != word_sep and b[0] != word_sep for a, b in zip(choices, choices[1:]))
+                total *= count(i + 1, cm.encode_char_sep) ** seps
+        memo[(i, s)] = total
+        return total
+
+    return count(0, text)
+
+
+def _random_encoding(cm: CompiledModule, plaintext: str, ignore_case: bool, rng: random.Random) -> Optional[str]:
+    """
+    One random output, picking each token (and, for chains, each step)
+    independently.
+    """
+    if cm.chain is not None:
+        text: Optional[str] = plaintext
+        for step in cm.chain:
+            text = _random_encoding(step, text, ignore_case, rng)
+            if text is None:
+                return None
+        return text
+    if cm.tool is not None:
+        return cm.tool.encode(plaintext)
+    choices = _choices_per_char(cm, plaintext, ignore_case)
+    if choices is None:
+        return None
+    tup = [rng.choice(c) for c in choices]
+    return _join_tokens(tup, cm.encode_char_sep, cm.encode_word_sep)
+
+
+def encode_message_with_module(
+    module: "dict[str, Any] | CompiledModule",
+    plaintext: str,
+    ignore_case: bool = False,
+    limit: Optional[int] = None,
+    sample: Optional[int] = None,
+    seed: Optional[int] = None
+) -> List[str]:
+    """
+    Encode `plaintext` using `module` settings. Returns all possible
+    cipher outputs (accounting for multiple cipher‐tokens per plaintext char).
+    Supports chained modules recursively.
+    limit:  stop after the first `limit` outputs.
+    sample: return up to `sample` distinct outputs drawn at random instead
+            (reproducible with `seed`); never enumerates the full space.
+    """
+    cm = compile_module(module)
+
+    if sample is not None:
+        rng = random.Random(seed)
+        if count_encodings(cm, plaintext, ignore_case, limit=sample + 1) <= sample:
+            return list(iter_encodings(cm, plaintext, ignore_case))
+        picked: Dict[str, None] = {}
+        # Bounded retries: duplicates are rare unless the space is tiny
+        for _ in range(sample * 10):
+            enc = _random_encoding(cm, plaintext, ignore_case, rng)
+            if enc is None:
+                break
+            picked.setdefault(enc, None)
+            if len(picked) >= sample:
+                break
+        return list(picked)
 
-    return encoded_results
+    outputs = iter_encodings(cm, plaintext, ignore_case)
+    if limit is not None:
+        outputs = islice(outputs, limit)
+    return list(outputs)
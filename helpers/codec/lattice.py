@@ -0,0 +1,113 @@
+# helpers/codec/lattice.py
+
+from itertools import islice, product
+from typing import Iterator, List
+
+
+class DecodeLattice:
+    """
+    Compact result of decoding one tokenization config. Instead of the full
+    Cartesian product of candidates, it keeps for every word a list of
+    "slots", each slot being the plaintext choices for one token:
+
+        words = [
+          [["H"], ["E", "F"]],        # word 1: two tokens
+          [["HELLO", "GELLO"]],       # word 2: one slot (whole-word decode)
+        ]
+
+    A candidate picks one choice per slot, joins slots within a word with ""
+    and words with " ". Memory grows with the message length; the number of
+    candidates is only ever counted, paged or iterated on demand.
+    Candidates are paths through the lattice, so two different paths may
+    spell the same string.
+    """
+
+    def __init__(self, words: List[List[List[str]]]):
+        self.words = words
+        # Flattened slots + how many slots each word owns, for fast indexing
+        self._slots: List[List[str]] = [slot for word in words for slot in word]
+        self._word_sizes: List[int] = [len(word) for word in words]
+        # ConfigStats of the config this lattice came from, when instrumented
+        self.stats = None
+
+    def count(self) -> int:
+        """
+        Total number of candidates, without expanding any of them.
+        """
+        total = 1
+        for slot in self._slots:
+            total *= len(slot)
+        return total
+
+    def word_count(self, index: int) -> int:
+        """
+        Number of variants of word `index`.
+        """
+        total = 1
+        for slot in self.words[index]:
+            total *= len(slot)
+        return total
+
+    def word_variants(self, index: int) -> Iterator[str]:
+        """
+        Lazily yield every variant of word `index`.
+        """
+        for combo in product(*self.words[index]):
+            yield "".join(combo)
+
+    def _join(self, combo) -> str:
+        parts: List[str] = []
+        pos = 0
+        for size in self._word_sizes:
+            parts.append("".join(combo[pos : pos + size]))
+            pos += size
+        return " ".join(parts)
+
+    def __iter__(self) -> Iterator[str]:
+        for combo in product(*self._slots):
+            yield self._join(combo)
+
+    def candidate(self, index: int) -> str:
+        """
+        The `index`-th candidate in iteration order (mixed-radix lookup,
+        nothing else is expanded).
+        """
+        total = self.count()
+        if not 0 <= index < total:
+            raise IndexError("lattice candidate index out of range")
+        combo: List[str] = [""] * len(self._slots)
+        for pos in range(len(self._slots) - 1, -1, -1):
+            slot = self._slots[pos]
+            index, digit = divmod(index, len(slot))
+            combo[pos] = slot[digit]
+        return self._join(combo)
+
+    def page(self, start: int, size: int) -> List[str]:
+        """
+        Up to `size` candidates starting at position `start`.
+        """
+        if start < 0 or start >= self.count() or size <= 0:
+            return []
+        return list(islice(self._iter_from(start), size))
+
+    def _iter_from(self, start: int) -> Iterator[str]:
+        # Mixed-radix counter over the slots, seeded at `start`
+        digits: List[int] = [0] * len(self._slots)
+        index = start
+        for pos in range(len(self._slots) - 1, -1, -1):
+            index, digits[pos] = divmod(index, len(self._slots[pos]))
+        while True:
+            yield self._join([self._slots[p][d] for p, d in enumerate(digits)])
+            # Increment the mixed-radix counter, last slot fastest
+            pos = len(digits) - 1
+            while pos >= 0:
+                digits[pos] += 1
+                if digits[pos] < len(self._slots[pos]):
+                    break
+                digits[pos] = 0
+                pos -= 1
+            if pos < 0:
+                return
+
+    def __repr__(self) -> str:
+        return f"DecodeLattice(words={len(self.words)}, candidates={self.count()})"
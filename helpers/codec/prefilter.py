@@ -0,0 +1,148 @@
+# helpers/codec/prefilter.py
+
+from typing import Dict, List, Mapping, Set
+
+from .compiled import CompiledModule
+
+# Trie node key holding the bitmask of modules whose token ends at the node
+_END = None
+
+
+class PrefilterResult:
+    """
+    Outcome of one ModulePrefilter.scan():
+      - perfect:  names of modules that might tokenize the whole message
+      - coverage: name → fraction of non-whitespace characters that lie
+                  inside some token/separator of that module (0.0–1.0)
+    """
+
+    def __init__(self, perfect: Set[str], coverage: Dict[str, float]):
+        self.perfect = perfect
+        self.coverage = coverage
+
+    def __repr__(self) -> str:
+        return f"PrefilterResult(perfect={sorted(self.perfect)})"
+
+
+class ModulePrefilter:
+    """
+    One trie built from the cipher tokens and separators of many modules;
+    each terminal node stores a bitmask of the modules that own the token.
+    A single left-to-right scan of a message tracks, per position, which
+    modules can reach it by chaining their own tokens (whitespace may be
+    skipped by anyone), and how much of the message each module's tokens
+    cover.
+
+    The test is deliberately generous: it accepts every string any
+    tokenization config could accept, so a module it rejects can never
+    decode perfectly. Chain and tool modules have no tokens of their own
+    and are always let through.
+    """
+
+    def __init__(self, modules: Mapping[str, CompiledModule]):
+        self.names: List[str] = list(modules)
+        self.root: dict = {}
+        self.sensitive_mask = 0
+        self.insensitive_mask = 0
+        self.passthrough: Set[str] = set()
+
+        for bit, (name, cm) in enumerate(modules.items()):
+            if cm.composite:
+                self.passthrough.add(name)
+                continue
+            mask = 1 << bit
+            if cm.case_sensitive:
+                self.sensitive_mask |= mask
+            else:
+                self.insensitive_mask |= mask
+            for tok in list(cm.forward) + cm.char_seps + cm.word_seps:
+                if not tok:
+                    continue
+                node = self.root
+                for ch in tok:
+                    node = node.setdefault(ch, {})
+                node[_END] = node.get(_END, 0) | mask
+
+    def scan(self, message: str) -> PrefilterResult:
+        """
+        Classify every module against `message` in O(len(message)) trie
+        steps (times the longest token length).
+        """
+        text = message.replace("\r\n", " ").replace("\n", " ")
+        upper = text.upper()
+
+        reach_bits = 0
+        covered: Dict[int, int] = {}
+        if upper == text:
+            reach_bits, covered = self._scan(text, self.sensitive_mask | self.insensitive_mask)
+        else:
+            # Case-insensitive modules see the upper-cased text, like the tokenizer
+            if self.sensitive_mask:
+                r, c = self._scan(text, self.sensitive_mask)
+                reach_bits |= r
+                covered.update(c)
+            if self.insensitive_mask:
+                r, c = self._scan(upper, self.insensitive_mask)
+                reach_bits |= r
+                covered.update(c)
+
+        total = sum(1 for ch in text if not ch.isspace())
+        perfect: Set[str] = set(self.passthrough)
+        coverage: Dict[str, float] = {name: 1.0 for name in self.passthrough}
+        for bit, name in enumerate(self.names):
+            if name in self.passthrough:
+                continue
+            if reach_bits >> bit & 1:
+                perfect.add(name)
+            coverage[name] = min(1.0, covered.get(bit, 0) / total) if total else 1.0
+        return PrefilterResult(perfect, coverage)
+
+    def _scan(self, text: str, active: int):
+        """
+        Returns (bitmask of modules that can reach the end of `text`,
+        {bit: covered non-whitespace character count}) for modules in `active`.
+        """
+        n = len(text)
+        root = self.root
+        reach = [0] * (n + 1)
+        reach[0] = active
+
+        # Prefix counts of non-whitespace characters, for span coverage
+        solid = [0] * (n + 1)
+        for i, ch in enumerate(text):
+            solid[i + 1] = solid[i] + (0 if ch.isspace() else 1)
+
+        covered: Dict[int, int] = {}
+        cover_end: Dict[int, int] = {}
+
+        for i in range(n):
+            r = reach[i]
+            if r and text[i].isspace():
+                reach[i + 1] |= r
+            node = root
+            j = i
+            while j < n:
+                node = node.get(text[j])
+                if node is None:
+                    break
+                j += 1
+                mask = node.get(_END)
+                if not mask:
+                    continue
+                mask &= active
+                if not mask:
+                    continue
+                if r & mask:
+                    reach[j] |= r & mask
+                # Grow each owning module's covered union by [i, j)
+                bits = mask
+                while bits:
+                    low = bits & -bits
+                    bit = low.bit_length() - 1
+                    bits ^= low
+                    end = cover_end.get(bit, 0)
+                    if j > end:
+                        covered[bit] = covered.get(bit, 0) + solid[j] - solid[max(i, end)]
+                        cover_end[bit] = j
+
+        return reach[n], covered
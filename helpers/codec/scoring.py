@@ -0,0 +1,152 @@
+# helpers/codec/scoring.py
+
+import heapq
+from operator import eq
+from typing import Any, Container, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Distinct words whose dictionary verdict is remembered before the cache resets
+_WORD_HIT_CACHE_LIMIT = 65536
+
+
+class ScoredCandidate(NamedTuple):
+    """
+    One decoded candidate and how it ranks:
+      - accuracy:  fraction (0.0–1.0) of characters that were actually
+                   translated, i.e. differ from the cipher text at the same
+                   position (pass-through characters count against it)
+      - dict_hits: number of words found in the dictionary (tie-breaker)
+      - fluency:   mean letter-model log-probability of the text (see
+                   utils.load_ngram_model); breaks the remaining ties, which
+                   matters most when the dictionary is small or missing
+    """
+    module: str
+    text: str
+    accuracy: float
+    dict_hits: int
+    fluency: float
+
+
+def rank_key(c: ScoredCandidate) -> Tuple[float, int, float]:
+    """
+    Sort key shared by every view: accuracy first, dictionary hits second,
+    letter-model fluency third.
+    """
+    return c.accuracy, c.dict_hits, c.fluency
+
+
+def _accuracy(decoded: str, input_stripped: str) -> float:
+    """
+    translated / (translated + untranslated) over space-stripped texts:
+    positions shared with the input count as translated when the
+    characters differ; extra decoded characters count as translated if they
+    are letters.
+    """
+    shared = min(len(decoded), len(input_stripped))
+    untranslated = sum(map(eq, decoded, input_stripped))
+    translated = shared - untranslated
+    tail = decoded[shared:]
+    tail_alpha = sum(map(str.isalpha, tail))
+    translated += tail_alpha
+    untranslated += len(tail) - tail_alpha
+    total = translated + untranslated
+    return translated / total if total > 0 else 0.0
+
+
+class CandidateScorer:
+    """
+    Scores decoded candidates against the cipher text they came from.
+    Dictionary verdicts are cached per upper-cased word for the scorer's
+    lifetime, so scoring thousands of candidates (or many messages) that
+    share words only looks each word up once. Keep one scorer per
+    dictionary and reuse it. `ngrams` defaults to the shared letter model.
+    """
+
+    def __init__(self, dictionary: Optional[Container[str]] = None, ngrams: Optional[Any] = None):
+        if dictionary is None:
+            from utils import load_dictionary
+            dictionary = load_dictionary()
+        if ngrams is None:
+            from utils import load_ngram_model
+            ngrams = load_ngram_model()
+        self.dictionary = dictionary
+        self.ngrams = ngrams
+        self._hits: Dict[str, bool] = {}
+
+    def accuracy(self, text: str, raw_input: str) -> float:
+        return _accuracy("".join(text.split()), "".join(raw_input.split()))
+
+    def is_word(self, word: str) -> bool:
+        key = word.upper()
+        hit = self._hits.get(key)
+        if hit is None:
+            if len(self._hits) >= _WORD_HIT_CACHE_LIMIT:
+                self._hits.clear()
+            hit = self._hits[key] = key in self.dictionary
+        return hit
+
+    def dict_hits(self, text: str) -> int:
+        return sum(map(self.is_word, text.split()))
+
+    def score_batch(
+        self,
+        detected: Iterable[Tuple[str, Iterable[str]]],
+        raw_input: str,
+        min_accuracy: float = 0.0
+    ) -> List[ScoredCandidate]:
+        """
+        Score auto_detect()-style results [(module, [text, …]), …] decoded
+        from `raw_input`, keeping those with accuracy >= min_accuracy, in
+        input order. Dictionary lookups and letter-model scoring only happen
+        for kept candidates.
+        """
+        input_stripped = "".join(raw_input.split())
+        out: List[ScoredCandidate] = []
+        for module, texts in detected:
+            for text in texts:
+                acc = _accuracy("".join(text.split()), input_stripped)
+                if acc >= min_accuracy:
+                    out.append(ScoredCandidate(
+                        module, text, acc, self.dict_hits(text), self.ngrams.score(text)
+                    ))
+        return out
+
+
+def score_results(
+    detected: Iterable[Tuple[str, Iterable[str]]],
+    raw_input: str,
+    min_accuracy: float = 0.0,
+    dictionary: Optional[Container[str]] = None
+) -> List[ScoredCandidate]:
+    """
+    One-call form of CandidateScorer(dictionary).score_batch().
+    """
+    return CandidateScorer(dictionary).score_batch(detected, raw_input, min_accuracy)
+
+
+def top_k(scored: Iterable[ScoredCandidate], k: int) -> List[ScoredCandidate]:
+    """
+    Best `k` candidates across all modules, best first, by a heap instead of
+    a full sort. Ties keep their input order.
+    """
+    return heapq.nlargest(k, scored, key=rank_key)
+
+
+def group_by_module(scored: Iterable[ScoredCandidate]) -> Dict[str, List[ScoredCandidate]]:
+    """
+    Candidates per module, modules in first-seen order, items unsorted.
+    """
+    grouped: Dict[str, List[ScoredCandidate]] = {}
+    for c in scored:
+        grouped.setdefault(c.module, []).append(c)
+    return grouped
+
+
+def word_hit_fraction(text: str, dictionary: Container[str]) -> float:
+    """
+    Fraction of whitespace-separated words of `text` found in `dictionary`
+    (0.0 for empty text).
+    """
+    words = text.split()
+    if not words:
+        return 0.0
+    return sum(1 for w in words if w.upper() in dictionary) / len(words)
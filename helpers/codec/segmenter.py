@@ -0,0 +1,116 @@
+# helpers/codec/segmenter.py
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Cap on how many partial paths to generate before pruning
+_MAX_PATHS = 10000
+
+# Trie node key marking "a token ends here"; never collides with a 1-char str
+_END = None
+
+
+class TokenTrie:
+    """
+    Prefix trie over a module's cipher tokens. Each terminal node stores the
+    token's position in the original key order, so matches come back in the
+    same order the old `for tok in mapping.keys()` loop produced them.
+    """
+
+    def __init__(self, tokens: Iterable[str]):
+        self.root: dict = {}
+        self.tokens: List[str] = []
+        for tok in tokens:
+            if not tok:
+                # An empty key would match everywhere without consuming input
+                continue
+            node = self.root
+            for ch in tok:
+                node = node.setdefault(ch, {})
+            if _END not in node:
+                node[_END] = len(self.tokens)
+                self.tokens.append(tok)
+
+    def matches(self, word: str, start: int) -> List[Tuple[int, str]]:
+        """
+        All tokens that occur in `word` at `start`, as (end_index, token),
+        ordered by key order.
+        """
+        found: List[Tuple[int, int, str]] = []
+        node = self.root
+        i = start
+        n = len(word)
+        while i < n:
+            node = node.get(word[i])
+            if node is None:
+                break
+            i += 1
+            order = node.get(_END)
+            if order is not None:
+                found.append((order, i, self.tokens[order]))
+        if len(found) > 1:
+            found.sort()
+        return [(end, tok) for _, end, tok in found]
+
+
+def segment_decode(
+    word: str,
+    trie: TokenTrie,
+    mapping: Dict[str, List[str]],
+    flawed: bool
+) -> List[str]:
+    """
+    Split `word` into mapping tokens and return every plaintext it can decode
+    to. Position-indexed DP: results[i] holds the finished decodings of
+    word[i:], and the token spans leaving each position are looked up in the
+    trie once. Positions are resolved on demand with an explicit stack (no
+    recursion limit on long words), in the same order the old recursive
+    decoder visited them, so the output - including where the _MAX_PATHS
+    cap cuts it off - is identical.
+    If flawed=True, a position with no matching token passes its character
+    through literally.
+    """
+    n = len(word)
+    results: List[Optional[List[str]]] = [None] * (n + 1)
+    results[n] = [""]
+    # Per-position work in progress: [spans, next span index, partial output]
+    pending: Dict[int, list] = {}
+
+    stack = [0]
+    while stack:
+        i = stack[-1]
+        state = pending.get(i)
+        if state is None:
+            found = trie.matches(word, i)
+            if not found and flawed:
+                # Literal pass-through of one character
+                found = [(i + 1, None)]
+            state = pending[i] = [found, 0, []]
+
+        found, k, out = state
+        blocked = False
+        while k < len(found):
+            end, tok = found[k]
+            tails = results[end]
+            if tails is None:
+                # Resolve the suffix first, then come back to this span
+                state[1] = k
+                stack.append(end)
+                blocked = True
+                break
+            fragments = mapping[tok] if tok is not None else (word[i],)
+            for fragment in fragments:
+                for tail in tails:
+                    out.append(fragment + tail)
+                    if len(out) > _MAX_PATHS:
+                        break
+                if len(out) > _MAX_PATHS:
+                    break
+            k = len(found) if len(out) > _MAX_PATHS else k + 1
+
+        if blocked:
+            continue
+        results[i] = out
+        del pending[i]
+        stack.pop()
+
+    return results[0]
@@ -0,0 +1,261 @@
+# helpers/codec/stats.py
+
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import cProfile
+
+# Slowest segmented words kept per config
+_SLOW_WORDS_KEPT = 5
+
+# DecodeStats collecting for the current thread/context, if any
+_ACTIVE: ContextVar[Optional["DecodeStats"]] = ContextVar("decode_stats", default=None)
+
+
+def active_stats() -> Optional["DecodeStats"]:
+    """
+    The DecodeStats activated in this context, or None (the normal case:
+    instrumentation hooks then cost one lookup).
+    """
+    return _ACTIVE.get()
+
+
+class ConfigStats:
+    """
+    Measurements for decoding one tokenization config of one module:
+      - seconds:     lattice build + expansion wall time
+      - paths:       candidates in the lattice (before any pruning)
+      - candidates:  distinct candidates actually expanded
+      - pruned:      True if `paths` exceeded the _MAX_PATHS expansion limit
+      - memo_hits / memo_misses: word-memo lookups in get_recursive_decode
+      - words_truncated: segmented words cut off at _MAX_PATHS variants
+      - slow_words:  [(seconds, word, variants)] slowest segmented words
+    `start` is a time.perf_counter() value, used for trace timelines.
+    """
+
+    def __init__(self, module: str, config: int, flawed: bool):
+        self.module = module
+        self.config = config
+        self.flawed = flawed
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.paths = 0
+        self.candidates = 0
+        self.pruned = False
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.words_truncated = 0
+        self.slow_words: List[Tuple[float, str, int]] = []
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+
+    def word(self, word: str, seconds: float, variants: int, truncated: bool) -> None:
+        self.memo_misses += 1
+        if truncated:
+            self.words_truncated += 1
+        entry = (seconds, word, variants)
+        if len(self.slow_words) < _SLOW_WORDS_KEPT:
+            heapq.heappush(self.slow_words, entry)
+        elif entry > self.slow_words[0]:
+            heapq.heapreplace(self.slow_words, entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = dict(self.__dict__)
+        d["slow_words"] = sorted(self.slow_words, reverse=True)
+        return d
+
+    def __repr__(self) -> str:
+        return f"ConfigStats({self.module!r}, cfg={self.config}, {self.seconds * 1e3:.1f} ms)"
+
+
+class DecodeStats:
+    """
+    Optional instrumentation for decode runs. Pass one to auto_detect(),
+    decode_message_with_module(), decode_many() or detect_many() via their
+    `stats` argument; afterwards it holds one ConfigStats per (module,
+    config, pass), including those decoded in pool workers.
+
+    With profile=True, a cProfile profiler also runs while the stats are
+    active (calling process only; pool workers are not profiled) and can be
+    saved with write_profile().
+    """
+
+    def __init__(self, profile: bool = False):
+        self.configs: List[ConfigStats] = []
+        # module → number of messages the prefilter rejected it for
+        self.prefiltered: Dict[str, int] = {}
+        self.origin = time.perf_counter()
+        self.profiler: Optional["cProfile.Profile"] = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # ─── collection ──────────────────────────────────────────────────────────
+    @contextmanager
+    def activate(self) -> Iterator["DecodeStats"]:
+        """
+        Make this the collector for codec hooks in the current context.
+        """
+        token = _ACTIVE.set(self)
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            yield self
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+            _ACTIVE.reset(token)
+
+    def begin(self, module: str, config: int, flawed: bool) -> ConfigStats:
+        rec = ConfigStats(module, config, flawed)
+        self._local.current = rec
+        return rec
+
+    def end(self, rec: ConfigStats, lattice: Any) -> None:
+        """
+        Close the lattice-building part of `rec`; expansion time is added by
+        expand_lattice() through lattice.stats.
+        """
+        rec.seconds += time.perf_counter() - rec.start
+        if lattice is not None:
+            rec.paths = lattice.count()
+            lattice.stats = rec
+        self._local.current = None
+        self.add([rec])
+
+    @property
+    def current(self) -> Optional[ConfigStats]:
+        """
+        The config being built on this thread (receives word-memo events).
+        """
+        return getattr(self._local, "current", None)
+
+    def rejected(self, names: List[str]) -> None:
+        """
+        Count modules the Auto-Detect prefilter skipped for one message.
+        """
+        with self._lock:
+            for name in names:
+                self.prefiltered[name] = self.prefiltered.get(name, 0) + 1
+
+    def add(self, records: List[ConfigStats], prefiltered: Optional[Dict[str, int]] = None) -> None:
+        """
+        Merge records (and prefilter counts), e.g. those returned by a pool
+        worker.
+        """
+        with self._lock:
+            self.configs.extend(records)
+            for name, n in (prefiltered or {}).items():
+                self.prefiltered[name] = self.prefiltered.get(name, 0) + n
+
+    # ─── reporting ───────────────────────────────────────────────────────────
+    def per_module(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Totals per module, in the order modules were first seen.
+        """
+        out: Dict[str, Dict[str, Any]] = {}
+        for rec in self.configs:
+            m = out.setdefault(rec.module, {
+                "configs": 0, "seconds": 0.0, "paths": 0, "candidates": 0,
+                "pruned": 0, "memo_hits": 0, "memo_misses": 0, "words_truncated": 0,
+            })
+            m["configs"] += 1
+            m["seconds"] += rec.seconds
+            m["paths"] += rec.paths
+            m["candidates"] += rec.candidates
+            m["pruned"] += rec.pruned
+            m["memo_hits"] += rec.memo_hits
+            m["memo_misses"] += rec.memo_misses
+            m["words_truncated"] += rec.words_truncated
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "modules": self.per_module(),
+            "configs": [rec.to_dict() for rec in self.configs],
+            "prefiltered": dict(self.prefiltered),
+        }
+
+    def summary(self, top: int = 5) -> str:
+        """
+        Plain-text report: per-module table, then the slowest configs and
+        the slowest words.
+        """
+        lines = [
+            f"{'module':<24} {'cfgs':>5} {'ms':>9} {'paths':>10} {'cands':>7} "
+            f"{'pruned':>6} {'memo hit/miss':>14}"
+        ]
+        modules = self.per_module()
+        for name, m in sorted(modules.items(), key=lambda kv: -kv[1]["seconds"]):
+            paths = f"{m['paths']:.2e}" if m["paths"] >= 10 ** 10 else str(m["paths"])
+            lines.append(
+                f"{name[:24]:<24} {m['configs']:>5} {m['seconds'] * 1e3:>9.1f} {paths:>10} "
+                f"{m['candidates']:>7} {m['pruned']:>6} {m['memo_hits']:>6}/{m['memo_misses']:<7}"
+            )
+        if self.prefiltered:
+            rejected = ", ".join(f"{name} ×{n}" for name, n in self.prefiltered.items())
+            lines.append(f"prefilter rejected: {rejected}")
+
+        slowest = heapq.nlargest(top, self.configs, key=lambda r: r.seconds)
+        if slowest:
+            lines.append("")
+            lines.append("slowest configs:")
+            for rec in slowest:
+                flag = " pruned" if rec.pruned else ""
+                pass_name = "flawed" if rec.flawed else "perfect"
+                lines.append(
+                    f"  {rec.module} cfg {rec.config} ({pass_name}): {rec.seconds * 1e3:.1f} ms, "
+                    f"{rec.paths} paths{flag}"
+                )
+
+        words = heapq.nlargest(top, (
+            (secs, word, variants, rec.module)
+            for rec in self.configs for secs, word, variants in rec.slow_words
+        ))
+        if words:
+            lines.append("")
+            lines.append("slowest words:")
+            for secs, word, variants, module in words:
+                shown = word if len(word) <= 40 else word[:37] + "..."
+                lines.append(f"  {module}: {shown!r} {secs * 1e3:.2f} ms, {variants} variants")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Save the configs as Chrome trace events (chrome://tracing, Perfetto):
+        one complete event per config, grouped by process and thread.
+        """
+        events = []
+        for rec in self.configs:
+            args = rec.to_dict()
+            for key in ("module", "start", "pid", "tid"):
+                args.pop(key)
+            events.append({
+                "name": f"{rec.module} [cfg {rec.config}]",
+                "cat": "flawed" if rec.flawed else "perfect",
+                "ph": "X",
+                "ts": (rec.start - self.origin) * 1e6,
+                "dur": rec.seconds * 1e6,
+                "pid": rec.pid,
+                "tid": rec.tid,
+                "args": args,
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+    def write_profile(self, path: str) -> None:
+        """
+        Save the cProfile data (pstats format); requires profile=True.
+        """
+        if self.profiler is None:
+            raise ValueError("DecodeStats was created without profile=True")
+        self.profiler.dump_stats(path)
@@ -0,0 +1,60 @@
+# helpers/codec/steps.py
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+
+# Keys of a tool step that are not parameters of the tool itself
+_STEP_KEYS = ("tool", "name", "metadata", "label")
+
+
+@lru_cache(maxsize=None)
+def _tool_functions(tool: str) -> Tuple[Callable[..., str], Callable[..., str]]:
+    """
+    (encrypt, decrypt) for `tool`, both called as f(text, **params).
+    tools.py is imported here, on first use, so importing the codec never
+    pays for it.
+    """
+    import tools
+
+    table: Dict[str, Tuple[Callable[..., str], Callable[..., str]]] = {
+        "caesar": (
+            lambda text, shift: tools.caesar_translate(text, shift),
+            lambda text, shift: tools.caesar_translate(text, -shift),
+        ),
+        "keyshift": (
+            lambda text, shift, layout=tools.DEFAULT_LAYOUT: tools.keyshift_translate(text, shift, layout),
+            lambda text, shift, layout=tools.DEFAULT_LAYOUT: tools.keyshift_translate(text, -shift, layout),
+        ),
+        "vigenere": (tools.vigenere_encrypt, tools.vigenere_decrypt),
+        "affine": (tools.affine_encrypt, tools.affine_decrypt),
+        "railfence": (tools.railfence_encrypt, tools.railfence_decrypt),
+        "polybius": (tools.polybius_encode, tools.polybius_decode),
+    }
+    try:
+        return table[tool]
+    except KeyError:
+        raise ValueError(f"unknown tool step: {tool!r} (expected one of {', '.join(table)})") from None
+
+
+class ToolStep:
+    """
+    A chain step backed by a tools.py transform instead of a token mapping,
+    e.g. {"tool": "keyshift", "shift": -1} or {"tool": "caesar", "shift": 3}.
+    Every other key of the step is passed to the tool as a parameter. Tools
+    are deterministic, so each direction yields exactly one text.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.tool: str = data["tool"]
+        self.params: Dict[str, Any] = {k: v for k, v in data.items() if k not in _STEP_KEYS}
+        _tool_functions(self.tool)  # reject unknown tools at compile time
+
+    def encode(self, text: str) -> str:
+        return _tool_functions(self.tool)[0](text, **self.params)
+
+    def decode(self, text: str) -> str:
+        return _tool_functions(self.tool)[1](text, **self.params)
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v!r}" for k, v in self.params.items())
+        return f"ToolStep({self.tool}{', ' + params if params else ''})"
@@ -1,37 +1,10 @@
 # helpers/codec/tokenizer.py
 
+import time
 from typing import Any, List, Dict
-from module_loader import get_module_settings, get_module_mapping, is_case_sensitive
-from utils import as_list
-
-# Cap on how many partial paths to generate before pruning
-_MAX_PATHS = 10000
-
-
-def _invert_map(orig: Dict[str, Any]) -> Dict[str, List[str]]:
-    """
-    Invert a forward mapping (cipher→plaintext or plaintext→cipher) so that each
-    value (or each element of a list value) maps back to its key.
-    """
-    inv: Dict[str, List[str]] = {}
-    for k, v in orig.items():
-        targets = v if isinstance(v, list) else [v]
-        for tgt in targets:
-            inv.setdefault(tgt, []).append(k)
-    return inv
-
-
-def _normalize_map(orig: Dict[str, Any]) -> Dict[str, List[str]]:
-    """
-    Ensure each mapping value is a list of plaintext strings.
-    """
-    m: Dict[str, List[str]] = {}
-    for k, v in orig.items():
-        if isinstance(v, list):
-            m[k] = v.copy()
-        else:
-            m[k] = [v]
-    return m
+from .compiled import CompiledModule, compile_module, _invert_map, _normalize_map, _WORD_CACHE_LIMIT
+from .segmenter import TokenTrie, segment_decode, _MAX_PATHS
+from .stats import active_stats
 
 
 def _recursive_decode(
@@ -41,50 +14,22 @@ def _recursive_decode(
     memo: Dict[str, List[str]] | None = None
 ) -> List[str]:
     """
-    Recursively split `word` into tokens that match mapping keys, then
-    produce all possible plaintext strings for that word. If flawed=True,
-    allow single-character fallback when no key matches.
-    Early exit if more than _MAX_PATHS results accumulate.
+    Split `word` into tokens that match mapping keys, then produce all
+    possible plaintext strings for that word. If flawed=True, allow
+    single-character fallback when no key matches. Stops at _MAX_PATHS.
+    Builds a throwaway TokenTrie for `mapping`; callers holding a
+    CompiledModule should go through get_recursive_decode, which reuses
+    the module's trie.
     """
-    if memo is None:
-        memo = {}
-
-    if word == "":
-        return [""]
-
-    if word in memo:
+    if memo is not None and word in memo:
         return memo[word]
-
-    results: List[str] = []
-    matched = False
-
-    # Try every mapping key that matches the start of `word`
-    for tok in mapping.keys():
-        if word.startswith(tok):
-            matched = True
-            suffix = word[len(tok):]
-            for plaintext_fragment in mapping[tok]:
-                for tail in _recursive_decode(suffix, mapping, flawed, memo):
-                    results.append(plaintext_fragment + tail)
-                    if len(results) > _MAX_PATHS:
-                        memo[word] = results
-                        return results
-
-    # If nothing matched and flawed=True, drop first character literally
-    if not matched and flawed:
-        first_char = word[0]
-        suffix = word[1:]
-        for tail in _recursive_decode(suffix, mapping, flawed, memo):
-            results.append(first_char + tail)
-            if len(results) > _MAX_PATHS:
-                memo[word] = results
-                return results
-
-    memo[word] = results
+    results = segment_decode(word, TokenTrie(mapping), mapping, flawed)
+    if memo is not None:
+        memo[word] = results
     return results
 
 
-def tokenize_message_with_module(module: dict[str, Any], cipher: str) -> List[dict]:
+def tokenize_message_with_module(module: "dict[str, Any] | CompiledModule", cipher: str) -> List[dict]:
     """
     For a given `module` definition and raw `cipher` string, produce a list
     of tokenization configurations. Each config is:
@@ -94,56 +39,22 @@ def tokenize_message_with_module(module: dict[str, Any], cipher: str) -> List[di
         }
     Mirrors the logic in Decoder.jsx for splitting on word_separator and/or character_separator.
     """
-    sets = get_module_settings(module)
-
-    # 1) Collect raw separators from JSON
-    raw_char_seps = as_list(sets.get("character_separator", None))
-    char_seps: List[str] = [rc if isinstance(rc, str) else "" for rc in raw_char_seps]
-
-    raw_word_seps = as_list(sets.get("word_separator", " "))
-    word_seps: List[str] = [rw if isinstance(rw, str) else "" for rw in raw_word_seps]
-
-    # 2) chunk_size (only applies when char_sep is blank)
-    chunk_size = None
-    csizes = sets.get("chunk_size", [None, None])
-    if isinstance(csizes, list) and csizes[0]:
-        chunk_size = csizes[0]
-
-    # 3) Build forward mapping from cipher→plaintext, possibly inverted first
-    raw_map = get_module_mapping(module)
-    if sets.get("reverse_direction", False):
-        raw_map = _invert_map(raw_map)
-
-    # Handle case‐sensitivity: if not case-sensitive, uppercase everything
-    case_sensitive = is_case_sensitive(module)
-    if not case_sensitive:
-        up_map: Dict[str, List[str]] = {}
-        for k, v in raw_map.items():
-            k_up = k.upper()
-            if isinstance(v, list):
-                up_map[k_up] = [vv.upper() for vv in v]
-            else:
-                up_map[k_up] = [v.upper()]
-        raw_map = up_map
-
-    # Normalize so that each mapping key→list of plaintext values
-    mapping = _normalize_map(raw_map)
-
-    # 4) Normalize the cipher text: collapse newlines→spaces; uppercase if needed
-    text = cipher.replace("\r\n", " ").replace("\n", " ")
-    if not case_sensitive:
-        text = text.upper()
+    cm = compile_module(module)
+    chunk_size = cm.chunk_size
+
+    # Normalize the cipher text: collapse newlines→spaces; uppercase if needed
+    text = cm.normalize_text(cipher)
 
     configs: List[dict] = []
 
-    for ws in word_seps:
+    for ws in cm.word_seps:
         sep = ws or ""
         if sep:
             words = text.split(sep)
         else:
             words = [text]
 
-        for cs in char_seps:
+        for cs in cm.char_seps:
             char_sep_blank = (cs == "")
             cfg: List[List[str]] = []
             ok = True
@@ -175,29 +86,32 @@ def tokenize_message_with_module(module: dict[str, Any], cipher: str) -> List[di
 
 def get_recursive_decode(
     word: str,
-    module: dict[str, Any],
+    module: "dict[str, Any] | CompiledModule",
     flawed: bool
 ) -> List[str]:
     """
-    Exposed helper: build a normalized mapping, then call _recursive_decode 
-    on the entire `word`. Used by decoder logic.
+    Exposed helper: segment and decode the entire `word` using the module's
+    compiled forward mapping and token trie. Used by decoder logic.
+    Results are memoized on the compiled module, so a word that repeats -
+    within a message or across messages - is only segmented once. The
+    returned list is shared; callers must not modify it.
     """
-    sets = get_module_settings(module)
-    raw_map = get_module_mapping(module)
-
-    if sets.get("reverse_direction", False):
-        raw_map = _invert_map(raw_map)
-
-    case_sensitive = is_case_sensitive(module)
-    if not case_sensitive:
-        up_map: Dict[str, List[str]] = {}
-        for k, v in raw_map.items():
-            k_up = k.upper()
-            if isinstance(v, list):
-                up_map[k_up] = [vv.upper() for vv in v]
-            else:
-                up_map[k_up] = [v.upper()]
-        raw_map = up_map
-
-    mapping = _normalize_map(raw_map)
-    return _recursive_decode(word, mapping, flawed, memo=None)
+    cm = compile_module(module)
+    stats = active_stats()
+    rec = stats.current if stats is not None else None
+    key = (word, flawed)
+    cached = cm.word_cache.get(key)
+    if cached is not None:
+        if rec is not None:
+            rec.memo_hits += 1
+        return cached
+    if len(cm.word_cache) >= _WORD_CACHE_LIMIT:
+        cm.word_cache.clear()
+    if rec is None:
+        results = cm.word_cache[key] = segment_decode(word, cm.trie, cm.forward, flawed)
+        return results
+    start = time.perf_counter()
+    results = cm.word_cache[key] = segment_decode(word, cm.trie, cm.forward, flawed)
+    # segment_decode stops one past the cap, so only a cut list is longer
+    rec.word(word, time.perf_counter() - start, len(results), len(results) > _MAX_PATHS)
+    return results
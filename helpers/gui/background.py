@@ -0,0 +1,85 @@
+# helpers/gui/background.py
+
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+
+class BackgroundTask:
+    """
+    Runs `work(task)` on a daemon worker thread and hands everything it
+    produces back to the Tk thread:
+      - task.report(*args) from the worker → on_progress(*args) on the Tk thread
+      - work's return value                → on_done(result)
+      - an exception raised by work       → on_error(exc)
+    The worker never touches Tk; messages go through a thread-safe queue that
+    the Tk thread drains every `poll_ms` with after(), so redraws and input
+    keep flowing while the task runs.
+    cancel_event / skip_event are threading.Event objects the UI can set and
+    the worker can pass straight to the codec as cancel/skip flags.
+    """
+
+    def __init__(
+        self,
+        widget,
+        work: Callable[["BackgroundTask"], Any],
+        on_progress: Optional[Callable[..., None]] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        poll_ms: int = 50
+    ):
+        self.widget = widget
+        self.work = work
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+
+        self.cancel_event = threading.Event()
+        self.skip_event = threading.Event()
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundTask":
+        self._thread.start()
+        self.widget.after(self.poll_ms, self._drain)
+        return self
+
+    def report(self, *args) -> None:
+        """
+        Called from the worker thread; forwarded to on_progress on the Tk thread.
+        """
+        self._queue.put(("progress", args))
+
+    def _run(self) -> None:
+        try:
+            result = self.work(self)
+        except BaseException as exc:
+            self._queue.put(("error", exc))
+        else:
+            self._queue.put(("done", result))
+
+    def _drain(self) -> None:
+        """
+        Deliver queued messages on the Tk thread, then reschedule until the
+        worker has finished.
+        """
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(*payload)
+            elif kind == "done":
+                if self.on_done:
+                    self.on_done(payload)
+                return
+            else:
+                if self.on_error:
+                    self.on_error(payload)
+                return
+
+        self.widget.after(self.poll_ms, self._drain)
@@ -2,7 +2,8 @@
 
 import tkinter as tk
 from tkinter import ttk
-from types import SimpleNamespace
+import threading
+from typing import Optional
 
 class ProgressDialog(tk.Toplevel):
     """
@@ -10,9 +11,20 @@ class ProgressDialog(tk.Toplevel):
     Has two buttons:
       - Cancel: abort entire auto‐detect
       - Skip Step: abort current module’s decoding and move on
+    Both are threading.Event flags, so a worker thread can poll them safely;
+    pass the events of a BackgroundTask to share them with the worker.
+    With skippable=False there is no Skip Step button, for searches that
+    have no step to skip (e.g. the layered Auto-Detect).
     """
 
-    def __init__(self, parent, total_modules: int):
+    def __init__(
+        self,
+        parent,
+        total_modules: int,
+        cancel_flag: Optional[threading.Event] = None,
+        skip_flag: Optional[threading.Event] = None,
+        skippable: bool = True
+    ):
         super().__init__(parent)
         self.title("Decoding Progress")
         self.transient(parent)
@@ -23,8 +35,11 @@ class ProgressDialog(tk.Toplevel):
         self.module_index = 0
 
         # Track flags
-        self.cancel_flag = SimpleNamespace(cancel=False)
-        self.skip_flag   = SimpleNamespace(skip=False)
+        self.cancel_flag = cancel_flag or threading.Event()
+        self.skip_flag   = skip_flag or threading.Event()
+
+        # Closing the window counts as Cancel
+        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
 
         # Status label
         self.status_label = ttk.Label(self, text="Starting...")
@@ -39,8 +54,9 @@ class ProgressDialog(tk.Toplevel):
         btn_frame.pack(pady=(0, 12))
 
         # Skip Step button
-        skip_btn = ttk.Button(btn_frame, text="Skip Step", command=self._on_skip)
-        skip_btn.pack(side="left", padx=8)
+        if skippable:
+            skip_btn = ttk.Button(btn_frame, text="Skip Step", command=self._on_skip)
+            skip_btn.pack(side="left", padx=8)
 
         # Cancel button
         cancel_btn = ttk.Button(btn_frame, text="Cancel", command=self._on_cancel)
@@ -51,10 +67,11 @@ class ProgressDialog(tk.Toplevel):
         self.geometry(f"+{parent.winfo_rootx()+50}+{parent.winfo_rooty()+50}")
 
     def _on_cancel(self):
-        self.cancel_flag.cancel = True
+        self.cancel_flag.set()
+        self.status_label.config(text="Cancelling…")
 
     def _on_skip(self):
-        self.skip_flag.skip = True
+        self.skip_flag.set()
 
     def update_module_phase(self, module_idx: int, module_name: str):
         """
@@ -66,7 +83,6 @@ class ProgressDialog(tk.Toplevel):
         )
         bar_value = (module_idx / self.total_modules) * 100.0
         self.progress_bar["value"] = bar_value
-        self.update_idletasks()
 
     def update_permutation_phase(self, percent: float, module_name: str):
         """
@@ -76,7 +92,14 @@ class ProgressDialog(tk.Toplevel):
             text=f"[{self.module_index}/{self.total_modules}] Testing Permutations: {module_name}"
         )
         self.progress_bar["value"] = percent
-        self.update_idletasks()
+
+    def update_status(self, text: str, percent: float):
+        """
+        Free-form status line and bar value, for searches that aren't a
+        module-by-module pass (e.g. the layered Auto-Detect).
+        """
+        self.status_label.config(text=text)
+        self.progress_bar["value"] = percent
 
     def close(self):
         self.grab_release()
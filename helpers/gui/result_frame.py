@@ -4,11 +4,128 @@ import tkinter as tk
 from tkinter import ttk
 import math
 
+from helpers.codec.scoring import ScoredCandidate, group_by_module, rank_key, score_results, top_k
+
+# Candidates shown per page of an expanded module section
+PAGE_SIZE = 200
+# Text lines a section body shows before it scrolls on its own
+_BODY_MAX_LINES = 20
+
+
+class _ModuleSection(ttk.Frame):
+    """
+    One collapsible module section. Only the header exists until the section
+    is first expanded; the body is then a single Text widget holding one
+    page of PAGE_SIZE candidates (Tk only draws the lines in view), with
+    Prev/Next paging, instead of one widget per candidate.
+    """
+
+    def __init__(
+        self,
+        parent,
+        mod_name: str,
+        items: list[ScoredCandidate],
+        min_acc: float,
+        max_acc: float,
+        readings: int = 0
+    ):
+        super().__init__(parent, relief="solid", borderwidth=1)
+        self.items = items
+        self.sorted = False
+        self.page = 0
+        self.body = None
+
+        # Header sub-frame
+        header = ttk.Frame(self)
+        header.pack(fill="x")
+
+        count = f"{len(items)} results" if not readings else f"{len(items)} best of {readings:,} readings"
+        header_text = f"{mod_name} ({count}, {min_acc * 100:.0f}%–{max_acc * 100:.0f}%)"
+        self.lbl_header = ttk.Label(header, text=header_text)
+        self.lbl_header.pack(side="left", padx=(4, 0), pady=4)
+
+        self.arrow_lbl = ttk.Label(header, text="▼")
+        self.arrow_lbl.pack(side="right", padx=(0, 4))
+
+        # Bind any click on header, label, or arrow to toggle
+        for w in (header, self.lbl_header, self.arrow_lbl):
+            w.bind("<Button-1>", lambda e: self.toggle())
+
+    def set_wrap(self, wrap_len: int):
+        self.lbl_header.configure(wraplength=wrap_len)
+
+    def toggle(self):
+        if self.body is not None and self.body.winfo_manager():
+            # If visible → collapse
+            self.body.forget()
+            self.arrow_lbl.config(text="▼")
+            return
+        # If hidden → expand (building the body on first use)
+        if self.body is None:
+            self._build_body()
+        self.body.pack(fill="x", padx=12, pady=(0, 4))
+        self.arrow_lbl.config(text="▲")
+
+    def _build_body(self):
+        if not self.sorted:
+            # Sort items by (acc, dict_hits, fluency) descending
+            self.items.sort(key=rank_key, reverse=True)
+            self.sorted = True
+
+        self.body = ttk.Frame(self)
+        text_frame = ttk.Frame(self.body)
+        text_frame.pack(fill="x")
+
+        # width=1 + fill="x": the widget simply takes the section's width
+        self.text = tk.Text(text_frame, wrap="word", width=1, height=1, bd=1, relief="solid")
+        self.text.tag_configure("odd", background="#f0f0f0")
+        vsb = ttk.Scrollbar(text_frame, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="x", expand=True)
+
+        self.pages = max(1, math.ceil(len(self.items) / PAGE_SIZE))
+        if self.pages > 1:
+            nav = ttk.Frame(self.body)
+            nav.pack(fill="x", pady=(2, 0))
+            self.prev_btn = ttk.Button(nav, text="◀ Prev", command=lambda: self._show_page(self.page - 1))
+            self.prev_btn.pack(side="left")
+            self.next_btn = ttk.Button(nav, text="Next ▶", command=lambda: self._show_page(self.page + 1))
+            self.next_btn.pack(side="right")
+            self.page_lbl = ttk.Label(nav, text="")
+            self.page_lbl.pack(side="left", expand=True)
+
+        self._show_page(0)
+
+    def _show_page(self, page: int):
+        page = max(0, min(self.pages - 1, page))
+        self.page = page
+        start = page * PAGE_SIZE
+        rows = self.items[start:start + PAGE_SIZE]
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        lines_needed = 0
+        for i, c in enumerate(rows):
+            display_line = f"{c.text}    [{c.accuracy*100:.1f}%  /  {c.dict_hits} hits]"
+            lines_needed += max(1, int(math.ceil(len(display_line) / 40)))
+            self.text.insert("end", display_line + "\n", ("odd",) if i % 2 else ())
+        self.text.delete("end-2c", "end-1c")  # trailing newline
+        self.text.configure(state="disabled", height=max(1, min(_BODY_MAX_LINES, lines_needed)))
+        self.text.yview_moveto(0.0)
+
+        if self.pages > 1:
+            self.page_lbl.config(text=f"{start + 1}–{start + len(rows)} of {len(self.items)}")
+            self.prev_btn.config(state="normal" if page > 0 else "disabled")
+            self.next_btn.config(state="normal" if page < self.pages - 1 else "disabled")
+
+
 class ResultFrame(ttk.Frame):
     """
     A scrollable, collapsible container for displaying:
       1) One “best overall” Text at the top
-      2) A series of collapsible sections, one per module
+      2) A series of collapsible sections, one per module, whose bodies are
+         built lazily and paged (see _ModuleSection)
     """
 
     def __init__(self, parent, dictionary_set: set[str]):
@@ -18,6 +135,7 @@ class ResultFrame(ttk.Frame):
         """
         super().__init__(parent)
         self.dictionary_set = dictionary_set
+        self.sections: list[_ModuleSection] = []
 
         # 1) Canvas + vertical Scrollbar
         self.canvas = tk.Canvas(self, highlightthickness=0)
@@ -44,8 +162,9 @@ class ResultFrame(ttk.Frame):
     def _on_canvas_configure(self, event):
         """
         Called whenever the canvas (and thus window) is resized.
-        1) Force inner_frame’s width to match canvas’s width.
-        2) Update wraplength for each child widget (Text or Label).
+        1) Force inner_frame’s width to match canvas’s width; Text widgets
+           are packed with fill="x" and follow it on their own.
+        2) Update wraplength of the section header labels.
         """
         # ─── Force inner_frame width ───
         new_width = event.width
@@ -53,44 +172,38 @@ class ResultFrame(ttk.Frame):
 
         # ─── Update wraplengths ───
         wrap_len = new_width - 20  # leave a small padding
-        for child in self.inner_frame.winfo_children():
-            # If it’s a Text widget, update its wrap and width
-            if isinstance(child, tk.Text):
-                child.configure(width=wrap_len)
-            # If it’s a Frame (a collapsible section), update its labels
-            elif isinstance(child, ttk.Frame):
-                for sub in child.winfo_children():
-                    # Header frame
-                    if isinstance(sub, ttk.Frame):
-                        for w in sub.winfo_children():
-                            if isinstance(w, ttk.Label):
-                                w.configure(wraplength=wrap_len - 40)
-                    # Body might contain Text widgets
-                    if isinstance(sub, tk.Text):
-                        sub.configure(width=wrap_len - 40)
+        for section in self.sections:
+            section.set_wrap(wrap_len - 40)
 
-    def display_plain_text(self, text: str):
-        """
-        Clear everything and display a single read-only Text widget (e.g. "No results" or Caesar output).
-        """
+    def _clear(self):
         for child in self.inner_frame.winfo_children():
             child.destroy()
+        self.sections = []
 
-        # Estimate height as roughly one line per 40 chars
+    def _add_text(self, text: str, **pack_opts) -> tk.Text:
+        """
+        Read-only, bordered Text sized to roughly one line per 40 chars.
+        """
         lines_needed = max(1, int(math.ceil(len(text) / 40)))
         txt_widget = tk.Text(
             self.inner_frame,
             wrap="word",
+            width=1,
             height=lines_needed,
             bd=1,
             relief="solid"
         )
         txt_widget.insert("1.0", text)
         txt_widget.configure(state="disabled")
-        txt_widget.pack(fill="x", anchor="nw", padx=4, pady=4)
+        txt_widget.pack(fill="x", **pack_opts)
+        return txt_widget
 
-        # After packing, force wrap to current width
-        self.after(10, lambda: txt_widget.configure(width=self.inner_frame.winfo_width() - 20))
+    def display_plain_text(self, text: str):
+        """
+        Clear everything and display a single read-only Text widget (e.g. "No results" or Caesar output).
+        """
+        self._clear()
+        self._add_text(text, anchor="nw", padx=4, pady=4)
         self.canvas.yview_moveto(0.0)
 
     def display_grouped_results(self, raw_outputs: list[str], min_acc_pct: float, raw_input: str):
@@ -99,174 +212,57 @@ class ResultFrame(ttk.Frame):
         min_acc_pct: minimum required accuracy (0.0–1.0)
         raw_input: the original cipher text, for pass-through detection.
 
-        Group them by module, compute adjusted accuracy (pass-through → 0),
-        then build:
-         1) “Best overall” Text at top (always visible)
-         2) A collapsible section per module (sorted by that module’s max accuracy)
+        Parses the strings and scores them with helpers.codec.scoring, then
+        shows them with display_scored(). Callers that already hold
+        auto_detect() results should score them (off the Tk thread) and call
+        display_scored() directly.
         """
-
-        # 1) Strip spaces from raw_input to compare character by character
-        input_stripped = "".join(raw_input.split())
-
-        # 2) Parse and score each entry
-        scored_entries = []
+        pairs = []
         for entry in raw_outputs:
             if entry.startswith("[") and "] " in entry:
                 mod, txt = entry.split("] ", 1)
-                mod_name = mod[1:]
+                pairs.append((mod[1:], [txt]))
             else:
-                mod_name = "Unknown"
-                txt = entry
-
-            # Remove spaces to align indices
-            decoded_stripped = "".join(txt.split())
-
-            # Count “fully translated” letters vs “untranslated”
-            translated_full = 0
-            untranslated_chars = 0
-
-            # Compare up to min length
-            min_len = min(len(input_stripped), len(decoded_stripped))
-            for i in range(min_len):
-                if decoded_stripped[i] != input_stripped[i]:
-                    translated_full += 1
-                else:
-                    untranslated_chars += 1  # pass-through is treated as untranslated
-
-            # Any extra chars in decoded beyond min_len
-            for c in decoded_stripped[min_len:]:
-                if c.isalpha():
-                    translated_full += 1
-                else:
-                    untranslated_chars += 1
-
-            # Compute accuracy = translated_full / (translated_full + untranslated_chars)
-            total_for_acc = translated_full + untranslated_chars
-            accuracy_frac = (translated_full / total_for_acc) if total_for_acc > 0 else 0.0
-
-            # Dictionary‐hits tie-breaker
-            word_list = txt.split()
-            dict_hits = sum(1 for w in word_list if w.upper() in self.dictionary_set)
-
-            if accuracy_frac >= min_acc_pct:
-                scored_entries.append((mod_name, txt, accuracy_frac, dict_hits))
-
-        if not scored_entries:
+                pairs.append(("Unknown", [entry]))
+        self.display_scored(score_results(pairs, raw_input, min_acc_pct, self.dictionary_set))
+
+    def display_scored(self, scored: list[ScoredCandidate], pruned: dict[str, int] | None = None):
+        """
+        Build:
+         1) “Best overall” Text at top (always visible)
+         2) A collapsible section per module (sorted by that module’s max accuracy)
+        `pruned` (auto_detect's) gives, per module, how many readings its
+        kept candidates were picked from; shown in the section header.
+        """
+        if not scored:
             self.display_plain_text("No results.")
             return
 
-        # 3) Group by module
-        grouped: dict[str, list[tuple[str, float, int]]] = {}
-        for mod_name, txt, acc, dh in scored_entries:
-            grouped.setdefault(mod_name, []).append((txt, acc, dh))
+        # 1) Clear existing children
+        self._clear()
 
-        # 4) Find best overall (max by (acc, dh))
-        best_mod, best_txt, best_acc, best_dh = max(
-            scored_entries, key=lambda x: (x[2], x[3])
-        )
-
-        # 5) Clear existing children
-        for child in self.inner_frame.winfo_children():
-            child.destroy()
-
-        # 6) Display “best overall” at top as a read-only Text
-        best_text = f"[{best_mod}] {best_txt}    [{best_acc*100:.1f}%  /  {best_dh} hits]"
-        lines_needed = max(1, int(math.ceil(len(best_text) / 40)))
-        best_widget = tk.Text(
-            self.inner_frame,
-            wrap="word",
-            height=lines_needed,
-            bd=1,
-            relief="solid"
-        )
-        best_widget.insert("1.0", best_text)
-        best_widget.configure(state="disabled")
-        best_widget.pack(fill="x", padx=4, pady=(4, 8))
-        self.after(10, lambda: best_widget.configure(width=self.inner_frame.winfo_width() - 20))
+        # 2) Display “best overall” at top as a read-only Text
+        best = top_k(scored, 1)[0]
+        best_text = f"[{best.module}] {best.text}    [{best.accuracy*100:.1f}%  /  {best.dict_hits} hits]"
+        self._add_text(best_text, padx=4, pady=(4, 8))
 
-        # 7) Collect module stats for sorting: (mod_name, items, min_acc, max_acc)
+        # 3) Collect module stats for sorting: (mod_name, items, min_acc, max_acc)
         module_stats = []
-        for m_name, items in grouped.items():
-            acc_vals = [acc for (_, acc, _) in items]
+        for m_name, items in group_by_module(scored).items():
+            acc_vals = [c.accuracy for c in items]
             module_stats.append((m_name, items, min(acc_vals), max(acc_vals)))
 
         # Sort modules by max accuracy descending
         module_stats.sort(key=lambda x: x[3], reverse=True)
 
-        # 8) Create a collapsible section per module
+        # 4) Create a collapsible section per module (headers only for now)
+        wrap_len = self.inner_frame.winfo_width() - 60
         for m_name, items, min_a, max_a in module_stats:
-            self._create_collapsible_section(m_name, items, min_a, max_a)
+            section = _ModuleSection(self.inner_frame, m_name, items, min_a, max_a, (pruned or {}).get(m_name, 0))
+            section.pack(fill="x", padx=4, pady=2, anchor="n")
+            if wrap_len > 0:
+                section.set_wrap(wrap_len)
+            self.sections.append(section)
 
         # Scroll back up
         self.canvas.yview_moveto(0.0)
-
-    def _create_collapsible_section(
-        self,
-        mod_name: str,
-        items: list[tuple[str, float, int]],
-        min_acc: float,
-        max_acc: float
-    ):
-        """
-        Build a single collapsible frame under inner_frame:
-          - Header: "mod_name (N results, Min%–Max%) [▼]"
-          - Body: each translation in its own Text box, with one blank line (pady) between them
-        """
-        count   = len(items)
-        min_pct = min_acc * 100
-        max_pct = max_acc * 100
-
-        # Section container with a visible border
-        section_frame = ttk.Frame(self.inner_frame, relief="solid", borderwidth=1)
-        section_frame.pack(fill="x", padx=4, pady=2, anchor="n")
-
-        # Header sub-frame
-        header = ttk.Frame(section_frame)
-        header.pack(fill="x")
-
-        header_text = f"{mod_name} ({count} results, {min_pct:.0f}%–{max_pct:.0f}%)"
-        lbl_header = ttk.Label(header, text=header_text)
-        lbl_header.pack(side="left", padx=(4, 0), pady=4)
-
-        arrow_lbl = ttk.Label(header, text="▼")
-        arrow_lbl.pack(side="right", padx=(0, 4))
-
-        # Body sub-frame (initially hidden)
-        body = ttk.Frame(section_frame)
-        body.pack(fill="x", padx=12, pady=(0, 4))
-        body.forget()
-
-        # Sort items by (acc, dict_hits) descending
-        items_sorted = sorted(items, key=lambda x: (x[1], x[2]), reverse=True)
-
-        # For each item, create a read-only Text widget (wrapped, bordered),
-        # with a blank line (pady) beneath it to separate from next.
-        for txt, acc, dh in items_sorted:
-            display_line = f"{txt}    [{acc*100:.1f}%  /  {dh} hits]"
-            lines_needed = max(1, int(math.ceil(len(display_line) / 40)))
-            text_widget = tk.Text(
-                body,
-                wrap="word",
-                height=lines_needed,
-                bd=1,
-                relief="solid"
-            )
-            text_widget.insert("1.0", display_line)
-            text_widget.configure(state="disabled")
-            text_widget.pack(fill="x", anchor="w", pady=(0, 4))
-            self.after(10, lambda w=text_widget: w.configure(width=self.inner_frame.winfo_width() - 40))
-
-        def toggle():
-            if body.winfo_manager():
-                # If visible → collapse
-                body.forget()
-                arrow_lbl.config(text="▼")
-            else:
-                # If hidden → expand
-                body.pack(fill="x", padx=12, pady=(0, 4))
-                arrow_lbl.config(text="▲")
-
-        # Bind any click on header, label, or arrow to toggle
-        header.bind("<Button-1>", lambda e: toggle())
-        lbl_header.bind("<Button-1>", lambda e: toggle())
-        arrow_lbl.bind("<Button-1>", lambda e: toggle())
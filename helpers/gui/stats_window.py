@@ -0,0 +1,58 @@
+# helpers/gui/stats_window.py
+
+import json
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from helpers.codec.stats import DecodeStats
+
+
+class StatsWindow(tk.Toplevel):
+    """
+    Non-modal window showing DecodeStats.summary() after a decode run, with
+    buttons to save the stats as a Chrome trace or as JSON.
+    """
+
+    def __init__(self, parent, stats: DecodeStats, title: str = "Decode Stats"):
+        super().__init__(parent)
+        self.title(title)
+        self.transient(parent)
+        self.stats = stats
+
+        text = tk.Text(self, wrap="none", font=("Courier", 10), width=100, height=24)
+        yscroll = ttk.Scrollbar(self, orient="vertical", command=text.yview)
+        text.configure(yscrollcommand=yscroll.set)
+        text.insert("1.0", stats.summary(top=10) if stats.configs else "Nothing was decoded.")
+        text.config(state="disabled")
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(side="bottom", fill="x", pady=6)
+        ttk.Button(btn_frame, text="Save Chrome Trace…", command=self._save_trace).pack(side="left", padx=6)
+        ttk.Button(btn_frame, text="Save JSON…", command=self._save_json).pack(side="left", padx=6)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right", padx=6)
+
+        yscroll.pack(side="right", fill="y")
+        text.pack(side="left", fill="both", expand=True)
+
+    def _save_trace(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("Chrome trace", "*.json")]
+        )
+        if path:
+            self._write(lambda: self.stats.write_chrome_trace(path))
+
+    def _save_json(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json", filetypes=[("JSON", "*.json")]
+        )
+        if path:
+            def write():
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(self.stats.to_dict(), f, indent=1, ensure_ascii=False)
+            self._write(write)
+
+    def _write(self, action):
+        try:
+            action()
+        except OSError as exc:
+            messagebox.showerror("Save failed", str(exc), parent=self)
@@ -1,22 +1,239 @@
 import os, json
+import logging
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
 from utils import project_root
 
+log = logging.getLogger(__name__)
+
 # ─────────────────────────────────────────────────────────────────────────────
+# Compiled modules are cached as pickles under .cache/modules/, next to an
+# index.json recording, per source file, its mtime, size and SHA-256. The
+# index is also keyed by a hash of the code that defines the pickled
+# classes (_CODE_FILES), so editing the compiler invalidates the cache by
+# itself; _CACHE_VERSION only covers changes to the cache layout.
+_CACHE_VERSION = 2
+_CACHE_DIR = os.path.join(project_root(), ".cache", "modules")
+_INDEX_NAME = "index.json"
+_CODE_FILES = ("compiled.py", "segmenter.py", "steps.py")
+
+
+def _sha256(raw: bytes) -> str:
+    import hashlib
+    return hashlib.sha256(raw).hexdigest()
 
-def load_modules() -> dict:
-    modules = {}
-    mdir = os.path.join(project_root(), "modules")
-    if not os.path.isdir(mdir):
-        return modules
-    for fn in os.listdir(mdir):
-        if fn.lower().endswith(".json"):
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    """
+    Hash of the helpers/codec sources whose classes end up in the pickles.
+    """
+    codec = os.path.join(project_root(), "helpers", "codec")
+    parts = []
+    for fn in _CODE_FILES:
+        try:
+            with open(os.path.join(codec, fn), "rb") as f:
+                parts.append(f.read())
+        except OSError:
+            parts.append(b"")
+    return _sha256(b"\0".join(parts))[:16]
+
+
+def _modules_dir() -> str:
+    return os.path.join(project_root(), "modules")
+
+
+class ModuleRegistry(Mapping):
+    """
+    Read-only {name: CompiledModule} mapping over the JSON files in
+    `modules/`. Construction only stats the files and reads the cache
+    index; a module is unpickled (or, if its file changed, parsed and
+    compiled, then cached) the first time it is looked up. Iteration and
+    `in` never load anything; .items()/.values() load every module.
+    """
+
+    def __init__(self, module_dir: Optional[str] = None, cache_dir: Optional[str] = _CACHE_DIR):
+        self.module_dir = module_dir or _modules_dir()
+        self.cache_dir = cache_dir
+        self._loaded: Dict[str, Any] = {}
+        # name → index entry {"file", "mtime_ns", "size", "sha256", "pickle"}
+        self._entries: Dict[str, dict] = {}
+        self._scan()
+
+    # ─── index ───────────────────────────────────────────────────────────────
+    def _index_path(self) -> Optional[str]:
+        return os.path.join(self.cache_dir, _INDEX_NAME) if self.cache_dir else None
+
+    def _read_index(self) -> Dict[str, dict]:
+        path = self._index_path()
+        if path is None:
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != _CACHE_VERSION or index.get("code") != _code_version():
+            return {}
+        return index.get("files", {})
+
+    def _write_index(self, files: Dict[str, dict]) -> None:
+        path = self._index_path()
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": _CACHE_VERSION, "code": _code_version(), "files": files},
+                          f, indent=1, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # read-only checkout: run uncached
+
+    def _scan(self) -> None:
+        """
+        Match every module file against the index by (mtime, size), falling
+        back to the content hash; files that really changed are compiled
+        and cached right away (their JSON has to be read to validate them).
+        A file that isn't valid JSON or doesn't compile is logged and left
+        out, like an unreadable one.
+        """
+        if not os.path.isdir(self.module_dir):
+            return
+        old = self._read_index()
+        files: Dict[str, dict] = {}
+        changed = False
+        for fn in os.listdir(self.module_dir):
+            if not fn.lower().endswith(".json"):
+                continue
+            path = os.path.join(self.module_dir, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = old.get(fn)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                files[fn] = entry
+                continue
             try:
-                with open(os.path.join(mdir, fn), encoding="utf-8") as f:
-                    data = json.load(f)
-                modules[fn[:-5]] = data
-            except Exception:
+                with open(path, "rb") as f:
+                    raw = f.read()
+            except OSError:
                 continue
-    return modules
+            digest = _sha256(raw)
+            changed = True
+            if entry and entry["sha256"] == digest:
+                # Touched but not edited: keep the artifact
+                files[fn] = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+                continue
+            name = fn[:-5]
+            entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest,
+                     "pickle": f"{name}.{digest[:16]}.pickle"}
+            try:
+                data = json.loads(raw.decode("utf-8"))
+                self._loaded[name] = self._store(data, name, entry)
+            except Exception as exc:
+                # A broken module must not take the others down with it
+                log.warning("skipping module %s: %s", fn, exc)
+                continue
+            files[fn] = entry
+
+        for fn, entry in files.items():
+            self._entries[fn[:-5]] = dict(entry, file=fn)
+        if changed or set(files) != set(old):
+            self._prune(files)
+            self._write_index(files)
+
+    # ─── artifacts ───────────────────────────────────────────────────────────
+    def _store(self, data: dict, name: str, entry: dict):
+        """
+        Compile `data` and write its pickle (trie included, memo empty).
+        """
+        import pickle
+        from helpers.codec.compiled import CompiledModule
+
+        cm = CompiledModule(data, name)
+        cm.trie  # build now so the artifact carries it
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = os.path.join(self.cache_dir, entry["pickle"])
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    pickle.dump(cm, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        return cm
+
+    def _prune(self, files: Dict[str, dict]) -> None:
+        """
+        Delete pickles no index entry refers to any more.
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+        keep = {e["pickle"] for e in files.values()}
+        for fn in os.listdir(self.cache_dir):
+            if fn.endswith(".pickle") and fn not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, fn))
+                except OSError:
+                    pass
+
+    def _load(self, name: str):
+        import pickle
+
+        entry = self._entries[name]
+        if self.cache_dir:
+            try:
+                with open(os.path.join(self.cache_dir, entry["pickle"]), "rb") as f:
+                    cm = pickle.load(f)
+                cm.word_cache = {}
+                return cm
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, OSError):
+                pass  # missing, truncated or from an incompatible version
+        with open(os.path.join(self.module_dir, entry["file"]), encoding="utf-8") as f:
+            data = json.load(f)
+        return self._store(data, name, entry)
+
+    # ─── Mapping ─────────────────────────────────────────────────────────────
+    def __getitem__(self, name: str):
+        cm = self._loaded.get(name)
+        if cm is None:
+            if name not in self._entries:
+                raise KeyError(name)
+            cm = self._loaded[name] = self._load(name)
+        return cm
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def metadata(self, name: str) -> dict:
+        """
+        Index entry of `name` (source file, mtime, size, hash) without
+        loading the module.
+        """
+        return dict(self._entries[name])
+
+    def __repr__(self) -> str:
+        return f"ModuleRegistry({len(self._entries)} modules, {len(self._loaded)} loaded)"
+
+
+def load_modules() -> ModuleRegistry:
+    """
+    Registry of every JSON module in `modules/`: {name: CompiledModule},
+    loaded lazily from the compiled-module cache (see ModuleRegistry). The
+    raw JSON of each module stays reachable as `.data`.
+    """
+    return ModuleRegistry()
 
 # ───quick helpers─────────────────────────────────────────────────────────────
 def get_module_settings(d: dict): return d.get("settings", d.get("usage", {}))
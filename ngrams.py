@@ -0,0 +1,282 @@
+# ngrams.py
+
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, List, Optional, Union
+
+log = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Two English letter models share one interface (score, score_many, floor,
+# kind); load_model() picks one:
+#   - BigramModel: the default. 26×26 tables built in memory from the
+#     letter and bigram frequencies in tools.py; no file involved.
+#   - QuadgramModel: real four-letter statistics, only when a count file
+#     ("ABCD count" per line, e.g. data/quadgrams.txt) is installed. None
+#     ships with the repo. The counts are compiled into a memory-mapped
+#     binary under .cache/.
+# Both score text as the mean log-probability of its letter quadgrams, so
+# thresholds written against one hold for the other: English scores about
+# -9.5 to -10, shifted or random letters -15 and below.
+#
+# Quadgram cache layout (little-endian):
+#
+#   magic "QGRAM\0\0\2" | float32 floor | float32 table[26⁴]
+#
+# table[((a·26 + b)·26 + c)·26 + d] is the natural-log probability of the
+# quadgram of letters a, b, c, d (0 = A … 25 = Z); quadgrams the source
+# never saw hold `floor`.
+_MAGIC = b"QGRAM\x00\x00\x02"
+_HEADER = struct.Struct("<8sf")
+_SIZE = 26 ** 4
+
+# A–Z → 0–25, every other byte deleted (text is upper-cased first)
+_CODES = bytes.maketrans(bytes(range(65, 91)), bytes(range(26)))
+_NOT_LETTERS = bytes(c for c in range(256) if not 65 <= c <= 90)
+
+
+def _letter_codes(text: str) -> bytes:
+    """
+    Letters of `text` as codes 0–25; everything else (spaces, digits,
+    punctuation, non-ASCII) is dropped, so word boundaries don't matter.
+    """
+    return text.upper().encode("ascii", "ignore").translate(_CODES, _NOT_LETTERS)
+
+
+def _pairs(codes: bytes) -> List[int]:
+    """
+    Index a·26 + b of every adjacent letter pair of `codes`.
+    """
+    return [a * 26 + b for a, b in zip(codes, codes[1:])]
+
+
+# ─── bigram model ────────────────────────────────────────────────────────────
+class BigramModel:
+    """
+    English letter-pair model: log P(ab) and log P(b | a) for the 676 pairs,
+    from the built-in frequencies in tools.py (listed bigrams use their
+    frequency, the rest half of what independent letters would give).
+
+    score() chains the pairs over each four-letter window,
+    log P(ab) + log P(c | b) + log P(d | c), and averages the windows, which
+    keeps it on the quadgram scale. It only knows letter pairs, so
+    repetitive texts made of common pairs score too well.
+    """
+
+    kind = "bigram"
+
+    def __init__(self):
+        from tools import ENGLISH_LETTER_FREQ, LETTERS_UPPERCASE, _ENGLISH_BIGRAM_FREQ
+
+        unigram = [f / 100.0 for f in ENGLISH_LETTER_FREQ]
+        pair = [
+            _ENGLISH_BIGRAM_FREQ.get(x + y, 100.0 * unigram[i] * unigram[j] / 2) / 100.0
+            for i, x in enumerate(LETTERS_UPPERCASE) for j, y in enumerate(LETTERS_UPPERCASE)
+        ]
+        total = sum(pair)
+        self.joint = [math.log(p / total) for p in pair]
+        self.next = []  # log P(b | a), indexed a·26 + b
+        for a in range(26):
+            row = pair[a * 26:(a + 1) * 26]
+            row_total = sum(row)
+            self.next += [math.log(p / row_total) for p in row]
+        # Each pair inside a text opens one window and continues two
+        self._inner = [j + 2 * n for j, n in zip(self.joint, self.next)]
+        # Lowest window score: the least likely pair, then the least likely
+        # two steps after it
+        rows = [self.next[a * 26:(a + 1) * 26] for a in range(26)]
+        two_steps = [min(n + min(rows[b]) for b, n in enumerate(row)) for row in rows]
+        self.floor = min(j + two_steps[ab % 26] for ab, j in enumerate(self.joint))
+
+    def __reduce__(self):
+        # Rebuilt from the constants; cheaper than pickling the tables
+        return (BigramModel, ())
+
+    def score(self, text: str) -> float:
+        """
+        Mean chained log-probability per four-letter window of `text`;
+        `floor` when it has fewer than four letters.
+        """
+        codes = _letter_codes(text)
+        windows = len(codes) - 3
+        if windows < 1:
+            return self.floor
+        pairs = _pairs(codes)
+        joint, step = self.joint, self.next
+        # Window i is joint[pairs[i]] + next[pairs[i + 1]] + next[pairs[i + 2]].
+        # Summed over all windows, every pair counts as joint + 2·next except
+        # the first two and last two, which are corrected here.
+        total = sum(map(self._inner.__getitem__, pairs))
+        total -= joint[pairs[-2]] + joint[pairs[-1]] + step[pairs[-1]]
+        total -= 2 * step[pairs[0]] + step[pairs[1]]
+        return total / windows
+
+    def score_many(self, texts: Iterable[str]) -> List[float]:
+        return list(map(self.score, texts))
+
+    def __repr__(self) -> str:
+        return "BigramModel()"
+
+
+# ─── quadgram model ──────────────────────────────────────────────────────────
+def _pack(table: Iterable[float], floor: float) -> bytes:
+    values = array("f", table)
+    if len(values) != _SIZE:
+        raise ValueError(f"quadgram table needs {_SIZE} entries, got {len(values)}")
+    if sys.byteorder != "little":
+        values.byteswap()
+    return _HEADER.pack(_MAGIC, floor) + values.tobytes()
+
+
+def _table_from_counts(lines: Iterable[str]):
+    """
+    (table, floor) from "ABCD count" lines; unseen quadgrams get a tenth of
+    a count.
+    """
+    counts = [0] * _SIZE
+    for line in lines:
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        codes = _letter_codes(parts[0])
+        if len(codes) != 4 or not parts[1].isdigit():
+            continue
+        a, b, c, d = codes
+        counts[((a * 26 + b) * 26 + c) * 26 + d] += int(parts[1])
+    total = sum(counts)
+    if not total:
+        raise ValueError("no quadgram counts found")
+    floor = math.log(0.1 / total)
+    log_total = math.log(total)
+    return [math.log(n) - log_total if n else floor for n in counts], floor
+
+
+class QuadgramModel:
+    """
+    English quadgram log-probabilities from a count file, in one flat
+    float32 table indexed by packed letter codes. Backed by a memory-mapped
+    file when loaded with open(), so the GUI, pool workers and the CLI
+    share the same pages.
+
+    score() rates any text by the mean log-probability of its letter
+    quadgrams; only letters count, so text without word boundaries scores
+    the same as spaced text.
+    """
+
+    kind = "quadgram"
+
+    def __init__(self, buf: Union[bytes, mmap.mmap], path: Optional[str] = None):
+        magic, floor = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a quadgram model file")
+        if len(buf) != _HEADER.size + 4 * _SIZE:
+            raise ValueError("truncated quadgram model file")
+        self.path = path
+        self.floor = floor
+        self._buf = buf
+        raw = memoryview(buf)[_HEADER.size:]
+        if sys.byteorder == "little" and array("f").itemsize == 4:
+            self.table = raw.cast("f")
+        else:
+            table = array("f")
+            table.frombytes(raw)
+            if sys.byteorder != "little":
+                table.byteswap()
+            self.table = table
+
+    # ─── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def open(cls, path: str) -> "QuadgramModel":
+        """
+        Memory-map an existing model file.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("empty quadgram model file")
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buf, path)
+
+    @classmethod
+    def from_counts(cls, source: str) -> "QuadgramModel":
+        """
+        In-memory model from the "ABCD count" lines of `source` (no cache).
+        """
+        with open(source, encoding="utf-8") as f:
+            return cls(_pack(*_table_from_counts(f)))
+
+    @staticmethod
+    def build(source: str, target: str) -> None:
+        """
+        Write a model file to `target` from the "ABCD count" lines of
+        `source`, creating its directory. Written next to the target and
+        renamed, like the dictionary. Raises ValueError if `source` holds
+        no usable counts.
+        """
+        with open(source, encoding="utf-8") as f:
+            data = _pack(*_table_from_counts(f))
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+    def __reduce__(self):
+        # mmaps do not pickle; a worker process re-maps the same file
+        if self.path is not None:
+            return (QuadgramModel.open, (self.path,))
+        return (QuadgramModel, (bytes(self._buf),))
+
+    # ─── scoring ─────────────────────────────────────────────────────────────
+    def score(self, text: str) -> float:
+        """
+        Mean log-probability per letter quadgram of `text`; `floor` when it
+        has fewer than four letters.
+        """
+        codes = _letter_codes(text)
+        if len(codes) < 4:
+            return self.floor
+        table = self.table
+        pairs = _pairs(codes)
+        return sum([table[ab * 676 + cd] for ab, cd in zip(pairs, pairs[2:])]) / (len(codes) - 3)
+
+    def score_many(self, texts: Iterable[str]) -> List[float]:
+        return list(map(self.score, texts))
+
+    def __repr__(self) -> str:
+        return f"QuadgramModel({self.path or 'memory'})"
+
+
+NgramModel = Union[BigramModel, QuadgramModel]
+
+
+def load_model(source: str, cache: str) -> NgramModel:
+    """
+    QuadgramModel from the count file `source`, mapped from its compiled
+    form at `cache` ((re)built when missing, corrupt or older than
+    `source`; kept in memory if `cache` can't be written). Without a usable
+    count file (missing, empty or malformed; the latter two are logged)
+    the model is a BigramModel.
+    """
+    if not os.path.exists(source):
+        return BigramModel()
+    if os.path.exists(cache) and os.path.getmtime(source) <= os.path.getmtime(cache):
+        try:
+            return QuadgramModel.open(cache)
+        except (OSError, ValueError):
+            pass  # unreadable or corrupt: rebuild below
+    try:
+        try:
+            QuadgramModel.build(source, cache)
+            return QuadgramModel.open(cache)
+        except OSError:
+            return QuadgramModel.from_counts(source)
+    except ValueError as exc:
+        log.warning("ignoring quadgram counts in %s: %s", source, exc)
+    except OSError:
+        pass  # unreadable count file
+    return BigramModel()
@@ -1,36 +1,52 @@
 # tools.py
 
+import heapq
 import string
 import json
+import math
+import operator
 import os
-from collections import Counter
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from itertools import repeat
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from utils import project_root  # used to find data/keyshifts.json
+from utils import load_dictionary, load_ngram_model, project_root  # project_root finds data/keyshifts.json, data/cipher_tables.json
 
 # ──────────────────────── Load Keyshift Data ────────────────────────
 _keyshifts_path = os.path.join(project_root(), "data", "keyshifts.json")
-_KEY_ROWS: List[List[str]] = []
-try:
-    with open(_keyshifts_path, encoding="utf-8") as _kf:
-        _data = json.load(_kf)
-        # Expecting something like: [ { "name": "keyboard", "rows": [ [..], [..], [..] ] } ]
-        for entry in _data:
-            if entry.get("name") == "keyboard":
-                _KEY_ROWS = entry.get("rows", [])
-                break
-except FileNotFoundError:
-    # If file is missing or can’t open, leave KEY_ROWS empty (no keyshift available)
-    _KEY_ROWS = []
 
-# ─────────────────────────────────────────────────────────────────────────────
-def project_root() -> str:
+# Layout used when none is named (the original single "keyboard" entry)
+DEFAULT_LAYOUT = "keyboard"
+
+
+@lru_cache(maxsize=1)
+def _load_layouts() -> Dict[str, dict]:
+    """
+    Keyboard layouts from data/keyshifts.json, read on first use:
+    name → {"label": display name, "rows": [[letters…], …]}.
+    Expecting something like: [ { "name": "keyboard", "label": "QWERTY", "rows": [ [..], [..], [..] ] } ]
+    """
+    try:
+        with open(_keyshifts_path, encoding="utf-8") as kf:
+            data = json.load(kf)
+    except FileNotFoundError:
+        # If the file is missing, no keyshift layouts are available
+        return {}
+    layouts: Dict[str, dict] = {}
+    for entry in data:
+        name = entry.get("name")
+        if name:
+            layouts[name] = {"label": entry.get("label", name), "rows": entry.get("rows", [])}
+    return layouts
+
+
+def keyshift_layouts() -> List[Tuple[str, str]]:
     """
-    This function is here only if you ever want it in tools.py— 
-    but note: utils.project_root() is used instead.
+    Available keyboard layouts as (name, label), in file order.
     """
-    raise NotImplementedError("project_root() is provided by utils.py")
+    return [(name, layout["label"]) for name, layout in _load_layouts().items()]
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Caesar Cipher implementation (existing)
@@ -38,101 +54,885 @@ LETTERS_LOWERCASE = string.ascii_lowercase
 LETTERS_UPPERCASE = string.ascii_uppercase
 ALPHABET_SIZE = 26
 
+# Relative frequency (%) of A–Z in English text
+ENGLISH_LETTER_FREQ = [
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153,
+    0.772, 4.025, 2.406, 6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056,
+    2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]
+_ENGLISH_LOG_FREQ = [math.log(f / 100.0) for f in ENGLISH_LETTER_FREQ]
+
+# Relative frequency (%) of the most common English bigrams (the source of
+# ngrams.BigramModel, the letter model used while no quadgram count file is
+# installed)
+_ENGLISH_BIGRAM_FREQ = {
+    "TH": 3.56, "HE": 3.07, "IN": 2.43, "ER": 2.05, "AN": 1.99, "RE": 1.85,
+    "ON": 1.76, "AT": 1.49, "EN": 1.45, "ND": 1.35, "TI": 1.34, "ES": 1.34,
+    "OR": 1.28, "TE": 1.20, "OF": 1.17, "ED": 1.17, "IS": 1.13, "IT": 1.12,
+    "AL": 1.09, "AR": 1.07, "ST": 1.05, "TO": 1.04, "NT": 1.04, "NG": 0.95,
+    "SE": 0.93, "HA": 0.93, "AS": 0.87, "OU": 0.87, "IO": 0.83, "LE": 0.83,
+    "VE": 0.83, "CO": 0.79, "ME": 0.79, "DE": 0.76, "HI": 0.76, "RI": 0.73,
+    "RO": 0.73, "IC": 0.70, "NE": 0.69, "EA": 0.69, "RA": 0.69, "CE": 0.65,
+    "LI": 0.62, "CH": 0.60, "LL": 0.58, "BE": 0.58, "MA": 0.57, "SI": 0.55,
+    "OM": 0.55, "UR": 0.54,
+}
+
+# Solvers screen every key on letter statistics, then rank this many of the
+# best by _ngram_score of their decryption of the first _NGRAM_SAMPLE
+# characters
+_NGRAM_SHORTLIST = 8
+_NGRAM_SAMPLE = 2000
+
+
+@lru_cache(maxsize=ALPHABET_SIZE)
+def _caesar_table(shift: int) -> Dict[int, int]:
+    """
+    str.translate table shifting A–Z / a–z by `shift` (0–25).
+    """
+    return str.maketrans(
+        LETTERS_UPPERCASE + LETTERS_LOWERCASE,
+        LETTERS_UPPERCASE[shift:] + LETTERS_UPPERCASE[:shift]
+        + LETTERS_LOWERCASE[shift:] + LETTERS_LOWERCASE[:shift],
+    )
+
+
 def caesar_translate(text: str, shift: int) -> str:
     """
     Shift every letter in `text` by `shift`. Wraps from A→Z or a→z.
     Non-letters (spaces, punctuation, digits) are unchanged.
     Example: caesar_translate("ABC", 1) -> "BCD".
     """
-    result = []
-    for ch in text:
-        if ch.isupper():
-            idx = LETTERS_UPPERCASE.index(ch)
-            result.append(LETTERS_UPPERCASE[(idx + shift) % ALPHABET_SIZE])
-        elif ch.islower():
-            idx = LETTERS_LOWERCASE.index(ch)
-            result.append(LETTERS_LOWERCASE[(idx + shift) % ALPHABET_SIZE])
-        else:
-            result.append(ch)
-    return "".join(result)
+    return text.translate(_caesar_table(shift % ALPHABET_SIZE))
 
-def analyze_caesar_candidates(ciphertext: str, top_n: int = 5) -> List[Tuple[int, str, float]]:
+
+def letter_histogram(text: str) -> List[int]:
     """
-    For auto‐analysis, try all 26 shifts and score them by letter frequency + common words.
-    Returns a list of (shift, plaintext, score) sorted by descending score, length = top_n.
+    Counts of A–Z in `text`, case-folded (ASCII letters only).
     """
-    candidates: List[Tuple[int, str, float]] = []
-    for shift in range(ALPHABET_SIZE):
-        plaintext = caesar_translate(ciphertext, shift)
-        freq_score = _letter_freq_score(plaintext)
-        word_score = _calculate_word_presence_score(plaintext)
-        score = (freq_score + word_score) / 2.0
-        candidates.append((shift, plaintext, score))
-    candidates.sort(key=lambda x: x[2], reverse=True)
-    return candidates[:top_n]
+    return [text.count(u) + text.count(l) for u, l in zip(LETTERS_UPPERCASE, LETTERS_LOWERCASE)]
+
 
-def _letter_freq_score(text: str) -> float:
+def english_fit(plain_hist: List[int]) -> float:
     """
-    Crude score comparing letter frequencies in `text` to expected English frequencies.
-    Returns a float in [0, 1].
+    How English-like a plaintext letter histogram is: 1 / (1 + χ²/n), where
+    χ² is the chi-squared distance from English letter frequencies and n the
+    letter count. In (0, 1]; 0.0 when there are no letters.
     """
-    text = text.lower()
-    cnt = Counter(c for c in text if c.isalpha())
-    total = sum(cnt.values())
+    total = sum(plain_hist)
     if total == 0:
         return 0.0
-    # English letter frequency ordered by most→least common
-    ENGLISH_LETTER_FREQ = 'etaoinsrhdlucmfywgpbvkjxqz'
-    score = 0.0
-    for i, letter in enumerate(ENGLISH_LETTER_FREQ):
-        expected_freq = 1.0 / (i + 1)
-        actual_freq = cnt.get(letter, 0) / total
-        score += 1.0 - abs(actual_freq - expected_freq)
-    return min(1.0, score / ALPHABET_SIZE)
-
-def _calculate_word_presence_score(text: str) -> float:
-    """
-    Score based on presence of common English words.
-    Returns a float in [0, 1].
-    """
-    COMMON_ENGLISH_WORDS = {
-        'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i',
-        'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'
-    }
-    words = re.findall(r'\b[a-z]{2,}\b', text.lower())
+    chi = 0.0
+    for count, freq in zip(plain_hist, ENGLISH_LETTER_FREQ):
+        expected = freq * total / 100.0
+        chi += (count - expected) ** 2 / expected
+    return 1.0 / (1.0 + chi / total)
+
+
+# A whitespace-separated word as English writes it: optional opening
+# bracket/quote, letters in one case pattern (or a number), trailing
+# punctuation
+_WORD_SHAPE = re.compile(
+    r"[(\[\"']?(?:[A-Z]?[a-z]+|[A-Z]+|\d+)(?:['-][A-Za-z]+)*[)\]\"'.,;:!?]*"
+)
+
+
+def english_word_rate(text: str) -> float:
+    """
+    Fraction of the whitespace-separated words of `text` that are shaped
+    like English words ("It", "times," "(such"; not ".It" or "mIt") and,
+    when a dictionary is installed, found in it once their punctuation is
+    removed. 0.0 for text without words.
+    """
+    words = text.split()
     if not words:
         return 0.0
-    matches = sum(1 for w in words if w in COMMON_ENGLISH_WORDS)
-    return min(1.0, matches / len(words))
+    dictionary = load_dictionary()
+    hits = 0
+    for word in words:
+        if _WORD_SHAPE.fullmatch(word):
+            hits += not dictionary or "".join(filter(str.isalnum, word)).upper() in dictionary
+    return hits / len(words)
+
+
+def _ngram_score(text: str) -> float:
+    """
+    Mean log-probability per four-letter window of `text` under the shared
+    English letter model (utils.load_ngram_model(): letter pairs until
+    data/quadgrams.txt is installed); letters only, so spacing doesn't
+    matter. About -9.5 to -10 for English, lower is worse.
+    """
+    return load_ngram_model().score(text)
+
+
+def _rank_by_ngrams(ciphertext: str, keys: Iterable[tuple], decrypt, top_n: int) -> List[Tuple[float, tuple]]:
+    """
+    Best `top_n` of the screened `keys` as (score, key), best first, scored
+    by _ngram_score of decrypt(sample, *key) on the first _NGRAM_SAMPLE
+    characters. Ties keep the order of `keys`.
+    """
+    sample = ciphertext[:_NGRAM_SAMPLE]
+    scored = [(_ngram_score(decrypt(sample, *key)), key) for key in keys]
+    return heapq.nlargest(top_n, scored, key=itemgetter(0))
+
+
+def analyze_caesar_candidates(ciphertext: str, top_n: int = 5) -> List[Tuple[int, str, float]]:
+    """
+    For auto-analysis, screen all 26 shifts from one letter histogram of
+    the ciphertext (see english_fit), then rank the best few by
+    _ngram_score of their decryption; only the best `top_n` plaintexts
+    are actually produced. Shifting by `s` turns cipher letter i into plain
+    letter (i + s) % 26, so each shift's plaintext histogram is a rotation.
+    Returns a list of (shift, plaintext, score) sorted by descending score,
+    length = top_n.
+    """
+    hist = letter_histogram(ciphertext)
+    fits = [english_fit(hist[-s:] + hist[:-s]) for s in range(ALPHABET_SIZE)]
+    screened = heapq.nlargest(max(top_n, _NGRAM_SHORTLIST), range(ALPHABET_SIZE), key=fits.__getitem__)
+    best = _rank_by_ngrams(ciphertext, [(shift,) for shift in screened], caesar_translate, top_n)
+    return [(shift, caesar_translate(ciphertext, shift), score) for score, (shift,) in best]
 
 # ─────────────────────────────────────────────────────────────────────────────
-def keyshift_translate(text: str, shift: int) -> str:
+@lru_cache(maxsize=None)
+def _keyshift_table(layout: str, shift: int) -> Dict[int, int]:
+    """
+    str.translate table moving every letter `shift` keys along its row of
+    `layout` (wrapping within the row), for both cases. Letters not on any
+    row, and unknown layouts, map to themselves.
+    """
+    rows = _load_layouts().get(layout, {}).get("rows", [])
+    src, dst = [], []
+    for row in rows:
+        for idx, key in enumerate(row):
+            mapped = row[(idx + shift) % len(row)]
+            src += [key.upper(), key.lower()]
+            dst += [mapped.upper(), mapped.lower()]
+    return str.maketrans("".join(src), "".join(dst))
+
+
+def keyshift_translate(text: str, shift: int, layout: str = DEFAULT_LAYOUT) -> str:
     """
-    Shift each letter according to the keyboard rows defined in keyshifts.json.
-    For each letter (A–Z / a–z), find its row, then move its index by `shift` within that row (wrap around).
+    Shift each letter according to the keyboard rows of `layout` in keyshifts.json.
+    Each letter (A–Z / a–z) moves `shift` places within its row (wrap around).
     Non-alphabetic characters remain unchanged. Case is preserved.
-    Example:
+    Example (QWERTY):
       - If shift=1: 'P' → 'Q' (since P is last in the top row, wrap to 'Q').
       - If shift=-1: 'Q' → 'P', etc.
     """
-    if not _KEY_ROWS:
-        # If no key rows loaded, return text unchanged
+    return text.translate(_keyshift_table(layout, shift))
+
+
+def _keyshift_shifts(layout: str) -> List[int]:
+    """
+    Shifts worth trying for `layout`: -L…L for the longest row length L, in
+    order of increasing |shift|, dropping any that give the same mapping as
+    one already listed.
+    """
+    rows = _load_layouts().get(layout, {}).get("rows", [])
+    longest = max((len(r) for r in rows), default=0)
+    seen = set()
+    shifts: List[int] = []
+    for shift in sorted(range(-longest, longest + 1), key=lambda s: (abs(s), s < 0)):
+        key = tuple(sorted(_keyshift_table(layout, shift).items()))
+        if key not in seen:
+            seen.add(key)
+            shifts.append(shift)
+    return shifts
+
+
+def analyze_keyshift_candidates(
+    ciphertext: str,
+    top_n: int = 5,
+    layouts: Optional[List[str]] = None
+) -> List[Tuple[str, int, str, float]]:
+    """
+    Auto-analysis for Keyshift, like analyze_caesar_candidates: one letter
+    histogram of the ciphertext, then every (layout, shift) is screened by
+    pushing that histogram through the shift's table, the best few are
+    ranked by _ngram_score, and only the best `top_n` plaintexts are
+    produced. `layouts` defaults to all of them.
+    Returns (layout, shift, plaintext, score) sorted by descending score.
+    """
+    hist = letter_histogram(ciphertext)
+    scored: List[Tuple[float, str, int]] = []
+    for layout in layouts if layouts is not None else list(_load_layouts()):
+        for shift in _keyshift_shifts(layout):
+            table = _keyshift_table(layout, shift)
+            plain_hist = [0] * ALPHABET_SIZE
+            for i, letter in enumerate(LETTERS_UPPERCASE):
+                plain = chr(table.get(ord(letter), ord(letter)))
+                plain_hist[LETTERS_UPPERCASE.index(plain)] += hist[i]
+            scored.append((english_fit(plain_hist), layout, shift))
+    # nlargest is stable: ties keep layout order and the smaller shift first
+    screened = heapq.nlargest(max(top_n, _NGRAM_SHORTLIST), scored, key=lambda x: x[0])
+    best = _rank_by_ngrams(
+        ciphertext, [(shift, layout) for _, layout, shift in screened], keyshift_translate, top_n
+    )
+    return [
+        (layout, shift, keyshift_translate(ciphertext, shift, layout), score)
+        for score, (shift, layout) in best
+    ]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Vigenère cipher. data/cipher_tables.json ships the full tabula recta, but
+# every row is the alphabet rotated by the row's index, so encoding is just
+# (plain + key) mod 26 per letter. The table is only read for its row
+# headers, which give each key letter's shift.
+_cipher_tables_path = os.path.join(project_root(), "data", "cipher_tables.json")
+
+# Letters sampled from the ciphertext for key-length and key analysis; more
+# only sharpens statistics that are already decisive
+_VIGENERE_SAMPLE = 20000
+# Key lengths tried when none is given
+MAX_VIGENERE_KEY_LENGTH = 20
+# Key lengths the solver actually solves: the best this many estimates
+_VIGENERE_LENGTHS_TRIED = 6
+
+# str.translate table deleting every ASCII character but A–Z / a–z
+_NON_LETTERS = {
+    i: None for i in range(0x80) if chr(i) not in LETTERS_UPPERCASE + LETTERS_LOWERCASE
+}
+
+
+@lru_cache(maxsize=1)
+def _load_cipher_tables() -> Dict[str, dict]:
+    """
+    Tables from data/cipher_tables.json, read on first use: name → entry
+    ({"Rows": row labels, "Columns": column labels, "rows": cells, …}).
+    """
+    try:
+        with open(_cipher_tables_path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {entry["name"]: entry for entry in data if entry.get("name")}
+
+
+@lru_cache(maxsize=1)
+def _vigenere_key_index() -> Dict[str, int]:
+    """
+    Key letter → shift, from the row headers of the Vigenère table (A=0 …
+    Z=25 when the table is missing).
+    """
+    rows = _load_cipher_tables().get("vigenere", {}).get("Rows") or list(LETTERS_UPPERCASE)
+    return {letter.upper(): i for i, letter in enumerate(rows)}
+
+
+def _key_shifts(key: str) -> List[int]:
+    """
+    Shifts of the letters of `key` (other characters are ignored).
+    """
+    index = _vigenere_key_index()
+    shifts = [index[c] for c in key.upper() if c in index]
+    if not shifts:
+        raise ValueError(f"Vigenère key {key!r} has no letters")
+    return shifts
+
+
+def _letters_only(text: str) -> str:
+    """
+    The ASCII letters of `text`, in order.
+    """
+    letters = text.translate(_NON_LETTERS)
+    if not letters.isascii():
+        letters = "".join(c for c in letters if c.isascii())
+    return letters
+
+
+def _vigenere_shift(text: str, shifts: List[int]) -> str:
+    """
+    Shift the n-th letter of `text` by shifts[n % len(shifts)]; case and
+    non-letters are kept and don't advance the key. Letters are split into
+    one column per key position, each column is shifted with one Caesar
+    translate, and the columns are interleaved back.
+    """
+    letters = _letters_only(text)
+    period = len(shifts)
+    merged: List[str] = [""] * len(letters)
+    for i, shift in enumerate(shifts):
+        merged[i::period] = letters[i::period].translate(_caesar_table(shift % ALPHABET_SIZE))
+    if len(letters) == len(text):
+        return "".join(merged)
+    it = iter(merged)
+    letter_set = frozenset(LETTERS_UPPERCASE + LETTERS_LOWERCASE)
+    return "".join(next(it) if c in letter_set else c for c in text)
+
+
+def vigenere_encrypt(text: str, key: str) -> str:
+    """
+    Vigenère-encrypt `text` with `key`: each letter is shifted forward by
+    the current key letter (A=0). Non-letters are unchanged and don't use
+    up a key letter. Example: vigenere_encrypt("ATTACK", "LEMON") -> "LXFOPV".
+    """
+    return _vigenere_shift(text, _key_shifts(key))
+
+
+def vigenere_decrypt(text: str, key: str) -> str:
+    """
+    Inverse of vigenere_encrypt().
+    """
+    return _vigenere_shift(text, [-s for s in _key_shifts(key)])
+
+
+def _column_histograms(letters: str, period: int) -> List[List[int]]:
+    """
+    A–Z counts of each of the `period` columns of upper-cased `letters`.
+    """
+    hists = []
+    for i in range(period):
+        column = letters[i::period]
+        hists.append([column.count(u) for u in LETTERS_UPPERCASE])
+    return hists
+
+
+def _coincidence(hist: List[int]) -> float:
+    """
+    Index of coincidence of a histogram, times 26: ≈1.73 for English,
+    ≈1.0 for uniformly random letters.
+    """
+    n = sum(hist)
+    if n < 2:
+        return 0.0
+    return ALPHABET_SIZE * sum(c * (c - 1) for c in hist) / (n * (n - 1))
+
+
+def _kasiski_periods(letters: str, max_length: int) -> Dict[int, int]:
+    """
+    Kasiski examination: for every repeated trigram, the distance to its
+    previous occurrence; returns period → number of distances it divides.
+    """
+    last: Dict[str, int] = {}
+    distances: List[int] = []
+    for i in range(len(letters) - 2):
+        tri = letters[i:i + 3]
+        prev = last.get(tri)
+        if prev is not None:
+            distances.append(i - prev)
+        last[tri] = i
+    return {p: sum(1 for d in distances if d % p == 0) for p in range(2, max_length + 1)}
+
+
+def estimate_vigenere_key_lengths(
+    ciphertext: str,
+    max_length: int = MAX_VIGENERE_KEY_LENGTH,
+    top_n: int = 3
+) -> List[Tuple[int, float]]:
+    """
+    Likely key lengths as (length, score), best first. Each length is scored
+    by the mean index of coincidence of its columns (see _coincidence);
+    multiples of the true length score as well as the length itself, so
+    lengths within 10% of the best score lead, shortest first, and
+    multiples of a listed length are left out. The most frequent Kasiski
+    period is added when it isn't already listed.
+    """
+    letters = _letters_only(ciphertext).upper()[:_VIGENERE_SAMPLE]
+    max_length = max(1, min(max_length, len(letters) // 2))
+    scores: Dict[int, float] = {}
+    for period in range(1, max_length + 1):
+        hists = _column_histograms(letters, period)
+        scores[period] = sum(map(_coincidence, hists)) / period
+    best = max(scores.values(), default=0.0)
+    lengths: List[int] = []
+    for period in sorted(scores, key=lambda p: (scores[p] < 0.9 * best, p if scores[p] >= 0.9 * best else -scores[p])):
+        if not any(period % p == 0 for p in lengths):
+            lengths.append(period)
+    lengths = lengths[:top_n]
+    kasiski = _kasiski_periods(letters, max_length)
+    if kasiski and max(kasiski.values()) > 0:
+        # Largest period among the most-divided ones (smaller ones divide more often)
+        top = max(kasiski.values())
+        period = max(p for p, n in kasiski.items() if n >= 0.8 * top)
+        if period not in lengths:
+            lengths.append(period)
+    return [(p, scores[p]) for p in lengths]
+
+
+def _collapse_key(key: str) -> str:
+    """
+    Shortest key that repeats to `key` ("LEMONLEMON" → "LEMON").
+    """
+    for d in range(1, len(key)):
+        if len(key) % d == 0 and key[:d] * (len(key) // d) == key:
+            return key[:d]
+    return key
+
+
+def _shift_log_likelihoods(hist: List[int]) -> List[float]:
+    """
+    Log-likelihood under English letter frequencies of the column counted
+    by `hist`, decrypted with each key shift 0–25 (cipher letter i becomes
+    plain letter i - shift).
+    """
+    return [
+        sum(count * _ENGLISH_LOG_FREQ[(i - shift) % ALPHABET_SIZE] for i, count in enumerate(hist) if count)
+        for shift in range(ALPHABET_SIZE)
+    ]
+
+
+def _key_score(log_likelihood: float, key_length: int, n_letters: int) -> float:
+    """
+    Per-letter log-likelihood less log(26) for every key letter, so longer
+    keys, which can always fit the letter frequencies better, have to earn
+    their extra letters.
+    """
+    return (log_likelihood - key_length * math.log(ALPHABET_SIZE)) / n_letters
+
+
+def vigenere_wordlist_attack(
+    ciphertext: str,
+    words: Iterable[str],
+    top_n: int = 5,
+    lengths: Optional[Iterable[int]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Try every word of `words` as the key and return the best `top_n` as
+    (key, score), best first, scored by _key_score().
+    Candidates are scored from per-column letter counts, without decrypting
+    per word. Only words whose length is in `lengths` are tried; it
+    defaults to estimate_vigenere_key_lengths().
+    """
+    letters = _letters_only(ciphertext).upper()[:_VIGENERE_SAMPLE]
+    if not letters:
+        return []
+    if lengths is None:
+        lengths = [p for p, _ in estimate_vigenere_key_lengths(ciphertext)]
+    wanted = set(lengths)
+    index = _vigenere_key_index()
+    tables: Dict[int, List[List[float]]] = {}  # key length → per-column shift log-likelihoods
+    scored: Dict[str, float] = {}
+    for word in words:
+        key = word.upper()
+        if len(key) not in wanted or key in scored or not all(c in index for c in key):
+            continue
+        table = tables.get(len(key))
+        if table is None:
+            table = tables[len(key)] = [
+                _shift_log_likelihoods(h) for h in _column_histograms(letters, len(key))
+            ]
+        ll = sum(column[index[c]] for column, c in zip(table, key))
+        scored[key] = _key_score(ll, len(key), len(letters))
+    best = heapq.nlargest(top_n, scored, key=scored.__getitem__)
+    return [(key, scored[key]) for key in best]
+
+
+def analyze_vigenere_candidates(
+    ciphertext: str,
+    top_n: int = 5,
+    max_key_length: int = MAX_VIGENERE_KEY_LENGTH,
+    wordlist: Optional[Iterable[str]] = None
+) -> List[Tuple[str, str, float]]:
+    """
+    Auto-analysis for Vigenère. The key lengths up to `max_key_length` are
+    ordered by estimate_vigenere_key_lengths() (coincidence index and
+    Kasiski) and only the best _VIGENERE_LENGTHS_TRIED are solved: each
+    column like a Caesar shift (most likely key letter under English
+    letter frequencies). The resulting keys
+    are screened by _key_score(), and the best few ranked by
+    _ngram_score of their decryption. If `wordlist` is given its words
+    are tried as keys as well. Statistics use at most the first
+    _VIGENERE_SAMPLE letters; only the best `top_n` keys decrypt the whole
+    text. Returns (key, plaintext, score) sorted by descending score; the
+    score is _ngram_score of the plaintext (about -10 for English).
+    """
+    letters = _letters_only(ciphertext).upper()[:_VIGENERE_SAMPLE]
+    if not letters:
+        return []
+    lengths = estimate_vigenere_key_lengths(letters, max_key_length, _VIGENERE_LENGTHS_TRIED)
+    scored: Dict[str, float] = {}
+    for period, _ in lengths[:_VIGENERE_LENGTHS_TRIED]:
+        ll = 0.0
+        shifts = []
+        for hist in _column_histograms(letters, period):
+            column = _shift_log_likelihoods(hist)
+            shift = max(range(ALPHABET_SIZE), key=column.__getitem__)
+            shifts.append(shift)
+            ll += column[shift]
+        key = "".join(LETTERS_UPPERCASE[k] for k in shifts)
+        if _collapse_key(key) == key:
+            scored[key] = _key_score(ll, period, len(letters))
+    if wordlist is not None:
+        for key, score in vigenere_wordlist_attack(ciphertext, wordlist, top_n):
+            scored.setdefault(key, score)
+    screened = heapq.nlargest(max(top_n, _NGRAM_SHORTLIST), scored, key=scored.__getitem__)
+    best = _rank_by_ngrams(ciphertext, [(key,) for key in screened], vigenere_decrypt, top_n)
+    return [(key, vigenere_decrypt(ciphertext, key), score) for score, (key,) in best]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Affine cipher: E(x) = (a·x + b) mod M over the first M letters of the
+# alphabet (M = 26 normally; letters past the M-th are left unchanged).
+# `a` must be coprime with M, so there are φ(M)·M keys: 312 for M = 26.
+def affine_keys(modulus: int = ALPHABET_SIZE) -> List[Tuple[int, int]]:
+    """
+    Every valid (a, b) key for `modulus`, a ascending then b ascending.
+    """
+    _check_modulus(modulus)
+    return [(a, b) for a in range(1, modulus) if math.gcd(a, modulus) == 1 for b in range(modulus)]
+
+
+def _check_modulus(modulus: int) -> None:
+    if not 2 <= modulus <= ALPHABET_SIZE:
+        raise ValueError(f"Affine modulus must be between 2 and {ALPHABET_SIZE}, got {modulus}")
+
+
+def _affine_map(a: int, b: int, modulus: int, decrypt: bool) -> List[int]:
+    """
+    Letter index remap of one key: result[x] is what letter x turns into.
+    """
+    _check_modulus(modulus)
+    if math.gcd(a, modulus) != 1:
+        raise ValueError(f"Affine key a={a} is not coprime with {modulus}")
+    if decrypt:
+        a_inv = pow(a, -1, modulus)
+        mapped = [a_inv * (x - b) % modulus for x in range(modulus)]
+    else:
+        mapped = [(a * x + b) % modulus for x in range(modulus)]
+    return mapped + list(range(modulus, ALPHABET_SIZE))
+
+
+@lru_cache(maxsize=1024)
+def _affine_table(a: int, b: int, modulus: int, decrypt: bool) -> Dict[int, int]:
+    """
+    str.translate table applying one affine key to A–Z / a–z.
+    """
+    mapped = _affine_map(a, b, modulus, decrypt)
+    return str.maketrans(
+        LETTERS_UPPERCASE + LETTERS_LOWERCASE,
+        "".join(LETTERS_UPPERCASE[m] for m in mapped) + "".join(LETTERS_LOWERCASE[m] for m in mapped),
+    )
+
+
+def affine_encrypt(text: str, a: int, b: int, modulus: int = ALPHABET_SIZE) -> str:
+    """
+    Replace letter x (A=0) by (a·x + b) mod `modulus`, keeping case; other
+    characters are unchanged. Raises ValueError if `a` isn't coprime with
+    `modulus`. Example: affine_encrypt("AFFINE", 5, 8) -> "IHHWVC".
+    """
+    return text.translate(_affine_table(a % modulus, b % modulus, modulus, False))
+
+
+def affine_decrypt(text: str, a: int, b: int, modulus: int = ALPHABET_SIZE) -> str:
+    """
+    Inverse of affine_encrypt(): x = a⁻¹·(y - b) mod `modulus`.
+    """
+    return text.translate(_affine_table(a % modulus, b % modulus, modulus, True))
+
+
+def analyze_affine_candidates(
+    ciphertext: str,
+    top_n: int = 5,
+    modulus: int = ALPHABET_SIZE
+) -> List[Tuple[int, int, str, float]]:
+    """
+    Auto-analysis for Affine, like analyze_caesar_candidates: one letter
+    histogram of the ciphertext, remapped by every key of affine_keys()
+    and screened with english_fit; the best few are ranked by
+    _ngram_score and only the best `top_n` plaintexts are produced.
+    Returns (a, b, plaintext, score) sorted by descending score.
+    """
+    hist = letter_histogram(ciphertext)
+    scored: List[Tuple[float, int, int]] = []
+    for a, b in affine_keys(modulus):
+        plain_hist = [0] * ALPHABET_SIZE
+        for i, plain in enumerate(_affine_map(a, b, modulus, True)):
+            plain_hist[plain] += hist[i]
+        scored.append((english_fit(plain_hist), a, b))
+    # nlargest is stable: ties keep the smaller a, then the smaller b
+    screened = heapq.nlargest(max(top_n, _NGRAM_SHORTLIST), scored, key=lambda x: x[0])
+    best = _rank_by_ngrams(ciphertext, [(a, b, modulus) for _, a, b in screened], affine_decrypt, top_n)
+    return [(a, b, affine_decrypt(ciphertext, a, b, modulus), score) for score, (a, b, _) in best]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Rail fence cipher: the text is written in a zigzag over `rails` rows and
+# read off row by row. `offset` starts the zigzag part-way through its
+# cycle of 2·(rails - 1) positions. Every character is transposed,
+# including spaces and punctuation.
+#
+# The positions on one rail form at most two arithmetic progressions with
+# step = cycle (one for the downstroke, one for the upstroke), and they are
+# read off consecutively. So a whole rail maps to one or two slices; see
+# _rail_segments().
+
+# Characters decoded at each end of the text per candidate by the rail
+# fence solver: all keys are screened on short samples, the best few are
+# rescored on longer ones, and the best of those on their full decryption
+# (up to _RAILFENCE_RESCORE characters at each end)
+_RAILFENCE_SCREEN = 100
+_RAILFENCE_SHORTLIST = 32
+_RAILFENCE_SAMPLE = 300
+_RAILFENCE_RESCORE = 10000
+# Weight of the English word rate (see english_word_rate) in the final
+# rail fence score. Keys one offset apart often decrypt to the same letters
+# with a space or full stop moved to the other end, which letter n-grams
+# can't tell apart
+_RAILFENCE_WORD_WEIGHT = 3.0
+# Most rails the solver tries by default
+MAX_RAILS = 40
+
+
+def _rail_segments(length: int, rails: int, offset: int) -> List[Tuple[int, int, int, int, int]]:
+    """
+    How the ciphertext of a `length`-character message is laid out, as
+    (first_position, cycle, cipher_start, cipher_step, count) per zigzag
+    progression: plaintext positions first_position + i·cycle, i < count,
+    hold ciphertext characters cipher_start + i·cipher_step.
+    """
+    if rails < 2 or length == 0:
+        return [(0, 1, 0, 1, length)]
+    cycle = 2 * (rails - 1)
+    segments = []
+    start = 0
+    for rail in range(rails):
+        first = (rail - offset) % cycle
+        count = (length - 1 - first) // cycle + 1 if first < length else 0
+        if rail == 0 or rail == rails - 1:
+            segments.append((first, cycle, start, 1, count))
+            start += count
+            continue
+        # Middle rails: down- and upstroke alternate, the earlier one first
+        first_b = (cycle - rail - offset) % cycle
+        count_b = (length - 1 - first_b) // cycle + 1 if first_b < length else 0
+        if first_b < first:
+            first, count, first_b, count_b = first_b, count_b, first, count
+        segments.append((first, cycle, start, 2, count))
+        segments.append((first_b, cycle, start + 1, 2, count_b))
+        start += count + count_b
+    return segments
+
+
+def railfence_encrypt(text: str, rails: int, offset: int = 0) -> str:
+    """
+    Write `text` in a zigzag over `rails` rows (starting `offset` steps
+    into the zigzag) and read it off row by row.
+    Example: railfence_encrypt("ESCAPENOW", 3) -> "EPWSAEOCN".
+    """
+    cipher: List[str] = [""] * len(text)
+    for first, cycle, start, step, count in _rail_segments(len(text), rails, offset):
+        cipher[start:start + step * count:step] = text[first::cycle]
+    return "".join(cipher)
+
+
+def railfence_decrypt(text: str, rails: int, offset: int = 0) -> str:
+    """
+    Inverse of railfence_encrypt(): one slice assignment per zigzag
+    progression. Nothing is cached, so a long text leaves no
+    text-sized permutation behind.
+    """
+    if len(text) < 2:
         return text
+    cycle = max(1, 2 * (rails - 1))
+    plain: List[str] = [""] * len(text)
+    for first, cycle, start, step, count in _rail_segments(len(text), rails, offset % cycle):
+        plain[first::cycle] = text[start:start + step * count:step]
+    return "".join(plain)
+
+
+def _railfence_sample(text: str, rails: int, offset: int, size: int) -> str:
+    """
+    The first and last `size` characters of railfence_decrypt(text, rails,
+    offset) joined by a space (all of it for short texts), assembled with
+    one slice assignment per zigzag progression and end. Keys that are off
+    by a small offset or rail count often decrypt a prefix to the same text
+    shifted by a few characters; they only go wrong towards the end.
+    """
+    n = len(text)
+    head_size = n if n <= 2 * size else size
+    tail_lo = n if n <= 2 * size else n - size
+    head: List[str] = [""] * head_size
+    tail: List[str] = [""] * (n - tail_lo)
+    for first, cycle, start, step, count in _rail_segments(n, rails, offset):
+        if first < head_size:
+            k = (head_size - 1 - first) // cycle + 1
+            head[first::cycle] = text[start:start + step * k:step]
+        if count and first + (count - 1) * cycle >= tail_lo:
+            i0 = -(-(tail_lo - first) // cycle) if tail_lo > first else 0
+            tail[first + i0 * cycle - tail_lo::cycle] = text[start + step * i0:start + step * count:step]
+    return "".join(head) + " " + "".join(tail) if tail else "".join(head)
+
+
+def _railfence_fitness(text: str) -> float:
+    return _ngram_score(text) + _RAILFENCE_WORD_WEIGHT * english_word_rate(text)
+
+
+def analyze_railfence_candidates(
+    ciphertext: str,
+    top_n: int = 5,
+    max_rails: Optional[int] = None
+) -> List[Tuple[int, int, str, float]]:
+    """
+    Auto-analysis for Rail fence: every rail count from 2 up to len/2
+    (capped at `max_rails`, default MAX_RAILS) with every offset in its
+    zigzag cycle. Letter frequencies don't change under transposition, so
+    keys are scored by _railfence_fitness (letter n-grams plus the English
+    word rate, which tells apart keys that only move spaces and
+    punctuation): screened on the decrypted start and end of the text (see
+    _railfence_sample), rescored on longer samples, and the best decrypted
+    in full and ranked on that. Returns (rails, offset, plaintext, score)
+    sorted by descending score.
+    """
+    n = len(ciphertext)
+    limit = min(n // 2, MAX_RAILS if max_rails is None else max_rails)
+    # Screen every key on short samples, then rescore the most promising
+    # ones on longer samples
+    screen = _RAILFENCE_SCREEN
+    scored: List[Tuple[float, int, int]] = []
+    for rails in range(2, limit + 1):
+        for offset in range(2 * (rails - 1)):
+            prefix = _railfence_sample(ciphertext, rails, offset, screen)
+            scored.append((_railfence_fitness(prefix), rails, offset))
+    shortlist = heapq.nlargest(max(top_n, _RAILFENCE_SHORTLIST), scored, key=lambda x: x[0])
+    size = _RAILFENCE_SAMPLE
+    rescored = [
+        (_railfence_fitness(_railfence_sample(ciphertext, rails, offset, size)), rails, offset)
+        for _, rails, offset in shortlist
+    ]
+    finalists = heapq.nlargest(max(top_n, _NGRAM_SHORTLIST), rescored, key=lambda x: x[0])
+    ranked: List[Tuple[int, int, str, float]] = []
+    for _, rails, offset in finalists:
+        plain = railfence_decrypt(ciphertext, rails, offset)
+        window = plain
+        if len(plain) > 2 * _RAILFENCE_RESCORE:
+            window = plain[:_RAILFENCE_RESCORE] + " " + plain[-_RAILFENCE_RESCORE:]
+        ranked.append((rails, offset, plain, _railfence_fitness(window)))
+    # nlargest is stable: ties keep the screening order
+    return heapq.nlargest(top_n, ranked, key=itemgetter(3))
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Polybius square: every symbol is written as its row label followed by its
+# column label ("BAT" → "12 11 44" on the 5×5 square). Squares come from
+# data/cipher_tables.json: every entry whose name starts with "polybius",
+# with single-character "Rows"/"Columns" labels and "rows" of cells. A cell
+# may hold several letters ("IJ"); they share one code.
+DEFAULT_SQUARE = "polybius"
+
+# Separates words in Polybius text (codes within a word are space-separated)
+POLYBIUS_WORD_SEPARATOR = " / "
+
+
+class _PolybiusSquare(NamedTuple):
+    """
+    One compiled square:
+      - cells:   flat list, cells[r * width + c] = symbols of that cell
+      - codes:   two-character code → cell
+      - decode:  two-character code → first symbol of the cell, plus "//"
+                 → " " so a whole message can be decoded in one pass
+      - encode:  upper-cased symbol → code
+      - keep:    str.translate table deleting everything but the label
+                 characters and "/"
+    """
+    name: str
+    label: str
+    width: int
+    cells: List[str]
+    codes: Dict[str, str]
+    decode: Dict[str, str]
+    encode: Dict[str, str]
+    keep: "_LabelFilter"
+
+
+class _LabelFilter(dict):
+    """
+    str.translate table keeping only the given characters.
+    """
+
+    def __init__(self, keep: Iterable[str]):
+        super().__init__((ord(c), c) for c in keep)
+
+    def __missing__(self, key: int) -> None:
+        return None
+
+
+def polybius_squares() -> List[Tuple[str, str]]:
+    """
+    Available Polybius squares as (name, label), in file order.
+    """
+    return [
+        (name, entry.get("label", name))
+        for name, entry in _load_cipher_tables().items() if name.startswith("polybius")
+    ]
+
+
+@lru_cache(maxsize=None)
+def _polybius_square(name: str) -> _PolybiusSquare:
+    """
+    Compile square `name` from cipher_tables.json. Raises KeyError for an
+    unknown square and ValueError for one that can't be read by fixed-width
+    chunking (labels that aren't single characters, ragged rows).
+    """
+    entry = _load_cipher_tables().get(name)
+    if entry is None or not name.startswith("polybius"):
+        raise KeyError(f"No Polybius square named {name!r}")
+    row_labels, col_labels, rows = entry["Rows"], entry["Columns"], entry["rows"]
+    if any(len(label) != 1 or label == "/" for label in row_labels + col_labels):
+        raise ValueError(f"Polybius square {name!r} needs single-character labels")
+    if len(rows) != len(row_labels) or any(len(row) != len(col_labels) for row in rows):
+        raise ValueError(f"Polybius square {name!r} doesn't match its labels")
+
+    cells: List[str] = [cell for row in rows for cell in row]
+    width = len(col_labels)
+    codes: Dict[str, str] = {
+        r + c: cells[i * width + j]
+        for i, r in enumerate(row_labels) for j, c in enumerate(col_labels)
+    }
+    encode: Dict[str, str] = {}
+    for code, cell in codes.items():
+        for symbol in cell.upper():
+            encode.setdefault(symbol, code)
+    decode = {code: cell[:1] for code, cell in codes.items()}
+    decode["//"] = " "
+    keep = _LabelFilter(set(row_labels + col_labels) | {"/"})
+    return _PolybiusSquare(name, entry.get("label", name), width, cells, codes, decode, encode, keep)
+
+
+def polybius_encode(text: str, square: str = DEFAULT_SQUARE) -> str:
+    """
+    Write each symbol of `text` (case-insensitive) as its two-character
+    code, codes separated by spaces and words by POLYBIUS_WORD_SEPARATOR.
+    Characters not in the square are dropped.
+    Example: polybius_encode("BAT") -> "12 11 44".
+    """
+    sq = _polybius_square(square)
+    words = (" ".join(filter(None, map(sq.encode.get, word.upper()))) for word in text.split())
+    return POLYBIUS_WORD_SEPARATOR.join(w for w in words if w)
+
+
+def _polybius_words(text: str, sq: _PolybiusSquare) -> List[str]:
+    # Label characters of each "/"-separated word, everything else deleted
+    return [w for w in text.translate(sq.keep).split("/") if w]
+
+
+def _chunk_codes(labels: str) -> Iterable[str]:
+    # Fixed-width (row, column) pairs; an unpaired trailing label is dropped
+    return map(operator.add, labels[0::2], labels[1::2])
+
+
+def polybius_decode(text: str, square: str = DEFAULT_SQUARE) -> str:
+    """
+    Decode Polybius text. Codes may be spaced ("12 11 44") or run together
+    ("121144"); words are separated by "/". Cells holding several letters
+    decode to their first one ("IJ" → "I"); see polybius_lattice() for
+    every reading. Unknown codes and unpaired labels decode to "?".
+    """
+    sq = _polybius_square(square)
+    words = _polybius_words(text, sq)
+    if not any(len(w) % 2 for w in words):
+        # Every word is whole pairs: rejoin with "//" (decoded as " ") and
+        # chunk the entire message at once
+        return "".join(map(sq.decode.get, _chunk_codes("//".join(words)), repeat("?")))
+    return " ".join(
+        "".join(map(sq.decode.get, _chunk_codes(w), repeat("?"))) + "?" * (len(w) % 2)
+        for w in words
+    )
+
+
+def polybius_lattice(text: str, square: str = DEFAULT_SQUARE):
+    """
+    Every reading of Polybius text as a DecodeLattice: one slot per code,
+    with one choice per symbol of its cell, so the 2ᵏ readings of k "IJ"
+    codes are counted and paged instead of expanded.
+    """
+    from helpers.codec.lattice import DecodeLattice
 
-    result = []
-    for ch in text:
-        if ch.isalpha():
-            upper_ch = ch.upper()
-            new_char = ch  # fallback = original
-            for row in _KEY_ROWS:
-                if upper_ch in row:
-                    idx = row.index(upper_ch)
-                    new_idx = (idx + shift) % len(row)
-                    mapped = row[new_idx]
-                    # preserve case:
-                    new_char = mapped.lower() if ch.islower() else mapped
-                    break
-            result.append(new_char)
-        else:
-            result.append(ch)
-    return "".join(result)
+    sq = _polybius_square(square)
+    return DecodeLattice([
+        [list(sq.codes.get(code, "?")) for code in _chunk_codes(w)] + [["?"]] * (len(w) % 2)
+        for w in _polybius_words(text, sq)
+    ])
@@ -1,4 +1,9 @@
 import os
+from functools import lru_cache
+from typing import Container
+
+from dictionary import CompactDictionary, load_compact
+from ngrams import NgramModel, load_model
 
 # ─────────────────────────────────────────────────────────────────────────────
 def project_root() -> str:
@@ -8,26 +13,38 @@ def project_root() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 
-def load_dictionary() -> set[str]:
-    path = os.path.join(project_root(), "data", "dictionary.txt")
-    out: set[str] = set()
-    if os.path.exists(path):
-        with open(path, encoding="utf-8") as f:
-            out = {ln.strip().upper() for ln in f if ln.strip()}
-    return out
+@lru_cache(maxsize=1)
+def load_dictionary() -> CompactDictionary:
+    """
+    The word list from data/dictionary.txt as a memory-mapped
+    CompactDictionary (built into data/dictionary.bin on first use or when
+    the text file changes). Loaded once per process; empty if no word list
+    is installed.
+    """
+    data = os.path.join(project_root(), "data")
+    return load_compact(os.path.join(data, "dictionary.txt"), os.path.join(data, "dictionary.bin"))
+
 
+@lru_cache(maxsize=1)
+def load_ngram_model() -> NgramModel:
+    """
+    English letter model shared by the solvers and the candidate ranking.
+    A 26×26 ngrams.BigramModel from the built-in frequencies, unless
+    data/quadgrams.txt ("ABCD count" per line) is installed: then a
+    QuadgramModel compiled into .cache/quadgrams.bin. `kind` says which.
+    Loaded once per process.
+    """
+    root = project_root()
+    return load_model(os.path.join(root, "data", "quadgrams.txt"), os.path.join(root, ".cache", "quadgrams.bin"))
 
 
-"""
-Compute “accuracy” as the fraction of tokens in `text` (split on spaces)
-that exist in `dictionary`.  Returned as a percentage [0.0–100.0].
-"""
-def compute_accuracy(txt: str, dictionary: set[str]) -> float:
-    if not (txt := txt.strip()):
-        return 0.0
-    words = txt.split()
-    good  = sum(1 for w in words if w.upper() in dictionary)
-    return (good / len(words)) * 100.0
+def compute_accuracy(txt: str, dictionary: Container[str]) -> float:
+    """
+    Compute “accuracy” as the fraction of tokens in `txt` (split on spaces)
+    that exist in `dictionary`.  Returned as a percentage [0.0–100.0].
+    """
+    from helpers.codec.scoring import word_hit_fraction
+    return word_hit_fraction(txt, dictionary) * 100.0
 
 
 def has_vowel(word: str) -> bool: